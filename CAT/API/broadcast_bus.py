@@ -0,0 +1,228 @@
+"""
+Publish/subscribe backends of the ConnectionManager. A message is published under a topic,
+the id of a game or of the lobby feed, and every process with WebSockets on that topic delivers it.
+
+InProcessBus, the default, hands every message straight to the local ConnectionManager.
+UnixSocketBus connects the process to a BusHub on a unix domain socket:
+
+    python -m CAT.API.broadcast_bus /tmp/cat-bus.sock
+    CAT_BROADCAST_BUS=/tmp/cat-bus.sock python -m CAT.API.pages_connection_api
+
+Every process still delivers its own messages locally. The hub only forwards a message to the
+other processes that subscribed to its topic, as the same bytes the publisher encoded.
+Messages are queued and written once per event loop iteration, so a burst costs one write.
+"""
+import asyncio
+import json
+import os
+import struct
+import sys
+from typing import Any, Callable
+
+from CAT.event_log import configure_logging, get_event_logger
+
+log = get_event_logger("broadcast_bus")
+
+# Rahmen: Länge des Inhalts, Art, Länge des Topics, dann Topic und Inhalt (JSON)
+FRAME_HEADER = struct.Struct("!IBH")
+PUBLISH, SUBSCRIBE, UNSUBSCRIBE = 1, 2, 3
+RECONNECT_DELAY = 1.0
+# bytes a process may fall behind before the hub drops it, it reconnects and subscribes again
+MAX_PEER_BUFFER = 8 * 1024 * 1024
+
+
+def encode_frame(kind: int, topic: str, body: bytes = b"") -> bytes:
+    topic = topic.encode()
+    return FRAME_HEADER.pack(len(body), kind, len(topic)) + topic + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, str, bytes, bytes]:
+    """Reads one frame: (kind, topic, body, the whole frame)."""
+    header = await reader.readexactly(FRAME_HEADER.size)
+    body_length, kind, topic_length = FRAME_HEADER.unpack(header)
+    rest = await reader.readexactly(topic_length + body_length)
+    return kind, rest[:topic_length].decode(), rest[topic_length:], header + rest
+
+
+class InProcessBus:
+    """Delivers every message in the publishing process, nothing is encoded."""
+
+    def __init__(self):
+        self._deliver: Callable[[str, Any], None] | None = None
+
+    def subscribe(self, deliver: Callable[[str, Any], None]):
+        """Sets the callback deliver(topic, message) that hands a message to the local sockets."""
+        self._deliver = deliver
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, topic: str, message: Any):
+        self._deliver(topic, message)
+
+    def watch(self, topic: str):
+        """Called when the first local socket of a topic connects."""
+
+    def unwatch(self, topic: str):
+        """Called when the last local socket of a topic is gone."""
+
+
+class UnixSocketBus(InProcessBus):
+    """
+    Connects to the BusHub on a unix domain socket. While the hub is unreachable, only local sockets
+    get the messages; the connection is retried and the watched topics are subscribed again.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._topics: set[str] = set()
+        self._writer: asyncio.StreamWriter | None = None
+        self._outbox: list[bytes] = []
+        self._flush_scheduled = False
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def publish(self, topic: str, message: Any):
+        self._deliver(topic, message)
+        # encoded once, the hub passes the bytes on unchanged
+        self._queue(encode_frame(PUBLISH, topic, json.dumps(message, separators=(",", ":")).encode()))
+
+    def watch(self, topic: str):
+        self._topics.add(topic)
+        self._queue(encode_frame(SUBSCRIBE, topic))
+
+    def unwatch(self, topic: str):
+        self._topics.discard(topic)
+        self._queue(encode_frame(UNSUBSCRIBE, topic))
+
+    def _queue(self, frame: bytes):
+        if self._writer is None:
+            return
+        self._outbox.append(frame)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if self._writer is not None and self._outbox:
+            self._writer.write(b"".join(self._outbox))
+        self._outbox.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                log.warning("bus_unreachable", path=self.path, error=str(e))
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            self._writer = writer
+            for topic in self._topics:
+                self._queue(encode_frame(SUBSCRIBE, topic))
+            log.info("bus_connected", path=self.path, topics=len(self._topics))
+            try:
+                while True:
+                    kind, topic, body, _ = await read_frame(reader)
+                    if kind == PUBLISH:
+                        self._deliver(topic, json.loads(body))
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                log.warning("bus_disconnected", path=self.path, error=repr(e))
+            finally:
+                self._writer = None
+                self._outbox.clear()
+                writer.close()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+class BusHub:
+    """Forwards the published frames of each process to the other processes subscribed to the topic."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._subscribers: dict[str, set[asyncio.StreamWriter]] = {}
+        self._outboxes: dict[asyncio.StreamWriter, list[bytes]] = {}
+        self._flush_scheduled = False
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            # left over from a hub that did not shut down
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, self.path)
+        log.info("bus_hub_started", path=self.path)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        topics: set[str] = set()
+        try:
+            while True:
+                kind, topic, _, frame = await read_frame(reader)
+                if kind == PUBLISH:
+                    for peer in self._subscribers.get(topic, ()):
+                        if peer is not writer:
+                            self._queue(peer, frame)
+                elif kind == SUBSCRIBE:
+                    topics.add(topic)
+                    self._subscribers.setdefault(topic, set()).add(writer)
+                elif kind == UNSUBSCRIBE:
+                    topics.discard(topic)
+                    self._unsubscribe(topic, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for topic in topics:
+                self._unsubscribe(topic, writer)
+            self._outboxes.pop(writer, None)
+            writer.close()
+
+    def _unsubscribe(self, topic: str, writer: asyncio.StreamWriter):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def _queue(self, peer: asyncio.StreamWriter, frame: bytes):
+        self._outboxes.setdefault(peer, []).append(frame)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        for peer, frames in self._outboxes.items():
+            if not frames:
+                continue
+            if peer.transport.get_write_buffer_size() > MAX_PEER_BUFFER:
+                log.warning("bus_peer_dropped", buffered=peer.transport.get_write_buffer_size())
+                peer.close()
+            else:
+                peer.write(b"".join(frames))
+            frames.clear()
+
+
+def bus_from_env() -> InProcessBus:
+    """The UnixSocketBus if CAT_BROADCAST_BUS names the socket of a hub, otherwise the InProcessBus."""
+    path = os.getenv("CAT_BROADCAST_BUS")
+    return UnixSocketBus(path) if path else InProcessBus()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m CAT.API.broadcast_bus <socket path>")
+    configure_logging(os.getenv("CAT_LOG_LEVEL", "INFO").upper())
+    try:
+        asyncio.run(BusHub(sys.argv[1]).serve())
+    except KeyboardInterrupt:
+        pass
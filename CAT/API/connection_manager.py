@@ -1,25 +1,189 @@
-from fastapi import WebSocket
-from typing import Dict, List
+import asyncio
+import json
+from collections import deque
+from fastapi import WebSocket, status
+from typing import Any, Dict
+
+from CAT.API.broadcast_bus import InProcessBus, bus_from_env
+from CAT.API.wire_format import WireEncoder
+from CAT.config import WS_MAX_PENDING_MESSAGES, WS_SEND_TIMEOUT
+from CAT.event_log import get_event_logger
+
+log = get_event_logger("websocket")
+
+# Ersetzt die Deltas, die ein zu langsamer Client verpasst hat, der Client lädt daraufhin den ganzen Zustand
+UPDATE_MESSAGE = json.dumps({"event": "update"})
+# Verbindungen des Lobby-Feeds werden wie ein eigenes Spiel unter dieser ID geführt
+LOBBY_FEED_ID = "lobby"
+
+
+class ClientConnection:
+    """
+    One WebSocket of a game with its outbound queue. A writer task per connection sends the queue,
+    so a slow client only delays its own messages.
+    """
+    __slots__ = ("websocket", "game_id", "player_id", "encoder", "pending", "wakeup", "writer")
+
+    def __init__(self, websocket: WebSocket, game_id: str, player_id: str, encoder: WireEncoder | None = None):
+        self.websocket = websocket
+        self.game_id = game_id
+        self.player_id = player_id
+        # set if the client negotiated the binary format
+        self.encoder = encoder
+        # (text or bytes, coalescable): state messages may be replaced by UPDATE_MESSAGE, events may not
+        self.pending: deque[tuple[str | bytes, bool]] = deque()
+        self.wakeup = asyncio.Event()
+        self.writer: asyncio.Task | None = None
+
 
 class ConnectionManager:
-    def __init__(self):
-        # Speichert die aktiven Verbindungen pro Spiel: {game_id: [websocket, websocket, ...]}
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+    """
+    The WebSockets of this process. Messages for all clients of a game go through the bus
+    (CAT/API/broadcast_bus.py), which delivers them in every process with clients of that game.
+    """
 
-    async def connect(self, websocket: WebSocket, game_id: str):
+    def __init__(self, bus: InProcessBus | None = None):
+        # Speichert die aktiven Verbindungen pro Spiel: {game_id: {websocket: ClientConnection, ...}}
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self.bus = bus or InProcessBus()
+        self.bus.subscribe(self._deliver)
+        # Schließvorgänge entfernter Verbindungen, damit die Tasks nicht vorzeitig eingesammelt werden
+        self._closing: set[asyncio.Task] = set()
+
+    async def connect(self, websocket: WebSocket, game_id: str, player_id: str, encoder: WireEncoder | None = None):
         await websocket.accept()
+        connection = ClientConnection(websocket, game_id, player_id, encoder)
+        connection.writer = asyncio.create_task(self._write(connection))
         if game_id not in self.active_connections:
-            self.active_connections[game_id] = []
-        self.active_connections[game_id].append(websocket)
+            self.active_connections[game_id] = {}
+            self.bus.watch(game_id)
+        self.active_connections[game_id][websocket] = connection
 
     def disconnect(self, websocket: WebSocket, game_id: str):
-        if game_id in self.active_connections:
-            self.active_connections[game_id].remove(websocket)
+        connections = self.active_connections.get(game_id, {})
+        connection = connections.pop(websocket, None)
+        if connection is None:
+            return
+        if connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        if not connections:
+            del self.active_connections[game_id]
+            self.bus.unwatch(game_id)
+
+    def send(self, websocket: WebSocket, game_id: str, message: str | bytes, coalescable: bool = False):
+        """Queues a message for one connection, e.g. the snapshot after connecting."""
+        connection = self.active_connections.get(game_id, {}).get(websocket)
+        if connection is not None:
+            self._enqueue(connection, message, coalescable)
+
+    def send_all(self, message: str, game_id: str, coalescable: bool = False):
+        """Queues message for every client of the game in every process, it does not wait for the clients."""
+        self.bus.publish(game_id, ("message", message, coalescable))
+
+    def publish_lobby_event(self, event: dict):
+        """
+        Listener of the lobby index, pushes a lobby change to the clients of the lobby feed.
+        A client that falls behind gets "update" instead and reloads the list.
+        """
+        self.send_all(json.dumps(event), LOBBY_FEED_ID, coalescable=True)
 
     async def broadcast(self, message: str, game_id: str):
-        if game_id in self.active_connections:
-            for connection in self.active_connections[game_id]:
-                await connection.send_text(message)
+        self.send_all(message, game_id)
+
+    async def notify(self, game_id: str, event: dict):
+        """
+        Notifier for Game objects, sends an event to every client of the game.
+        The fields in event["private"][player_id] are only added to the message of that player.
+        Binary clients get deltas as frames of CAT/API/wire_format.py, everything else as JSON.
+        """
+        self.bus.publish(game_id, ("event", event))
+
+    def _deliver(self, game_id: str, message: Any):
+        """Subscriber of the bus, hands a published message to the clients of the game in this process."""
+        connections = self.active_connections.get(game_id)
+        if not connections:
+            return
+        if message[0] == "event":
+            self._deliver_event(connections, message[1])
+        else:
+            for connection in list(connections.values()):
+                self._enqueue(connection, message[1], message[2])
+
+    def _deliver_event(self, connections: Dict[WebSocket, ClientConnection], event: dict):
+        private = event.get("private") or {}
+        shared = {key: value for key, value in event.items() if key != "private"}
+        is_delta = shared.get("event") == "delta"
+        message = None
+        for connection in list(connections.values()):
+            fields = private.get(connection.player_id)
+            if connection.encoder is not None and is_delta:
+                if "number_of_players" in shared:
+                    # a player joined, names and figures are only part of the metadata
+                    self._enqueue(connection, json.dumps({"event": "meta", **connection.encoder.meta(connection.player_id)}), False)
+                self._enqueue(connection, connection.encoder.encode_delta(shared, fields["hand"] if fields else None), True)
+            elif fields:
+                self._enqueue(connection, json.dumps({**shared, **fields}), is_delta)
+            else:
+                if message is None:
+                    message = json.dumps(shared)
+                self._enqueue(connection, message, is_delta)
+
+    def _enqueue(self, connection: ClientConnection, message: str | bytes, coalescable: bool):
+        pending = connection.pending
+        if coalescable and len(pending) >= WS_MAX_PENDING_MESSAGES:
+            # der Client hängt hinterher: alle wartenden Zustandsnachrichten durch einen einzigen Hinweis ersetzen
+            kept = [entry for entry in pending if not entry[1]]
+            pending.clear()
+            pending.extend(kept)
+            message = UPDATE_MESSAGE
+        pending.append((message, coalescable))
+        if len(pending) > 2 * WS_MAX_PENDING_MESSAGES:
+            # only events that cannot be coalesced are left, the client does not read at all
+            self._evict(connection, "queue_full")
+            return
+        connection.wakeup.set()
+
+    async def _write(self, connection: ClientConnection):
+        """Writer task of a connection, sends the queued messages in order."""
+        websocket = connection.websocket
+        pending = connection.pending
+        try:
+            while True:
+                await connection.wakeup.wait()
+                connection.wakeup.clear()
+                while pending:
+                    message, _ = pending.popleft()
+                    if isinstance(message, bytes):
+                        await asyncio.wait_for(websocket.send_bytes(message), WS_SEND_TIMEOUT)
+                    else:
+                        await asyncio.wait_for(websocket.send_text(message), WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._evict(connection, "send_timeout")
+        except Exception as e:
+            # the socket is closed or broken, the receive loop of the endpoint notices it as well
+            self._evict(connection, "send_failed", error=str(e))
+
+    def _evict(self, connection: ClientConnection, reason: str, **fields):
+        """Removes a dead or too slow connection from its game and closes it in the background."""
+        if self.active_connections.get(connection.game_id, {}).get(connection.websocket) is not connection:
+            return
+        log.info("connection_evicted", game_id=connection.game_id, player_id=connection.player_id, reason=reason,
+                 pending=len(connection.pending), **fields)
+        self.disconnect(connection.websocket, connection.game_id)
+        connection.pending.clear()
+        task = asyncio.create_task(self._close(connection.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=status.WS_1008_POLICY_VIOLATION), WS_SEND_TIMEOUT)
+        except Exception:
+            # already closed or still stalled, there is nothing left to do for this socket
+            pass
 
 # Erstelle eine globale Instanz, die von der ganzen Anwendung genutzt wird
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(bus_from_env())
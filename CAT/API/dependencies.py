@@ -1,7 +1,26 @@
+import os
 from CAT.manager.game_manager import GameManager
+from CAT.manager.game_store import GameStore
+from CAT.manager.sharding import ShardConfig
+from CAT.API.connection_manager import manager
 
 # Create single instances of the managers that can be shared across the application
-game_manager = GameManager()
+
+def _game_store(shard: ShardConfig) -> GameStore | None:
+    # CAT_STATE_DB: SQLite-Datei, in der die laufenden Spiele einen Neustart überstehen; jeder Shard hat seine eigene
+    path = os.getenv("CAT_STATE_DB")
+    if not path:
+        return None
+    # CAT_STATE_HISTORY=1: auch beendete Spiele bleiben vollständig gespeichert, für python -m CAT.manager.replay
+    return GameStore(f"{path}.{shard.index}" if shard.sharded else path,
+                     keep_history=os.getenv("CAT_STATE_HISTORY") == "1")
+
+
+shard = ShardConfig.from_env()
+# als Shard-Worker (CAT/API/shard_router.py) nur für die Spiel-IDs der eigenen Partition
+game_manager = GameManager(notifier=manager.notify, shard=shard, store=_game_store(shard))
+# Änderungen der Lobbyliste gehen an die Clients des Lobby-Feeds
+game_manager.lobby_index.subscribe(manager.publish_lobby_event)
 
 def get_game_manager():
     return game_manager
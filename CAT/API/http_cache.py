@@ -0,0 +1,11 @@
+"""Conditional requests, shared by the game state route and the page cache."""
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if the If-None-Match header names etag, the request then gets 304."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, a proxy may have marked our ETag as weak
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,98 @@
+"""
+The HTML pages of the frontend, read once at startup and served from memory.
+
+Every page is kept as it is and gzip compressed, each variant with its own strong ETag.
+A request gets the gzip variant if its Accept-Encoding allows it, and 304 if its If-None-Match
+names the ETag of the variant. With CAT_PAGES_RELOAD=1 the pages are read again whenever
+a file in the pages directory changes, for the development of the frontend.
+"""
+import gzip
+import hashlib
+from pathlib import Path
+
+from fastapi import Request, Response
+from fastapi.responses import HTMLResponse
+
+from CAT.API.http_cache import etag_matches
+from CAT.event_log import get_event_logger
+
+log = get_event_logger("page_cache")
+
+# the pages reference scripts and stylesheets without versions, so the browser has to revalidate every time
+PAGE_CACHE_CONTROL = "no-cache"
+
+
+class CachedPage:
+    """One representation of a page: its body and the headers of the 200 and of the 304 response."""
+    __slots__ = ("body", "etag", "headers", "not_modified_headers")
+
+    def __init__(self, body: bytes, etag: str, content_encoding: str | None = None):
+        self.body = body
+        self.etag = etag
+        self.not_modified_headers = {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        self.headers = dict(self.not_modified_headers)
+        if content_encoding is not None:
+            self.headers["Content-Encoding"] = content_encoding
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    if not accept_encoding:
+        return False
+    qualities = {}
+    for coding in accept_encoding.lower().split(","):
+        name, _, parameters = coding.partition(";")
+        # "gzip;q=0" refuses it
+        quality = parameters.strip().removeprefix("q=")
+        try:
+            qualities[name.strip()] = float(quality) if parameters else 1.0
+        except ValueError:
+            qualities[name.strip()] = 0.0
+    # an explicit gzip entry wins over "*", so "*;q=0, gzip" accepts it and "gzip;q=0, *" does not
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _load_page(path: Path) -> tuple[CachedPage, CachedPage]:
+    body = path.read_bytes()
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    # mtime 0, so the compressed bytes and with them the ETag only depend on the page
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    return CachedPage(body, f'"{digest}"'), CachedPage(compressed, f'"{digest}-gz"', "gzip")
+
+
+class PageCache:
+    """
+    The pages of a directory by file name, as (plain, gzip) pairs. A reload builds a new dict and replaces
+    the old one, the pages themselves are never changed, so requests need no lock.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._pages: dict[str, tuple[CachedPage, CachedPage]] = {}
+        self.load()
+
+    def load(self):
+        self._pages = {path.name: _load_page(path) for path in sorted(self.directory.glob("*.html"))}
+        log.info("pages_loaded", pages=len(self._pages),
+                 bytes=sum(len(plain.body) for plain, _ in self._pages.values()),
+                 gzip_bytes=sum(len(compressed.body) for _, compressed in self._pages.values()))
+
+    def response(self, name: str, request: Request) -> Response:
+        plain, compressed = self._pages[name]
+        page = compressed if _accepts_gzip(request.headers.get("accept-encoding")) else plain
+        if etag_matches(request.headers.get("if-none-match"), page.etag):
+            return Response(status_code=304, headers=page.not_modified_headers)
+        return HTMLResponse(page.body, headers=page.headers)
+
+    async def watch(self):
+        """Reloads the pages when a file of the directory changes, runs until it is cancelled."""
+        try:
+            from watchfiles import awatch
+        except ImportError as e:
+            raise ImportError("Reloading the pages needs watchfiles, install it with 'pip install watchfiles'.") from e
+        async for changes in awatch(self.directory):
+            log.info("pages_changed", files=sorted(Path(path).name for _, path in changes))
+            try:
+                self.load()
+            except OSError as e:
+                # e.g. a file removed while it was read, the next change loads again
+                log.warning("pages_reload_failed", error=repr(e))
@@ -6,14 +6,18 @@ import os
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from CAT.API.routers import lobby, game
 from CAT.API.dependencies import get_game_manager
 from CAT.API.connection_manager import manager
+from CAT.API.page_cache import PageCache
+from CAT.classes.game import Game
+from CAT.manager.game_manager import GameManager, TURN_DEADLINE
 from CAT.config import GAME_INACTIVITY_TIMEOUT
+from CAT.event_log import configure_logging, get_event_logger, stop_logging
 
 
 
@@ -26,27 +30,58 @@ SCRIPTS_DIR = BASE_DIR / "scripts"
 AUDIO_DIR = BASE_DIR / "audio"
 ICON_DIR = BASE_DIR / "icon"
 
+log = get_event_logger("api")
+# the HTML pages are read once, a request costs no file access
+pages = PageCache(PAGES_DIR)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Application started... start Timer-Background-Task.")
+    configure_logging(os.getenv("CAT_LOG_LEVEL", "INFO").upper())
+    log.info("application_started")
+    game_manager = get_game_manager()
+    if game_manager.store is not None:
+        # games of the previous run, before the first request and deadline
+        game_manager.restore_games()
+        log.info("games_restored", games=len(game_manager.games))
+        game_manager.store.start()
+    await manager.bus.start()
     task = asyncio.create_task(run_game_timer_checks())
+    # CAT_PAGES_RELOAD=1: geänderte Seiten ohne Neustart ausliefern, nur für die Entwicklung
+    reload_task = asyncio.create_task(pages.watch()) if os.getenv("CAT_PAGES_RELOAD") == "1" else None
     yield
     task.cancel()
+    if reload_task is not None:
+        reload_task.cancel()
+    await manager.bus.stop()
+    if game_manager.store is not None:
+        game_manager.store.close()
+    stop_logging()
 
 app = FastAPI(lifespan=lifespan)
 
 async def run_game_timer_checks():
     game_manager = get_game_manager()
-
-    while True:
-        await asyncio.sleep(1)
-        for game_id, game in list(game_manager.games.items()):
-            await game.check_timeout_and_broadcast()
-            if time.time() - game.last_activity_time > GAME_INACTIVITY_TIMEOUT:
-                print(f"Closing inactive game {game_id} due to inactivity.")
-                await manager.broadcast(json.dumps({"event": "game_closed", "reason": "Inactivity"}), game_id)
-                del game_manager.games[game_id]
+    # wakes up at the next turn or inactivity deadline, not once per game and second
+    await game_manager.scheduler.run(lambda game_id, kind: handle_game_deadline(game_manager, game_id, kind))
+
+
+async def handle_game_deadline(game_manager: GameManager, game_id: str, kind: str):
+    actor = game_manager.get_actor(game_id)
+    if actor is None:
+        return
+    game = actor.game
+    if kind == TURN_DEADLINE:
+        # queued behind the moves of the game; if the turn changed meanwhile nothing happens,
+        # and the actor registers the deadline of the new turn
+        await actor.submit(Game.check_timeout_and_broadcast)
+    elif time.time() - game.last_activity_time > GAME_INACTIVITY_TIMEOUT:
+        log.info("game_closed", game_id=game_id, reason="inactivity")
+        manager.send_all(json.dumps({"event": "game_closed", "reason": "Inactivity"}), game_id)
+        game_manager.remove_game(game_id)
+    else:
+        # there was activity since the deadline was registered
+        game_manager.schedule_deadlines(game)
 
 
 origins = ["*"]
@@ -57,6 +92,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # read by the game page when it loads the state
+    expose_headers=["ETag", "X-Remaining-Turn-Time"],
 )
 
 # Include the API routers
@@ -85,52 +122,36 @@ async def get_favicon():
     return FileResponse(os.path.join(ICON_DIR, "favicon.ico"), media_type="image/x-icon")
 
 @app.get("/about", response_class=HTMLResponse)
-async def get_about():
-    with open(os.path.join(PAGES_DIR, "about.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_about(request: Request):
+    return pages.response("about.html", request)
 
 @app.get("/create_lobby", response_class=HTMLResponse)
-async def get_create_lobby():
-    with open(os.path.join(PAGES_DIR, "create_lobby.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_create_lobby(request: Request):
+    return pages.response("create_lobby.html", request)
 
 @app.get("/game", response_class=HTMLResponse)
-async def get_game():
-    with open(os.path.join(PAGES_DIR, "game.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_game(request: Request):
+    return pages.response("game.html", request)
 
 @app.get("/join_lobby", response_class=HTMLResponse)
-async def get_join_lobby():
-    with open(os.path.join(PAGES_DIR, "join_lobby.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_join_lobby(request: Request):
+    return pages.response("join_lobby.html", request)
 
 @app.get("/", response_class=HTMLResponse)
-async def get_menu():
-    with open(os.path.join(PAGES_DIR, "menu.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_menu(request: Request):
+    return pages.response("menu.html", request)
 
 @app.get("/online", response_class=HTMLResponse)
-async def get_online():
-    with open(os.path.join(PAGES_DIR, "online.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_online(request: Request):
+    return pages.response("online.html", request)
 
 @app.get("/rules", response_class=HTMLResponse)
-async def get_rules():
-    with open(os.path.join(PAGES_DIR, "rules.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_rules(request: Request):
+    return pages.response("rules.html", request)
 
 @app.get("/settings", response_class=HTMLResponse)
-async def get_settings():
-    with open(os.path.join(PAGES_DIR, "settings.html"), "r", encoding="utf-8") as f:
-        html = f.read()
-    return html
+async def get_settings(request: Request):
+    return pages.response("settings.html", request)
 
 load_dotenv()
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from CAT.manager.game_manager import GameManager
 from CAT.API.dependencies import get_game_manager
 from CAT.API.schemas import PlayCardRequest, VoteKickRequest
 from CAT.classes.cards import *
 from CAT.API.connection_manager import manager
+from CAT.API import wire_format
+from CAT.API.http_cache import etag_matches
+from CAT.event_log import get_event_logger
+
+log = get_event_logger("api")
 
 
 router = APIRouter(
@@ -13,40 +18,118 @@ router = APIRouter(
 )
 
 @router.websocket("/ws/{game_id}/{player_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str):
-    await manager.connect(websocket, game_id)
+async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str, format: str = Query("json"),
+                             game_manager: GameManager = Depends(get_game_manager)):
+    actor = game_manager.get_actor(game_id)
+    # ?format=binary: metadata once as JSON, then the state and the deltas as binary frames
+    encoder = wire_format.WireEncoder(actor.game) if actor and format == wire_format.FORMAT_NAME else None
+    await manager.connect(websocket, game_id, player_id, encoder)
+
+    def send_snapshot(game):
+        # queued like every other message, so the writer task of the connection keeps them in order
+        if encoder:
+            manager.send(websocket, game_id, json.dumps({"event": "meta", **encoder.meta(player_id)}))
+            manager.send(websocket, game_id, encoder.encode_state(player_id), coalescable=True)
+        else:
+            # the client starts from this snapshot and applies the deltas of the following versions
+            manager.send(websocket, game_id, json.dumps({"event": "snapshot", "version": game.state_version,
+                                                         "state": game.to_json(perspective_player_id=player_id)}),
+                         coalescable=True)
+
+    if actor:
+        # taken in the actor, so no delta of a command before it is queued after it
+        await actor.read(send_snapshot)
     try:
         while True:
-            # Warte auf Nachrichten vom Client (aktuell nicht genutzt, aber für die Zukunft nötig)
-            await websocket.receive_text()
+            # Aktionen des Clients (play, start, vote_kick), jede wird mit "ack" oder "error" beantwortet
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # a binary frame has no text and is answered like any other invalid message
+            reply = await _answer_socket_message(message.get("text"), game_id, player_id, game_manager)
+            manager.send(websocket, game_id, json.dumps(reply))
     except WebSocketDisconnect:
+        pass
+    finally:
+        # also when the loop ends with an error, otherwise the connection would stay registered
         manager.disconnect(websocket, game_id)
-        print(f"Player {player_id} disconnected from game {game_id}")
+        log.info("player_disconnected", game_id=game_id, player_id=player_id)
 
 @router.get("/{game_id}/state")
-def get_game_state(game_id: str, player_id: str = Query(...), game_manager: GameManager = Depends(get_game_manager)):
+async def get_game_state(game_id: str, request: Request, player_id: str = Query(...),
+                         game_manager: GameManager = Depends(get_game_manager)):
     """
     Retrieves the current state of a specific game.
+    The ETag is the state version, a request with a matching If-None-Match gets 304 without serializing the game.
+    The remaining turn time changes every second, so it is sent in the X-Remaining-Turn-Time header.
+    With "Accept: application/x-cat-state" the state is sent as binary frame, see /meta for the static part.
     """
-    game = game_manager.get_game(game_id)
-    if not game:
+    actor = game_manager.get_actor(game_id)
+    if not actor:
         return {"error": "Game not found"}
-    # The game object will be automatically converted to JSON by FastAPI.
-    # You might want to create a Pydantic schema for the game state for better control
-    return game.to_json(perspective_player_id=player_id)
+    return await actor.read(lambda game: _state_response(game, request, player_id))
 
 
-# Example of a future endpoint for playing a card
-@router.post("/{game_id}/play")
-async def play_card_action(game_id: str, request: PlayCardRequest, game_manager: GameManager = Depends(get_game_manager)):
+def _state_response(game, request: Request, player_id: str) -> Response:
+    binary = wire_format.MEDIA_TYPE in request.headers.get("accept", "")
+    # both representations have their own ETag
+    etag = f'"{game.state_version}-b"' if binary else f'"{game.state_version}"'
+    # the browser has to revalidate every time, the state changes with every move
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    remaining_time = game.remaining_turn_time()
+    if remaining_time is not None:
+        headers["X-Remaining-Turn-Time"] = str(remaining_time)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if binary:
+        return Response(wire_format.WireEncoder(game).encode_state(player_id), media_type=wire_format.MEDIA_TYPE,
+                        headers=headers)
+    # the public part is encoded once per state version, not once per requesting player
+    return Response(game.encoded_state(player_id), media_type="application/json", headers=headers)
+
+
+@router.get("/{game_id}/meta")
+async def get_game_meta(game_id: str, player_id: str | None = Query(None),
+                        game_manager: GameManager = Depends(get_game_manager)):
     """
-    Handles a player's action to play a card.
+    The static part of the game for clients of the binary format: names, colors, figure uuids and card kinds.
+    It only changes when a player joins.
+    """
+    actor = game_manager.get_actor(game_id)
+    if not actor:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return await actor.read(lambda game: wire_format.WireEncoder(game).meta(player_id))
+
+
+@router.get("/{game_id}/legal_moves")
+async def get_legal_moves(game_id: str, player_id: str = Query(...), game_manager: GameManager = Depends(get_game_manager)):
+    """
+    Returns every action the requesting player can play right now.
+    Each entry can be sent unchanged as card_index and action_details to the play endpoint.
     """
-    game = game_manager.get_game(game_id)
-    if not game:
+    actor = game_manager.get_actor(game_id)
+    if not actor:
         raise HTTPException(status_code=404, detail="Game not found")
+    return await actor.read(lambda game: _legal_moves(game, player_id))
+
+
+def _legal_moves(game, player_id: str) -> dict:
+    player = game.get_player_by_uuid(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found in this game")
+
+    if not game.game_started or game.game_over or game.players[game.current_player_index] != player:
+        return {"moves": []}
+    return {"moves": game.generate_legal_moves(player)}
+
+
+# The commands below run in the actor of the game (CAT/manager/game_actor.py), which publishes the state afterwards.
 
-    player = game.get_player_by_uuid(request.player_uuid)
+async def _play_card(game, player_uuid: str, card_index: int, action_details: dict) -> dict:
+    """Plays a card for a player, shared by the play route and the WebSocket action."""
+    player = game.get_player_by_uuid(player_uuid)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found in this game")
     if game.players[game.current_player_index] != player:
@@ -55,76 +138,133 @@ async def play_card_action(game_id: str, request: PlayCardRequest, game_manager:
     try:
         await game.execute_play_card(
             player=player,
-            card_index=request.card_index,
-            action_details=request.action_details
+            card_index=card_index,
+            action_details=action_details
         )
 
-        await manager.broadcast(json.dumps({"event": "update"}), game_id)
-
         return {"message": "Action successful."}
     except (ValueError, IndexError) as e:
-        if "Your time is up" in str(e):
-            print(f"Broadcasting update for game {game_id} due to an active timeout during play.")
-            await manager.broadcast(json.dumps({"event": "update"}), game_id)
-
+        # a timed out turn was passed anyway, the actor publishes that as well
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/{game_id}/start")
-async def start_game(game_id: str, game_manager: GameManager = Depends(get_game_manager)):
-    """
-    Starts the game and deals the initial hand of cards.
-    """
-    game = game_manager.get_game(game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
 
+def _start_game(game) -> dict:
     try:
         game.start_game_and_deal_cards()
-        await manager.broadcast(json.dumps({"event": "update"}), game_id)
         return {"message": "Game started and cards dealt successfully."}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/{game_id}/vote_kick")
-async def vote_kick_player(game_id: str, request: VoteKickRequest, game_manager: GameManager = Depends(get_game_manager)):
-    game = game_manager.get_game(game_id)
-    voter = game.get_player_by_uuid(request.voter_uuid)
-    player_to_kick = game.get_player_by_number(request.player_to_kick_number)
+def _vote_kick(game, voter_uuid: str, player_to_kick_number: int) -> dict:
+    voter = game.get_player_by_uuid(voter_uuid)
+    player_to_kick = game.get_player_by_number(player_to_kick_number)
 
-    if not game or not voter or not player_to_kick:
+    if not voter or not player_to_kick:
         raise HTTPException(status_code=404, detail="Game or player not found.")
 
     try:
         player_was_kicked = game.register_kick_vote(voter, player_to_kick.uuid)
         if player_was_kicked:
-            await manager.broadcast(json.dumps({"event": "player_kicked", "kicked_player_uuid": player_to_kick.uuid}),
-                                    game_id)
-            await manager.broadcast(json.dumps({"event": "update"}), game_id)
+            manager.send_all(json.dumps({"event": "player_kicked", "kicked_player_uuid": player_to_kick.uuid}), game.uuid)
 
         return {"message": "Vote registered."}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _field(message: dict, name: str, expected_type: type):
+    value = message.get(name)
+    # bool is a subclass of int, but no valid card index or player number
+    if not isinstance(value, expected_type) or isinstance(value, bool):
+        raise HTTPException(status_code=422, detail=f"'{name}' must be of type {expected_type.__name__}.")
+    return value
+
+
+async def _handle_socket_action(message: dict, game_id: str, player_id: str, game_manager: GameManager) -> dict:
+    """
+    Executes an action sent over the WebSocket, the sending player is the player of the socket:
+        {"action": "play", "request_id": 7, "card_index": 0, "action_details": {...}}
+        {"action": "start", "request_id": 8}
+        {"action": "vote_kick", "request_id": 9, "player_to_kick_number": 2}
+    Returns the result like the HTTP routes, failures raise HTTPException.
+    """
+    actor = game_manager.get_actor(game_id)
+    if not actor:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    action = message.get("action")
+    if action == "play":
+        card_index = _field(message, "card_index", int)
+        action_details = _field(message, "action_details", dict)
+        return await actor.submit(lambda game: _play_card(game, player_id, card_index, action_details))
+    if action == "start":
+        return await actor.submit(_start_game)
+    if action == "vote_kick":
+        player_to_kick_number = _field(message, "player_to_kick_number", int)
+        return await actor.submit(lambda game: _vote_kick(game, player_id, player_to_kick_number))
+    raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
+
+
+async def _answer_socket_message(text: str | None, game_id: str, player_id: str, game_manager: GameManager) -> dict:
+    """
+    Answers every client message with an "ack" or an "error" carrying the request_id of the message.
+    A failing action never ends the connection, text is None for a binary frame.
+    """
+    try:
+        message = json.loads(text)
+    except (TypeError, ValueError):
+        message = None
+    if not isinstance(message, dict):
+        return {"event": "error", "request_id": None, "status": 422, "detail": "Messages must be JSON objects."}
+
+    request_id = message.get("request_id")
+    try:
+        result = await _handle_socket_action(message, game_id, player_id, game_manager)
+    except HTTPException as e:
+        return {"event": "error", "request_id": request_id, "status": e.status_code, "detail": e.detail}
+    except (TypeError, KeyError) as e:
+        # e.g. action details of the wrong type, which the card only notices while it is played
+        return {"event": "error", "request_id": request_id, "status": 400, "detail": f"Invalid action: {e!r}"}
+    except Exception as e:
+        log.warning("socket_action_failed", game_id=game_id, player_id=player_id, error=repr(e))
+        return {"event": "error", "request_id": request_id, "status": 500, "detail": "Internal server error."}
+    return {"event": "ack", "request_id": request_id, **result}
+
+
+@router.post("/{game_id}/play")
+async def play_card_action(game_id: str, request: PlayCardRequest, game_manager: GameManager = Depends(get_game_manager)):
+    """
+    Handles a player's action to play a card.
+    """
+    actor = game_manager.get_actor(game_id)
+    if not actor:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return await actor.submit(lambda game: _play_card(game, request.player_uuid, request.card_index,
+                                                      request.action_details))
+
+@router.post("/{game_id}/start")
+async def start_game(game_id: str, game_manager: GameManager = Depends(get_game_manager)):
+    """
+    Starts the game and deals the initial hand of cards.
+    """
+    actor = game_manager.get_actor(game_id)
+    if not actor:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return await actor.submit(_start_game)
+
+
+@router.post("/{game_id}/vote_kick")
+async def vote_kick_player(game_id: str, request: VoteKickRequest, game_manager: GameManager = Depends(get_game_manager)):
+    actor = game_manager.get_actor(game_id)
+    if not actor:
+        raise HTTPException(status_code=404, detail="Game or player not found.")
+    return await actor.submit(lambda game: _vote_kick(game, request.voter_uuid, request.player_to_kick_number))
+
+
 @router.get("/card_types", tags=["Game"])
 def get_all_card_types():
     """
     Returns a list of all unique, imitable card types in the game.
     """
-    card_types = [
-        StandardCard(2).to_json(),
-        StandardCard(3).to_json(),
-        StandardCard(5).to_json(),
-        StandardCard(6).to_json(),
-        StandardCard(8).to_json(),
-        StandardCard(9).to_json(),
-        StandardCard(10).to_json(),
-        StandardCard(12).to_json(),
-        FlexCard().to_json(),
-        SwapCard().to_json(),
-        InfernoCard().to_json(),
-        StartCard(name="13/Start", move_values=[13], description="Move a cat from the start area or move 13 fields forward.").to_json(),
-        StartCard(name="1/11/Start", move_values=[1, 11], description="Move a cat from the start area or move 1 or 11 fields forward.").to_json()
-    ]
-    return card_types
\ No newline at end of file
+    return [card.to_json() for card in IMITABLE_CARDS]
\ No newline at end of file
@@ -1,9 +1,12 @@
-import json
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from CAT.API.connection_manager import LOBBY_FEED_ID, manager
 from CAT.API.schemas import CreateLobbyRequest, PlayerInput
 from CAT.manager.game_manager import GameManager
+from CAT.manager.lobby_index import DEFAULT_PAGE_SIZE, LOBBY_FILTERS, MAX_PAGE_SIZE
 from CAT.API.dependencies import get_game_manager
-from CAT.API.connection_manager import manager
+from CAT.event_log import get_event_logger
+
+log = get_event_logger("api")
 
 router = APIRouter(
     prefix="/lobby",
@@ -13,14 +16,14 @@ router = APIRouter(
 
 # Diese Funktion ist jetzt korrekt
 @router.post("/create")
-def create_lobby(request: CreateLobbyRequest, game_manager: GameManager = Depends(get_game_manager)):
-    print("Received request to create lobby with data:", request.model_dump())
+async def create_lobby(request: CreateLobbyRequest, game_manager: GameManager = Depends(get_game_manager)):
     new_game = game_manager.create_game(
         name=request.lobby_name,
         player_name=request.player_input.player_name
     )
     # Der erste Spieler in der Liste ist der Host
     host_player = new_game.players[0]
+    log.info("lobby_created", game_id=new_game.uuid, name=new_game.name)
     return {
         "message": f"Lobby '{new_game.name}' created!",
         "game_id": new_game.uuid,
@@ -33,23 +36,46 @@ async def join_lobby(game_id: str, player_input: PlayerInput, game_manager: Game
     """
     Adds a new player to an existing game lobby.
     """
-    game = game_manager.get_game(game_id)
-    if not game:
+    actor = game_manager.get_actor(game_id)
+    if not actor:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    # Füge den Spieler hinzu und erhalte das Objekt zurück
-    new_player = game.add_player(player_input.player_name)
+    # Füge den Spieler im Actor des Spiels hinzu und erhalte das Objekt zurück
+    new_player = await actor.submit(lambda game: game.add_player(player_input.player_name))
     if not new_player:
         raise HTTPException(status_code=400, detail="Failed to add player to the game")
-    await manager.broadcast(json.dumps({"event": "update"}), game_id)
+    log.info("player_joined", game_id=game_id, player=new_player.number)
+    game = actor.game
     return {
         "message": f"Player '{new_player.name}' joined lobby '{game.name}'",
         "player_id": new_player.uuid  # Wichtig: Die ID des neuen Spielers zurückgeben
     }
 
 @router.get("/list")
-def get_all_lobbies(game_manager: GameManager = Depends(get_game_manager)):
+async def get_all_lobbies(offset: int = Query(0, ge=0), limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          filter: str = Query("all", pattern="^(" + "|".join(LOBBY_FILTERS) + ")$"),
+                          name: str = Query(""), min_players: int = Query(0, ge=0),
+                          game_manager: GameManager = Depends(get_game_manager)):
+    """
+    Returns one page of lobby summaries: {"lobbies": [...], "total", "offset", "limit", "version"}.
+    filter "open" skips started games, "joinable" also full ones; name matches case-insensitively.
+    The summaries are kept up to date by the game manager, a page is encoded once until a lobby changes.
+    """
+    page = game_manager.lobby_index.page(offset, limit, filter, name, min_players)
+    return Response(page, media_type="application/json")
+
+
+@router.websocket("/ws")
+async def lobby_feed(websocket: WebSocket):
     """
-    Returns a list of all active game lobbies.
+    Pushes every change of the lobby list: lobby_created, lobby_joined, lobby_started, lobby_updated
+    and lobby_closed, each with the version of the list (see LobbyIndex).
+    A client loads /lobby/list after connecting and skips the events up to the version of that page.
     """
-    return game_manager.games
\ No newline at end of file
+    await manager.connect(websocket, LOBBY_FEED_ID, "")
+    try:
+        while True:
+            # Der Feed sendet nur, Nachrichten des Clients werden ignoriert
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, LOBBY_FEED_ID)
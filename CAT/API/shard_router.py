@@ -0,0 +1,379 @@
+"""
+Runs the API as several worker processes behind one front process:
+
+    python -m CAT.API.shard_router --shards 4
+
+Every worker is a normal uvicorn server on API_PORT + 1 + index and owns the games whose id
+hashes to its index (CAT/manager/sharding.py), create_game only hands out such ids.
+The front process listens on API_PORT and routes by the game id in the path:
+/game/{id}/..., /game/ws/{id}/... and /lobby/{id}/join go to the owner, everything else to any worker.
+Two routes span all games and are answered by the front itself:
+/lobby/list merges the pages of all workers and /lobby/ws merges their lobby feeds.
+
+The front only copies bytes, one HTTP request per client connection, so it needs no dependencies.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from CAT.manager.lobby_index import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from CAT.manager.sharding import shard_of
+
+# Größte erlaubte Kopfzeilen einer Anfrage
+HEAD_LIMIT = 64 * 1024
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_BINARY, WS_CONTINUATION, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x2, 0x0, 0x8, 0x9, 0xA
+# seconds the workers get to start listening
+STARTUP_TIMEOUT = 30
+
+
+class ShardRouter:
+    def __init__(self, shards: list[tuple[str, int]]):
+        # (host, port) of every worker, the position in the list is the shard index
+        self.shards = shards
+        self._next = itertools.count()
+
+    def shard_for(self, path: str) -> int:
+        """The owner of the game in the path, otherwise the next worker in turn."""
+        parts = path.strip("/").split("/")
+        game_id = None
+        if len(parts) >= 3 and parts[:2] == ["game", "ws"]:
+            game_id = parts[2]
+        elif len(parts) >= 3 and parts[0] in ("game", "lobby"):
+            game_id = parts[1]
+        if game_id:
+            return shard_of(game_id, len(self.shards))
+        return next(self._next) % len(self.shards)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            path = urlsplit(target).path
+            upgrade = headers.get("upgrade", "").lower() == "websocket"
+
+            if path == "/lobby/list" and method == "GET":
+                await self._lobby_list(reader, writer, head, target)
+            elif path == "/lobby/ws" and upgrade:
+                await self._lobby_feed(reader, writer, headers)
+            else:
+                await self._forward(reader, writer, head, self.shard_for(path), upgrade)
+        except ConnectionRefusedError:
+            _write_error(writer, "502 Bad Gateway")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            # kaputte oder abgebrochene Anfrage
+            pass
+        finally:
+            writer.close()
+
+    async def _forward(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, head: bytes,
+                       shard: int, upgrade: bool):
+        """Passes the request to a worker and copies both directions until the worker closes."""
+        upstream_reader, upstream_writer = await asyncio.open_connection(*self.shards[shard], limit=HEAD_LIMIT)
+        try:
+            if not upgrade:
+                # one request per connection, so the answer of the worker ends with its connection
+                head = _with_header(_without_header(head, b"connection"), b"Connection: close")
+            upstream_writer.write(head)
+            # the body of the request follows the head
+            to_upstream = asyncio.create_task(_pipe(reader, upstream_writer))
+            try:
+                response_head = await upstream_reader.readuntil(b"\r\n\r\n")
+                if not upgrade:
+                    # the workers do not announce that they close, the client must not reuse the connection
+                    response_head = _with_header(_without_header(response_head, b"connection"), b"connection: close")
+                writer.write(response_head)
+                await _pipe(upstream_reader, writer)
+            finally:
+                to_upstream.cancel()
+        finally:
+            upstream_writer.close()
+
+    async def _get(self, shard: int, target: str) -> tuple[int, bytes, bytes]:
+        """A GET request to a worker, returns the status, the raw response and the body."""
+        reader, writer = await asyncio.open_connection(*self.shards[shard])
+        try:
+            host, port = self.shards[shard]
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split(b" ", 2)[1]), response, _dechunk(head, body)
+
+    async def _lobby_list(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, head: bytes,
+                          target: str):
+        """
+        Merges the lists of all workers into one page in creation order. Each worker is asked for the
+        first offset + limit matching lobbies, so pages far down the list cost more than the first ones.
+        The page carries the versions of all shards: {"lobbies", "total", "offset", "limit", "versions"}.
+        """
+        query = dict(parse_qsl(urlsplit(target).query, keep_blank_values=True))
+        try:
+            offset = int(query.get("offset", 0))
+            limit = int(query.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            offset, limit = -1, -1
+        if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+            # invalid, the worker answers with its validation error
+            await self._forward(reader, writer, head, self.shard_for(""), False)
+            return
+
+        pages = await asyncio.gather(*(self._shard_lobbies(shard, query, offset + limit)
+                                       for shard in range(len(self.shards))))
+        for page in pages:
+            if isinstance(page, bytes):
+                writer.write(page)
+                return
+        lobbies = heapq.merge(*(page["lobbies"] for page in pages), key=lambda lobby: lobby["created_at"])
+        body = json.dumps({
+            "lobbies": list(itertools.islice(lobbies, offset, offset + limit)),
+            "total": sum(page["total"] for page in pages),
+            "offset": offset,
+            "limit": limit,
+            "versions": {shard: page["version"] for shard, page in enumerate(pages)},
+        }, separators=(",", ":")).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\naccess-control-allow-origin: *\r\n"
+                     b"content-length: %d\r\nconnection: close\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+
+    async def _shard_lobbies(self, shard: int, query: dict, needed: int) -> dict | bytes:
+        """The first needed lobbies of a worker, or its raw response if it failed."""
+        lobbies = []
+        version = None
+        while True:
+            page_query = {**query, "offset": len(lobbies), "limit": min(needed - len(lobbies), MAX_PAGE_SIZE)}
+            status, response, body = await self._get(shard, "/lobby/list?" + urlencode(page_query))
+            if status != 200:
+                return response
+            page = json.loads(body)
+            lobbies += page["lobbies"]
+            # events after the first page are applied again by the client, that is harmless
+            version = page["version"] if version is None else version
+            if len(lobbies) >= min(needed, page["total"]) or not page["lobbies"]:
+                return {"lobbies": lobbies, "total": page["total"], "version": version}
+
+    async def _lobby_feed(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: dict):
+        """
+        Accepts the WebSocket of the client itself and relays the events of the lobby feeds of all
+        workers to it, each event carries the shard it belongs to. If a worker's feed ends,
+        the client is disconnected, it reconnects and reloads the list.
+        """
+        key = headers.get("sec-websocket-key")
+        if not key:
+            _write_error(writer, "400 Bad Request")
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+        client = asyncio.create_task(_answer_client(reader, writer))
+        tasks = [client] + [asyncio.create_task(self._relay_feed(shard, writer)) for shard in range(len(self.shards))]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if client not in done:
+            # 1011: ein Worker ist weg
+            writer.write(_ws_frame(WS_CLOSE, (1011).to_bytes(2, "big")))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _relay_feed(self, shard: int, writer: asyncio.StreamWriter):
+        host, port = self.shards[shard]
+        try:
+            reader, upstream = await asyncio.open_connection(host, port)
+        except OSError:
+            return
+        try:
+            key = base64.b64encode(os.urandom(16)).decode()
+            upstream.write((f"GET /lobby/ws HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n")
+                           .encode())
+            response = await reader.readuntil(b"\r\n\r\n")
+            if response.split(b" ", 2)[1] != b"101":
+                return
+            message = b""
+            while True:
+                fin, opcode, payload = await _read_ws_frame(reader)
+                if opcode == WS_PING:
+                    # frames of a client have to be masked
+                    upstream.write(_ws_frame(WS_PONG, payload, mask=True))
+                elif opcode == WS_CLOSE:
+                    return
+                elif opcode in (WS_TEXT, WS_BINARY, WS_CONTINUATION):
+                    # fragments are joined, so the messages of the workers cannot interleave
+                    message += payload
+                    if opcode != WS_CONTINUATION:
+                        message_opcode = opcode
+                    if fin:
+                        writer.write(_ws_frame(message_opcode, message))
+                        message = b""
+                        await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            upstream.close()
+
+
+async def _answer_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Reads the frames of a feed client until it closes, the feed ignores its messages."""
+    try:
+        while True:
+            _, opcode, payload = await _read_ws_frame(reader)
+            if opcode == WS_PING:
+                writer.write(_ws_frame(WS_PONG, payload))
+            elif opcode == WS_CLOSE:
+                writer.write(_ws_frame(WS_CLOSE, payload[:2]))
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+
+
+async def _read_ws_frame(reader: asyncio.StreamReader) -> tuple[bool, int, bytes]:
+    """Reads one WebSocket frame: (fin, opcode, unmasked payload)."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = _apply_mask(payload, mask)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+def _ws_frame(opcode: int, payload: bytes, mask: bool = False) -> bytes:
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if len(payload) < 126:
+        header.append(mask_bit | len(payload))
+    elif len(payload) < 1 << 16:
+        header.append(mask_bit | 126)
+        header += len(payload).to_bytes(2, "big")
+    else:
+        header.append(mask_bit | 127)
+        header += len(payload).to_bytes(8, "big")
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _apply_mask(payload, key)
+    return bytes(header) + payload
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+    except ConnectionError:
+        writer.close()
+
+
+def _without_header(head: bytes, name: bytes) -> bytes:
+    lines = head[:-4].split(b"\r\n")
+    kept = [lines[0]] + [line for line in lines[1:] if line.split(b":", 1)[0].strip().lower() != name]
+    return b"\r\n".join(kept) + b"\r\n\r\n"
+
+
+def _with_header(head: bytes, header: bytes) -> bytes:
+    return head[:-2] + header + b"\r\n\r\n"
+
+
+def _dechunk(head: bytes, body: bytes) -> bytes:
+    if b"transfer-encoding: chunked" not in head.lower():
+        return body
+    chunks = []
+    while True:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size.split(b";")[0], 16)
+        if size == 0:
+            return b"".join(chunks)
+        chunks.append(body[:size])
+        body = body[size + 2:]
+
+
+def _write_error(writer: asyncio.StreamWriter, status: str):
+    writer.write(f"HTTP/1.1 {status}\r\ncontent-length: 0\r\nconnection: close\r\n\r\n".encode())
+
+
+async def _wait_for_workers(shards: list[tuple[str, int]]):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STARTUP_TIMEOUT
+    for host, port in shards:
+        while True:
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                break
+            except OSError:
+                if loop.time() > deadline:
+                    raise RuntimeError(f"Worker on port {port} did not start.")
+                await asyncio.sleep(0.1)
+
+
+async def serve(router: ShardRouter, host: str, port: int):
+    await _wait_for_workers(router.shards)
+    server = await asyncio.start_server(router.handle, host, port, limit=HEAD_LIMIT)
+    print(f"Front process on http://{host}:{port}, {len(router.shards)} shards", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the API as shard workers behind one front process.")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", 7777)),
+                        help="port of the front process, the workers use the following ports")
+    args = parser.parse_args()
+
+    # the pages of every worker have to point the browser at the front process
+    base_url = os.getenv("API_BASE_URL", f"http://{args.host}:{args.port}")
+    shards = [("127.0.0.1", args.port + 1 + index) for index in range(args.shards)]
+    workers = []
+    for index, (host, port) in enumerate(shards):
+        env = {**os.environ, "CAT_SHARDS": str(args.shards), "CAT_SHARD_INDEX": str(index), "API_BASE_URL": base_url}
+        workers.append(subprocess.Popen([sys.executable, "-m", "uvicorn", "CAT.API.pages_connection_api:app",
+                                         "--host", host, "--port", str(port)], env=env))
+    # stopped like a single server, the workers are stopped with the front process
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        asyncio.run(serve(ShardRouter(shards), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Compact binary encoding of the game state and its deltas, negotiated per client.
+
+Static data (names, colors, uuids, card texts) is sent once as JSON metadata, see WireEncoder.meta.
+The frames only hold small integers, little-endian:
+
+state frame
+    B   FRAME_STATE
+    I   state version
+    B   flags: STATE_STARTED | STATE_OVER
+    B   number of players
+    b   current player index (-1 before the start)
+    H   round number
+    i   remaining turn time in seconds, -1 if none
+    I   turn duration
+    B   kind id of the last played card, NO_CARD if none
+    per player:  B flags (PLAYER_ACTIVE), H number of cards, B position of every figure
+    H   number of cards in the own hand (NO_HAND for spectators), then B kind id per card
+
+delta frame
+    B   FRAME_DELTA
+    I   base version, I version
+    H   mask of the DELTA_* sections that follow, in this order:
+    DELTA_FIGURES            B count, then B figure id, B position per moved figure
+    DELTA_PLAYERS            B count, then B number, B flags (PLAYER_ACTIVE, PLAYER_JOINED), H cards
+    DELTA_NUMBER_OF_PLAYERS  B
+    DELTA_CURRENT_PLAYER     b
+    DELTA_ROUND              H
+    DELTA_STARTED            B
+    DELTA_OVER               B
+    DELTA_LAST_CARD          B kind id or NO_CARD
+    DELTA_TIMER              i remaining turn time (-1 if none), I turn duration
+    DELTA_HAND               H count, then B kind id per card
+
+Card counts are two bytes, kicked players are still dealt cards and their hands keep growing.
+Positions are one byte: 0 at home, 1 + tile on the ring, NUMBER_OF_FIELDS + 1 + slot in the finishing zone.
+CAT/scripts/services/wire_format.js decodes the frames back into the JSON shapes.
+"""
+from __future__ import annotations
+import struct
+import typing
+
+from CAT.classes.board import FINISH_OFFSET
+from CAT.classes.cards import CARD_KIND_IDS, HAND_CARD_KINDS
+from CAT.config import FIGURES_PER_PLAYER, NUMBER_OF_FIELDS
+
+if typing.TYPE_CHECKING:
+    from CAT.classes.game import Game
+
+# Media type of the state endpoint and value of the format query parameter of the WebSocket
+MEDIA_TYPE = "application/x-cat-state"
+FORMAT_NAME = "binary"
+
+FRAME_STATE = 1
+FRAME_DELTA = 2
+
+STATE_STARTED = 1
+STATE_OVER = 2
+PLAYER_ACTIVE = 1
+PLAYER_JOINED = 2
+NO_CARD = 0xFF
+NO_HAND = 0xFFFF
+
+DELTA_FIGURES = 1 << 0
+DELTA_PLAYERS = 1 << 1
+DELTA_NUMBER_OF_PLAYERS = 1 << 2
+DELTA_CURRENT_PLAYER = 1 << 3
+DELTA_ROUND = 1 << 4
+DELTA_STARTED = 1 << 5
+DELTA_OVER = 1 << 6
+DELTA_LAST_CARD = 1 << 7
+DELTA_TIMER = 1 << 8
+DELTA_HAND = 1 << 9
+
+_STATE_HEADER = struct.Struct("<BIBBbHiIB")
+_DELTA_HEADER = struct.Struct("<BIIH")
+_TIMER = struct.Struct("<iI")
+_ROUND = struct.Struct("<H")
+_CARD_COUNT = struct.Struct("<H")
+_PLAYER_ENTRY = struct.Struct("<BH")
+_DELTA_PLAYER = struct.Struct("<BBH")
+
+
+def encode_position(position: int) -> int:
+    if position < 0:
+        return 0
+    if position < NUMBER_OF_FIELDS:
+        return position + 1
+    return NUMBER_OF_FIELDS + 1 + position % FINISH_OFFSET
+
+
+def _card_kind(card: dict | None) -> int:
+    return NO_CARD if card is None else CARD_KIND_IDS[card["name"]]
+
+
+def _hand(cards: list[dict]) -> bytes:
+    return _CARD_COUNT.pack(len(cards)) + bytes(CARD_KIND_IDS[card["name"]] for card in cards)
+
+
+class WireEncoder:
+    """Binary frames for the clients of one game, see the module docstring for the layout."""
+
+    def __init__(self, game: Game):
+        self.game = game
+
+    def meta(self, perspective_player_id: str | None = None) -> dict:
+        """The static part of the state, changes only when a player joins."""
+        game = self.game
+        return {
+            "uuid": game.uuid,
+            "name": game.name,
+            "host_id": game.host_id,
+            "number_of_fields": NUMBER_OF_FIELDS,
+            "finish_offset": FINISH_OFFSET,
+            "figures_per_player": FIGURES_PER_PLAYER,
+            # only the requester learns its own uuid, like in Game.to_json
+            "players": [{"number": player.number, "name": player.name, "color": player.color,
+                         "uuid": player.uuid if player.uuid == perspective_player_id else None}
+                        for player in game.players],
+            "figures": [{"id": figure.id, "uuid": figure.uuid, "color": figure.color, "owner": figure.owner.number}
+                        for figure in game.figures],
+            "card_kinds": [card.to_json() for card in HAND_CARD_KINDS],
+        }
+
+    def encode_state(self, perspective_player_id: str | None = None) -> bytes:
+        game = self.game
+        remaining_time = game.remaining_turn_time()
+        last_card = game.last_played_card
+        parts = [_STATE_HEADER.pack(
+            FRAME_STATE,
+            game.state_version,
+            (STATE_STARTED if game.game_started else 0) | (STATE_OVER if game.game_over else 0),
+            game.number_of_players,
+            game.current_player_index,
+            game.round_number,
+            -1 if remaining_time is None else remaining_time,
+            game.TURN_DURATION,
+            NO_CARD if last_card is None else CARD_KIND_IDS[last_card.name],
+        )]
+        for player in game.players:
+            parts.append(_PLAYER_ENTRY.pack(PLAYER_ACTIVE if player.is_active else 0, len(player.cards)))
+            parts.append(bytes(encode_position(figure.position) for figure in player.figures))
+
+        viewer = game.get_player_by_uuid(perspective_player_id) if perspective_player_id else None
+        if viewer is None:
+            parts.append(_CARD_COUNT.pack(NO_HAND))
+        else:
+            parts.append(_CARD_COUNT.pack(len(viewer.cards)))
+            parts.append(bytes(CARD_KIND_IDS[card.name] for card in viewer.cards))
+        return b"".join(parts)
+
+    def encode_delta(self, delta: dict, hand: list[dict] | None = None) -> bytes:
+        """Encodes a delta of Game.state_delta, hand is the requester's private hand if it changed."""
+        game = self.game
+        mask = 0
+        parts = []
+
+        figures = delta.get("figures")
+        if figures:
+            mask |= DELTA_FIGURES
+            moved = [game.get_figure_by_uuid(figure_uuid) for figure_uuid in figures]
+            parts.append(bytes((len(moved), *(value for figure, position in zip(moved, figures.values())
+                                              for value in (figure.id, encode_position(position))))))
+
+        players = delta.get("players")
+        if players:
+            mask |= DELTA_PLAYERS
+            parts.append(bytes((len(players),)))
+            for player in players:
+                cards = player["cards"]
+                flags = (PLAYER_ACTIVE if player["is_active"] else 0) | (PLAYER_JOINED if "name" in player else 0)
+                parts.append(_DELTA_PLAYER.pack(player["number"], flags, cards if isinstance(cards, int) else len(cards)))
+
+        if "number_of_players" in delta:
+            mask |= DELTA_NUMBER_OF_PLAYERS
+            parts.append(bytes((delta["number_of_players"],)))
+        if "current_player_index" in delta:
+            mask |= DELTA_CURRENT_PLAYER
+            parts.append(delta["current_player_index"].to_bytes(1, "little", signed=True))
+        if "round_number" in delta:
+            mask |= DELTA_ROUND
+            parts.append(_ROUND.pack(delta["round_number"]))
+        if "game_started" in delta:
+            mask |= DELTA_STARTED
+            parts.append(bytes((delta["game_started"],)))
+        if "game_over" in delta:
+            mask |= DELTA_OVER
+            parts.append(bytes((delta["game_over"],)))
+        if "last_played_card" in delta:
+            mask |= DELTA_LAST_CARD
+            parts.append(bytes((_card_kind(delta["last_played_card"]),)))
+        if "remaining_turn_time" in delta:
+            mask |= DELTA_TIMER
+            remaining_time = delta["remaining_turn_time"]
+            parts.append(_TIMER.pack(-1 if remaining_time is None else remaining_time, delta["turn_duration"]))
+        if hand is not None:
+            mask |= DELTA_HAND
+            parts.append(_hand(hand))
+
+        return _DELTA_HEADER.pack(FRAME_DELTA, delta["base_version"], delta["version"], mask) + b"".join(parts)
@@ -0,0 +1,148 @@
+"""
+Benchmarks of the FastAPI routes of CAT/API/routers/game.py and lobby.py, of the WebSocket actions and the HTML pages.
+Requests go through an in-process ASGI client, so the timings contain routing, validation,
+the handler and the JSON encoding, but no sockets.
+"""
+import copy
+import json
+
+try:
+    import httpx
+except ImportError as e:
+    raise ImportError("The HTTP benchmarks need httpx, install it with 'pip install -r requirements-dev.txt'.") from e
+
+from CAT.API import wire_format
+from CAT.API.dependencies import get_game_manager
+from CAT.API.pages_connection_api import app
+from CAT.API.routers.game import _answer_socket_message
+from CAT.benchmarks.runner import Benchmark
+from CAT.benchmarks.scenarios import SCENARIOS, build_scenario, new_game
+from CAT.config import MAX_PLAYERS
+from CAT.manager.game_manager import GameManager
+
+SCENARIO_SEED = 0
+# Open lobbies while timing the lobby list
+LISTED_LOBBIES = 50
+
+
+def _client() -> httpx.AsyncClient:
+    # ASGITransport does not run the lifespan, so the timer task of the application stays off
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+
+def _use_manager(game_manager: GameManager):
+    """Serves the routes from game_manager, every benchmark brings its own games."""
+    app.dependency_overrides[get_game_manager] = lambda: game_manager
+
+
+def _register(game_manager: GameManager, game):
+    return game_manager.add_game(game)
+
+
+def _get(client: httpx.AsyncClient, game_manager: GameManager, url: str, params: dict | None = None,
+         headers: dict | None = None):
+    async def request():
+        _use_manager(game_manager)
+        response = await client.get(url, params=params, headers=headers)
+        # 304 counts as success, raise_for_status would reject it
+        if response.is_error:
+            response.raise_for_status()
+    return request
+
+
+def _post(client: httpx.AsyncClient, game_manager: GameManager, make_request):
+    """
+    Benchmark for a route that changes the game: make_request() prepares the games and returns (url, body),
+    only the request itself is timed.
+    """
+    def setup():
+        _use_manager(game_manager)
+        return make_request()
+
+    async def request(state):
+        url, body = state
+        response = await client.post(url, json=body)
+        response.raise_for_status()
+    return setup, request
+
+
+def http_benchmarks() -> list[Benchmark]:
+    client = _client()
+    game_manager = GameManager()
+    benchmarks = []
+
+    for scenario in SCENARIOS:
+        game = _register(game_manager, build_scenario(scenario, SCENARIO_SEED))
+        player = game.players[game.current_player_index]
+        benchmarks.append(Benchmark(f"http.get_state[{scenario}]",
+                                    _get(client, game_manager, f"/game/{game.uuid}/state", {"player_id": player.uuid})))
+        benchmarks.append(Benchmark(f"http.get_state_binary[{scenario}]",
+                                    _get(client, game_manager, f"/game/{game.uuid}/state", {"player_id": player.uuid},
+                                         {"Accept": wire_format.MEDIA_TYPE})))
+        # a polling client that already has the current version
+        benchmarks.append(Benchmark(f"http.get_state_not_modified[{scenario}]",
+                                    _get(client, game_manager, f"/game/{game.uuid}/state", {"player_id": player.uuid},
+                                         {"If-None-Match": f'"{game.state_version}"'})))
+        benchmarks.append(Benchmark(f"http.get_legal_moves[{scenario}]",
+                                    _get(client, game_manager, f"/game/{game.uuid}/legal_moves",
+                                         {"player_id": player.uuid})))
+
+        def play_request(game=game):
+            clone = _register(game_manager, copy.deepcopy(game))
+            current = clone.players[clone.current_player_index]
+            move = clone.generate_legal_moves(current)[0]
+            return f"/game/{clone.uuid}/play", {"player_uuid": current.uuid, **move}
+        setup, request = _post(client, game_manager, play_request)
+        benchmarks.append(Benchmark(f"http.play[{scenario}]", request, setup=setup))
+
+        # the same move as WebSocket action, without the socket itself
+        def socket_play_request(game=game):
+            url, body = play_request(game)
+            game_id = url.split("/")[2]
+            player_id = body.pop("player_uuid")
+            return json.dumps({"action": "play", "request_id": 1, **body}), game_id, player_id
+
+        async def socket_play(state):
+            text, game_id, player_id = state
+            reply = await _answer_socket_message(text, game_id, player_id, game_manager)
+            if reply["event"] != "ack":
+                raise RuntimeError(reply["detail"])
+        benchmarks.append(Benchmark(f"socket.play[{scenario}]", socket_play, setup=socket_play_request))
+
+    def start_request():
+        game = _register(game_manager, new_game(SCENARIO_SEED, started=False))
+        return f"/game/{game.uuid}/start", None
+    setup, request = _post(client, game_manager, start_request)
+    benchmarks.append(Benchmark("http.start", request, setup=setup))
+
+    def vote_kick_request():
+        game = _register(game_manager, new_game(SCENARIO_SEED))
+        return f"/game/{game.uuid}/vote_kick", {"voter_uuid": game.players[0].uuid, "player_to_kick_number": 1}
+    setup, request = _post(client, game_manager, vote_kick_request)
+    benchmarks.append(Benchmark("http.vote_kick", request, setup=setup))
+
+    benchmarks.append(Benchmark("http.card_types", _get(client, game_manager, "/game/card_types")))
+
+    def create_request():
+        return "/lobby/create", {"lobby_name": "benchmark", "player_input": {"player_name": "host"}}
+    setup, request = _post(client, game_manager, create_request)
+    benchmarks.append(Benchmark("http.lobby_create", request, setup=setup))
+
+    def join_request():
+        game = _register(game_manager, new_game(SCENARIO_SEED, players=MAX_PLAYERS - 1, started=False))
+        return f"/lobby/{game.uuid}/join", {"player_name": "guest"}
+    setup, request = _post(client, game_manager, join_request)
+    benchmarks.append(Benchmark("http.lobby_join", request, setup=setup))
+
+    # the lobby list gets its own manager, the other benchmarks keep adding games to theirs
+    lobby_manager = GameManager()
+    for index in range(LISTED_LOBBIES):
+        _register(lobby_manager, new_game(SCENARIO_SEED + index, players=1 + index % MAX_PLAYERS, started=False))
+    benchmarks.append(Benchmark(f"http.lobby_list[{LISTED_LOBBIES} lobbies]", _get(client, lobby_manager, "/lobby/list")))
+
+    # the landing page like a browser loads it, the client decompresses it
+    benchmarks.append(Benchmark("http.page[/]", _get(client, game_manager, "/", headers={"Accept-Encoding": "gzip"})))
+    benchmarks.append(Benchmark("http.page_not_modified[/]",
+                                _get(client, game_manager, "/", headers={"Accept-Encoding": "gzip",
+                                                                         "If-None-Match": "*"})))
+    return benchmarks
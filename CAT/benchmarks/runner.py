@@ -0,0 +1,236 @@
+"""
+Runs the benchmark suite and writes the timings as JSON, or compares two such files.
+The suite needs the packages of requirements-dev.txt (httpx for the HTTP benchmarks).
+
+    python -m CAT.benchmarks.runner run --output before.json
+    python -m CAT.benchmarks.runner run --filter rules. --output after.json
+    python -m CAT.benchmarks.runner compare before.json after.json --threshold 0.1
+"""
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable
+
+# Samples per benchmark and the minimum duration of one sample, short sections are looped
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME = 0.05
+# Relative change of the median that counts as a regression or an improvement
+DEFAULT_THRESHOLD = 0.1
+RESULT_FORMAT_VERSION = 1
+
+
+class Benchmark:
+    """
+    One timed section. Without setup the function is called without arguments and looped until a sample
+    takes min_time. With setup every sample gets a fresh state from setup(), which is not timed,
+    and the function is called once with it. Both may be coroutine functions.
+    """
+
+    def __init__(self, name: str, function: Callable, setup: Callable[[], Any] | None = None):
+        self.name = name
+        self.function = function
+        self.setup = setup
+
+
+class BenchmarkResult:
+    def __init__(self, name: str, loops: int, samples: list[float]):
+        self.name = name
+        self.loops = loops
+        # seconds per call
+        self.samples = samples
+
+    def to_json(self):
+        return {
+            "loops": self.loops,
+            "samples": self.samples,
+            "min": min(self.samples),
+            "median": statistics.median(self.samples),
+            "mean": statistics.fmean(self.samples),
+            "stdev": statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0,
+        }
+
+
+async def _call(function: Callable, *args):
+    result = function(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _time_loops(function: Callable, loops: int) -> float:
+    start = time.perf_counter()
+    if inspect.iscoroutinefunction(function):
+        for _ in range(loops):
+            await function()
+    else:
+        for _ in range(loops):
+            function()
+    return time.perf_counter() - start
+
+
+async def measure(benchmark: Benchmark, repeat: int = DEFAULT_REPEAT,
+                  min_time: float = DEFAULT_MIN_TIME) -> BenchmarkResult:
+    """Times the benchmark like timeit: one warm-up call, garbage collection off while a sample runs."""
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    try:
+        if benchmark.setup is None:
+            await _call(benchmark.function)
+            loops = 1
+            gc.disable()
+            while await _time_loops(benchmark.function, loops) < min_time:
+                loops *= 2
+            gc.enable()
+            for _ in range(repeat):
+                gc.disable()
+                samples.append(await _time_loops(benchmark.function, loops) / loops)
+                gc.enable()
+        else:
+            loops = 1
+            await _call(benchmark.function, await _setup(benchmark))
+            for _ in range(repeat):
+                state = await _setup(benchmark)
+                gc.collect()
+                gc.disable()
+                start = time.perf_counter()
+                await _call(benchmark.function, state)
+                samples.append(time.perf_counter() - start)
+                gc.enable()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return BenchmarkResult(benchmark.name, loops, samples)
+
+
+async def _setup(benchmark: Benchmark):
+    state = benchmark.setup()
+    if inspect.isawaitable(state):
+        state = await state
+    return state
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(benchmarks: list[Benchmark], repeat: int = DEFAULT_REPEAT,
+                         min_time: float = DEFAULT_MIN_TIME, progress=None) -> dict:
+    """Runs the benchmarks in one event loop and returns the machine-readable result."""
+    results = {}
+    for benchmark in benchmarks:
+        result = await measure(benchmark, repeat, min_time)
+        results[benchmark.name] = result.to_json()
+        if progress:
+            progress(benchmark.name, results[benchmark.name])
+    return {
+        "version": RESULT_FORMAT_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "repeat": repeat,
+            "min_time": min_time,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare_results(base: dict, head: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Compares the medians of the benchmarks both results contain.
+    A benchmark is "slower" or "faster" if its median changed by more than threshold, otherwise "same".
+    """
+    rows = []
+    for name, head_result in head["benchmarks"].items():
+        base_result = base["benchmarks"].get(name)
+        if base_result is None:
+            continue
+        ratio = head_result["median"] / base_result["median"] if base_result["median"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "same"
+        rows.append({"name": name, "base": base_result["median"], "head": head_result["median"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+def _format_time(seconds: float) -> str:
+    for unit, factor in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds >= 1 / factor:
+            return f"{seconds * factor:.3f} {unit}"
+    return f"{seconds * 1e9:.1f} ns"
+
+
+def _print_progress(name: str, result: dict):
+    print(f"{name:<60} {_format_time(result['median']):>12}  (+/- {_format_time(result['stdev'])})",
+          file=sys.stderr)
+
+
+def _run_command(args):
+    # imported here, so comparing results does not need the game and API modules
+    from CAT.benchmarks.suite import collect_benchmarks
+
+    benchmarks = [benchmark for benchmark in collect_benchmarks()
+                  if not args.filter or any(part in benchmark.name for part in args.filter)]
+    result = asyncio.run(run_benchmarks(benchmarks, args.repeat, args.min_time, progress=_print_progress))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def _compare_command(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    rows = compare_results(base, head, args.threshold)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            print(f"{row['name']:<60} {_format_time(row['base']):>12} -> {_format_time(row['head']):>12}"
+                  f"  x{row['ratio']:.2f}  {row['status']}")
+    if args.fail_on_regression and any(row["status"] == "slower" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the rules engine, serialization and HTTP routes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the timings as JSON")
+    run_parser.add_argument("--filter", nargs="*", default=[], help="only run benchmarks whose name contains one of these")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="samples per benchmark")
+    run_parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="minimum seconds per sample")
+    run_parser.add_argument("--output", default=None, help="file for the JSON result, defaults to stdout")
+    run_parser.set_defaults(handler=_run_command)
+
+    compare_parser = commands.add_parser("compare", help="compare two results, e.g. of two commits")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="relative change of the median that is reported")
+    compare_parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    compare_parser.add_argument("--fail-on-regression", action="store_true", help="exit with 1 if anything got slower")
+    compare_parser.set_defaults(handler=_compare_command)
+
+    args = parser.parse_args()
+    args.handler(args)
@@ -0,0 +1,90 @@
+"""
+Reproducible game positions for the benchmarks. Every scenario is built from a seed,
+so the same seed gives the same board and the same hands on every commit.
+"""
+import random
+
+from CAT.classes.board import FINISH_OFFSET
+from CAT.classes.cards import InfernoCard, JokerCard, StandardCard
+from CAT.classes.game import Game
+from CAT.classes.player import Player
+from CAT.config import MAX_PLAYERS
+from CAT.simulation.policies import RandomPolicy
+
+SCENARIOS = ("early", "mid", "late", "inferno")
+
+# Turns played for the mid game, the late game runs until a player has this many figures in the finish
+MID_GAME_TURNS = 120
+LATE_GAME_FINISHED_FIGURES = 3
+LATE_GAME_MAX_TURNS = 2000
+
+# Inferno scenario: four own figures on the ring with opponents in between
+INFERNO_OWN_POSITIONS = (3, 9, 20, 34)
+INFERNO_OTHER_POSITIONS = {1: (5, 24), 2: (12, 44), 3: (30, 50)}
+# A slow benchmark run must not run into the turn timer, finite so the state still serializes to JSON
+BENCHMARK_TURN_DURATION = 24 * 60 * 60
+
+
+def new_game(seed: int, players: int = MAX_PLAYERS, started: bool = True) -> Game:
+    """Creates a game with the given number of players, the deck is shuffled from the seed."""
+    # the seed of the deck is drawn from the module random generator
+    random.seed(seed)
+    game = Game("benchmark", [Player("seat 0", 0)])
+    for seat in range(1, players):
+        game.add_player(f"seat {seat}")
+    game.TURN_DURATION = BENCHMARK_TURN_DURATION
+    if started:
+        game.start_game_and_deal_cards()
+    return game
+
+
+def play_random_turns(game: Game, rng: random.Random, max_turns: int, until=None) -> int:
+    """Plays random legal moves until max_turns, the game is over or until(game) holds. Returns the played turns."""
+    policy = RandomPolicy(rng)
+    turns = 0
+    while turns < max_turns and not game.game_over and not (until and until(game)):
+        player = game.players[game.current_player_index]
+        moves = game.generate_legal_moves(player)
+        if not moves:
+            break
+        move = policy.choose_move(game, player, moves)
+        game.play_card(player, move["card_index"], move["action_details"])
+        turns += 1
+    return turns
+
+
+def _has_finished_figures(game: Game) -> bool:
+    return any(sum(figure.position >= FINISH_OFFSET for figure in player.figures) >= LATE_GAME_FINISHED_FIGURES
+               for player in game.players)
+
+
+def build_scenario(name: str, seed: int = 0) -> Game:
+    """
+    Builds one of SCENARIOS:
+    early   - cards just dealt, every figure at home
+    mid     - MID_GAME_TURNS random turns played
+    late    - random turns until a player has LATE_GAME_FINISHED_FIGURES figures in the finish
+    inferno - the current player has all four figures on the ring and holds an Inferno Card and a Joker
+    """
+    game = new_game(seed)
+    rng = random.Random(seed)
+    if name == "early":
+        pass
+    elif name == "mid":
+        play_random_turns(game, rng, MID_GAME_TURNS)
+    elif name == "late":
+        play_random_turns(game, rng, LATE_GAME_MAX_TURNS, until=_has_finished_figures)
+    elif name == "inferno":
+        player = game.players[game.current_player_index]
+        for figure, position in zip(player.figures, INFERNO_OWN_POSITIONS):
+            game._place_figure(figure, position)
+        for number, positions in INFERNO_OTHER_POSITIONS.items():
+            for figure, position in zip(game.players[number].figures, positions):
+                game._place_figure(figure, position)
+        for card in player.discard_cards():
+            game.deck.add_to_discard(card)
+        for card in (InfernoCard(), JokerCard(), StandardCard(5)):
+            player.add_card(card)
+    else:
+        raise ValueError(f"Unknown scenario {name}. Must be one of {SCENARIOS}.")
+    return game
@@ -0,0 +1,124 @@
+"""
+The benchmark definitions: rules engine, dealing, serialization, full simulated and replayed games and the HTTP routes.
+Names are "<group>.<section>[<scenario>]", the same name always times the same seeded work.
+"""
+import copy
+import random
+
+from CAT.benchmarks.runner import Benchmark
+from CAT.benchmarks.scenarios import SCENARIOS, LATE_GAME_MAX_TURNS, build_scenario, new_game, play_random_turns
+from CAT.classes.deck import Deck
+from CAT.classes.player import Player
+from CAT.config import MAX_PLAYERS
+from CAT.manager.replay import GameRecording, GameReplay
+from CAT.simulation.simulator import simulate_game
+
+SCENARIO_SEED = 0
+# Games played by one sample of the simulation benchmark
+SIMULATED_GAMES = 3
+
+
+def _fresh_copy(game):
+    """Setup for benchmarks that change the game or depend on cold caches."""
+    def setup():
+        clone = copy.deepcopy(game)
+        clone.inferno_solver._cache.clear()
+        return clone
+    return setup
+
+
+def _calculate_all_positions(game):
+    # every figure of the current player with every value a card can move it by
+    player = game.players[game.current_player_index]
+    for figure in player.figures:
+        for value in (1, 2, 3, 4, -4, 5, 6, 8, 9, 10, 11, 12, 13):
+            try:
+                game._calculate_new_position(figure, value)
+            except ValueError:
+                pass
+
+
+def _has_any_valid_move(game):
+    game.has_any_valid_move(game.players[game.current_player_index])
+
+
+def _deal_round(state):
+    deck, players = state
+    deck.deal_cards(players, 1)
+
+
+def _new_deck_and_players():
+    random.seed(SCENARIO_SEED)
+    return Deck(), [Player(f"seat {seat}", seat) for seat in range(MAX_PLAYERS)]
+
+
+def _simulate_games():
+    for game_index in range(SIMULATED_GAMES):
+        simulate_game(SCENARIO_SEED + game_index, ["random"] * MAX_PLAYERS)
+
+
+def _recorded_game() -> GameReplay:
+    """A whole random game, recorded from its start."""
+    game = new_game(SCENARIO_SEED, started=False)
+    recording = GameRecording(game)
+    game.start_game_and_deal_cards()
+    play_random_turns(game, random.Random(SCENARIO_SEED), LATE_GAME_MAX_TURNS)
+    return GameReplay.from_recording(recording, checkpoint_interval=0)
+
+
+def _replay_from_start(replay: GameReplay):
+    def setup():
+        replay.reset()
+        return replay
+    return setup
+
+
+def rules_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+    for scenario in SCENARIOS:
+        game = build_scenario(scenario, SCENARIO_SEED)
+        benchmarks.append(Benchmark(f"rules.calculate_new_position[{scenario}]",
+                                    lambda game=game: _calculate_all_positions(game)))
+        # cold solver cache, the Inferno splits are searched every time
+        benchmarks.append(Benchmark(f"rules.has_any_valid_move[{scenario}]", _has_any_valid_move,
+                                    setup=_fresh_copy(game)))
+        benchmarks.append(Benchmark(f"rules.check_and_skip_turn_if_no_moves[{scenario}]",
+                                    lambda game: game.check_and_skip_turn_if_no_moves(),
+                                    setup=_fresh_copy(game)))
+    benchmarks.append(Benchmark("deck.deal_cards[round 1]", _deal_round, setup=_new_deck_and_players))
+    return benchmarks
+
+
+def serialization_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+    for scenario in SCENARIOS:
+        game = build_scenario(scenario, SCENARIO_SEED)
+        perspectives = {
+            "spectator": None,
+            "current": game.players[game.current_player_index].uuid,
+            "other": game.players[(game.current_player_index + 1) % game.number_of_players].uuid,
+        }
+        for perspective, player_id in perspectives.items():
+            benchmarks.append(Benchmark(f"serialization.to_json[{scenario}, {perspective}]",
+                                        lambda game=game, player_id=player_id: game.to_json(player_id)))
+            # cached public part, the state does not change between calls
+            benchmarks.append(Benchmark(f"serialization.encoded_state[{scenario}, {perspective}]",
+                                        lambda game=game, player_id=player_id: game.encoded_state(player_id)))
+    return benchmarks
+
+
+def simulation_benchmarks() -> list[Benchmark]:
+    return [Benchmark(f"simulation.full_games[{SIMULATED_GAMES} x random]", _simulate_games)]
+
+
+def replay_benchmarks() -> list[Benchmark]:
+    replay = _recorded_game()
+    return [Benchmark(f"replay.full_game[{len(replay.commands)} commands]", GameReplay.run,
+                      setup=_replay_from_start(replay))]
+
+
+def collect_benchmarks() -> list[Benchmark]:
+    # the HTTP benchmarks import the FastAPI application, which needs httpx for the in-process client
+    from CAT.benchmarks.http_routes import http_benchmarks
+    return (rules_benchmarks() + serialization_benchmarks() + simulation_benchmarks() + replay_benchmarks()
+            + http_benchmarks())
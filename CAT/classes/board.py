@@ -0,0 +1,81 @@
+from CAT.config import NUMBER_OF_FIELDS, MAX_PLAYERS
+
+# Positions >= FINISH_OFFSET are finishing slots: (player number + 1) * 100 + slot
+FINISH_OFFSET = 100
+FINISH_FIELDS = 4
+# Largest step count that gets a precomputed path (13/Start card), bigger values are computed on demand
+MAX_PRECOMPUTED_STEPS = 13
+
+
+class BoardGeometry:
+    """
+    Static lookup tables for the board, built once from the game configuration.
+    Move calculation only reads from these tables, so resolving a move needs
+    no arithmetic on the ring and no per-call list allocation.
+    """
+
+    def __init__(self, number_of_fields: int = NUMBER_OF_FIELDS, max_players: int = MAX_PLAYERS):
+        self.number_of_fields = number_of_fields
+        self.max_players = max_players
+        fields_per_player = number_of_fields // max_players
+
+        # safe start tile and the last ring tile before the finish zone of every player
+        self.start_fields = tuple((number * fields_per_player) % number_of_fields for number in range(max_players))
+        self.finishing_fields = tuple((start - 1) % number_of_fields for start in self.start_fields)
+
+        # owner number of the safe start tile on each ring tile, -1 for ordinary tiles
+        safe_tile_owner = [-1] * number_of_fields
+        for number, start in enumerate(self.start_fields):
+            safe_tile_owner[start] = number
+        self.safe_tile_owner = tuple(safe_tile_owner)
+
+        self.finish_slots = tuple(
+            tuple((number + 1) * FINISH_OFFSET + i for i in range(FINISH_FIELDS)) for number in range(max_players)
+        )
+
+        # ring_distance[player][pos]: steps from pos to the player's finishing field
+        self.ring_distance = tuple(
+            tuple((finishing - pos) % number_of_fields for pos in range(number_of_fields))
+            for finishing in self.finishing_fields
+        )
+        # finish_entry_steps[player][pos]: steps from pos onto the first finishing slot
+        # (over the finishing field and the start field)
+        self.finish_entry_steps = tuple(
+            tuple(distance + 2 for distance in distances) for distances in self.ring_distance
+        )
+
+        # _paths[value][pos]: every ring tile stepped on, landing tile included
+        # _safe_passed[value][pos]: safe start tiles passed over before landing
+        self._paths = {}
+        self._safe_passed = {}
+        for value in range(-MAX_PRECOMPUTED_STEPS, MAX_PRECOMPUTED_STEPS + 1):
+            self._paths[value] = tuple(self._build_path(pos, value) for pos in range(number_of_fields))
+            self._safe_passed[value] = tuple(self._build_safe_passed(path) for path in self._paths[value])
+
+    def _build_path(self, pos: int, value: int) -> tuple[int, ...]:
+        direction = 1 if value > 0 else -1
+        return tuple((pos + direction * step) % self.number_of_fields for step in range(1, abs(value) + 1))
+
+    def _build_safe_passed(self, path: tuple[int, ...]) -> tuple[int, ...]:
+        return tuple(tile for tile in path[:-1] if self.safe_tile_owner[tile] != -1)
+
+    def ring_path(self, pos: int, value: int) -> tuple[int, ...]:
+        """Returns the ring tiles a figure steps on when moving value fields from pos."""
+        paths = self._paths.get(value)
+        if paths is None:
+            return self._build_path(pos % self.number_of_fields, value)
+        return paths[pos]
+
+    def safe_tiles_passed(self, pos: int, value: int) -> tuple[int, ...]:
+        """Returns the safe start tiles passed over (not landed on) when moving value fields from pos."""
+        safe_passed = self._safe_passed.get(value)
+        if safe_passed is None:
+            return self._build_safe_passed(self._build_path(pos % self.number_of_fields, value))
+        return safe_passed[pos]
+
+    def is_finish_slot(self, player_number: int, pos: int) -> bool:
+        return pos in self.finish_slots[player_number]
+
+
+# Shared instance, the tables only depend on the configuration
+BOARD_GEOMETRY = BoardGeometry()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 import typing
+from .inferno import INFERNO_STEPS
 
 if typing.TYPE_CHECKING:
     from .game import Game
@@ -47,17 +48,11 @@ class StandardCard(Card):
             raise ValueError("A figure_uuid must be provided to play a StandardCard.")
 
         # Findet das passende Figur-Objekt im Spiel
-        figure_to_move = None
-        for p in game_object.players:
-            for fig in p.figures:
-                if fig.uuid == figure_uuid:
-                    figure_to_move = fig
-                    break
-            if figure_to_move:
-                break
-
+        figure_to_move = game_object.get_figure_by_uuid(figure_uuid)
         if not figure_to_move:
             raise ValueError(f"Figure with UUID {figure_uuid} not found in the game.")
+        if figure_to_move not in player.figures:
+            raise ValueError("You can only move your own figures.")
 
         # Führt die Bewegung mit dem gefundenen Objekt aus
         game_object.move_figure(figure_to_move, self.value)
@@ -88,6 +83,8 @@ class FlexCard(Card):
         figure = game_object.get_figure_by_uuid(figure_uuid)
         if not figure:
             raise ValueError(f"Figure with UUID {figure_uuid} not found.")
+        if figure not in player.figures:
+            raise ValueError("You can only move your own figures.")
 
         if direction == "forward":
             game_object.move_figure(figure, 4)
@@ -124,6 +121,9 @@ class SwapCard(Card):
         if figure1 not in player.figures:
             raise ValueError("You can only initiate a swap with one of your own figures.")
 
+        if figure1 is figure2:
+            raise ValueError("A figure cannot be swapped with itself.")
+
         game_object.swap_figures(figure1, figure2)
 
     def to_json(self):
@@ -154,6 +154,10 @@ class StartCard(Card):
 
         # Finde die Figur basierend auf der UUID
         figure = game_object.get_figure_by_uuid(figure_uuid)
+        if not figure:
+            raise ValueError(f"Figure with UUID {figure_uuid} not found.")
+        if figure not in player.figures:
+            raise ValueError("You can only move your own figures.")
 
         if action == "start":
             game_object.start_figure(player, figure)
@@ -181,80 +185,33 @@ class InfernoCard(Card):
         super().__init__("Inferno Card", "Split the value of 7 among your cats and burn any enemy cat it passes over.")
 
     def play_card(self, game_object: Game, player: Player, **kwargs):
+        moves = kwargs.get("moves")
 
-        def sort_moves_asc(moves):
-            """
-            Sorts the moves based on the position of the figures.
-            This is necessary for the Inferno Card to ensure correct burning logic.
-            """
-            for i in range(len(moves)):
-                for j in range(i + 1, len(moves)):
-                    if game_object.get_figure_by_uuid(
-                            moves[i].get("figure_uuid")).get_position() > game_object.get_figure_by_uuid(
-                            moves[j].get("figure_uuid")).get_position():
-                        moves[i], moves[j] = moves[j], moves[i]
-
-            return moves
-
-        def sort_figure_in_front_first(moves):
-            """
-            Sorts the moves based on the distance between the figures.
-            This is necessary for the Inferno Card to ensure correct burning logic.
-            """
-            if not moves:
-                return moves
-
-            # Find the figure with the maximum distance to sort around
-            imax = 0
-            max_distance = 0
-
-            for i, num in enumerate(moves):
-                newmax = (game_object.get_figure_by_uuid(moves[(i + 1) % len(moves)].get("figure_uuid")).get_position() - game_object.get_figure_by_uuid(moves[i].get("figure_uuid")).get_position()) % 56
-                if newmax > max_distance:
-                    imax = i
-                    max_distance = newmax
-
-            #print(f"imax: {imax}, max_distance: {max_distance}")
-            moves = moves[(imax + 1) % len(moves):] + moves[:(imax + 1) % len(moves)]
-            #print(f"distance sorted moves: {moves}")
-            moves.reverse()
-            return moves
-
-        unsorted_moves = kwargs.get("moves")
-
-        if not isinstance(unsorted_moves, list) or not unsorted_moves:
+        if not isinstance(moves, list) or not moves:
             raise ValueError("A list of moves must be provided for the Inferno Card.")
 
-        # Prüft, ob die Summe der Schritte exakt 7 ist
-        if sum(move.get('steps') for move in unsorted_moves) != 7:
-            raise ValueError("The steps of all moves for the Inferno Card must sum to 7.")
-
-        #moving_figure_uuids = [move.get("figure_uuid") for move in unsorted_moves]
-
-        sorted_moves = sort_moves_asc(unsorted_moves)
-        #print(f"Sorted moves: { [game_object.get_figure_by_uuid(move.get('figure_uuid')).to_json() for move in sorted_moves] }")
-
-        moves = sort_figure_in_front_first(sorted_moves)
-        #print(f'distance reversed: {moves}')
-
-
-        # Führe jeden einzelnen Zug aus dem "Bauplan" aus
+        figure_moves = []
         for move in moves:
+            if not isinstance(move, dict) or not move.get("figure_uuid") or move.get("steps") is None:
+                raise ValueError("Each move must contain a 'figure_uuid' and 'steps'.")
             figure_uuid = move.get("figure_uuid")
             steps = move.get("steps")
-
-            if not figure_uuid or steps is None:
-                raise ValueError("Each move must contain a 'figure_uuid' and 'steps'.")
-
-            # Finde die Figur im Spiel, die bewegt werden soll
-            figure = game_object.get_figure_by_uuid(figure_uuid)
+            if not isinstance(steps, int) or steps < 0:
+                raise ValueError("The steps of an Inferno move must be a non-negative number.")
 
             # Stelle sicher, dass die Figur existiert und dem Spieler gehört
+            figure = game_object.get_figure_by_uuid(figure_uuid)
             if not figure or figure not in player.figures:
                 raise ValueError(f"Invalid or non-own figure selected for Inferno move: {figure_uuid}")
+            if any(figure is other for other, _ in figure_moves):
+                raise ValueError("Each figure can only be moved once per Inferno Card.")
+            figure_moves.append((figure, steps))
+
+        # Prüft, ob die Summe der Schritte exakt 7 ist
+        if sum(steps for _, steps in figure_moves) != INFERNO_STEPS:
+            raise ValueError("The steps of all moves for the Inferno Card must sum to 7.")
 
-            # Rufe die spezielle Methode zum Bewegen und Verbrennen auf
-            game_object.move_and_burn(figure, steps)
+        game_object.play_inferno_moves(player, figure_moves)
 
     def to_json(self):
         data = super().to_json()
@@ -299,10 +256,42 @@ class JokerCard(Card):
                 raise ValueError(f"Unknown card type to imitate: {card_to_imitate}")
 
         # Call the imitated card's play_card method with the same arguments.
-        print(f"Playing Joker as a {card_to_imitate}...")
+        game_object.log.debug("joker_imitated", card=card_to_imitate)
         imitated_card.play_card(game_object, player, **kwargs)
 
     def to_json(self):
         data = super().to_json()
         data['type'] = 'JokerCard'
-        return data
\ No newline at end of file
+        return data
+
+
+# One instance of every card type a Joker can imitate
+IMITABLE_CARDS: tuple[Card, ...] = (
+    StandardCard(2),
+    StandardCard(3),
+    StandardCard(5),
+    StandardCard(6),
+    StandardCard(8),
+    StandardCard(9),
+    StandardCard(10),
+    StandardCard(12),
+    FlexCard(),
+    SwapCard(),
+    InfernoCard(),
+    StartCard(name="13/Start", move_values=[13], description="Move a cat from the start area or move 13 fields forward."),
+    StartCard(name="1/11/Start", move_values=[1, 11], description="Move a cat from the start area or move 1 or 11 fields forward.")
+)
+
+# Every card kind that can be held in a hand, the index is the kind id of the binary wire format
+HAND_CARD_KINDS: tuple[Card, ...] = IMITABLE_CARDS + (JokerCard(),)
+CARD_KIND_IDS: dict[str, int] = {card.name: kind for kind, card in enumerate(HAND_CARD_KINDS)}
+
+
+def get_joker_details(imitated_card: Card) -> dict:
+    """
+    Returns the action details that make a Joker imitate the given card.
+    """
+    if isinstance(imitated_card, StartCard):
+        # the Joker plays every start card as "Start" with the chosen move values
+        return {"imitate_card_name": "Start", "move_values": imitated_card.move_values}
+    return {"imitate_card_name": imitated_card.name}
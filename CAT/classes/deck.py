@@ -12,6 +12,7 @@ from .cards import (
 )
 from .player import Player
 from CAT.config import DECK_COMPOSITION, MAX_CARDS_DEALT, CARD_DEAL_CYCLE_LENGTH
+from CAT.event_log import get_event_logger
 
 
 class Deck:
@@ -20,8 +21,14 @@ class Deck:
     and dealing hands to players.
     """
 
-    def __init__(self):
-        """Initializes a new deck, creates all cards, and shuffles them."""
+    def __init__(self, game_id: str | None = None, seed: int | None = None):
+        """Initializes a new deck, creates all cards, and shuffles them. The same seed deals the same game."""
+        self.log = get_event_logger("deck", game_id)
+        # without a seed it is drawn from the global generator,
+        # so random.seed() still makes simulations and benchmarks reproducible
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        # own generator, its state is saved with the game
+        self.rng = random.Random(self.seed)
         self.cards: List[Card] = []
         self.discard_pile: List[Card] = []
         self._create_deck()
@@ -69,7 +76,7 @@ class Deck:
         # JokerCard: 6 cards
         self.cards.extend([JokerCard()] * DECK_COMPOSITION["joker_cards"])
 
-        print(f"Deck created with {len(self.cards)} cards.")
+        self.log.debug("deck_created", cards=len(self.cards))
 
     def shuffle(self):
         """
@@ -77,12 +84,12 @@ class Deck:
         reclaims the discard pile.
         """
         if not self.cards:
-            print("Main deck is empty. Shuffling discard pile.")
+            self.log.debug("discard_pile_reclaimed", cards=len(self.discard_pile))
             self.cards = self.discard_pile
             self.discard_pile = []
 
-        random.shuffle(self.cards)
-        print("Deck has been shuffled.")
+        self.rng.shuffle(self.cards)
+        self.log.debug("deck_shuffled", cards=len(self.cards))
 
     def deal_cards(self, players: List[Player], round_number: int):
         """
@@ -92,7 +99,7 @@ class Deck:
         # The number of cards decreases each round in a 5-round cycle (6, 5, 4, 3, 2)
         cards_to_deal = MAX_CARDS_DEALT - ((round_number - 1) % CARD_DEAL_CYCLE_LENGTH)
 
-        print(f"Round {round_number}: Dealing {cards_to_deal} cards to each of {len(players)} players.")
+        self.log.debug("cards_dealt", round=round_number, cards=cards_to_deal, players=len(players))
 
         for i in range(cards_to_deal):
             for player in players:
@@ -102,12 +109,30 @@ class Deck:
 
                 # Pop a card from the deck and add it to the player's hand
                 card = self.cards.pop()
-                player.cards.append(card)
+                player.add_card(card)
 
     def add_to_discard(self, card: Card):
         """Adds a played card to the discard pile."""
         self.discard_pile.append(card)
 
+    def to_snapshot(self) -> dict:
+        """The order of both piles as card names plus the seed and the generator state, see Game.to_snapshot."""
+        version, internal_state, gauss_next = self.rng.getstate()
+        return {
+            "seed": self.seed,
+            "cards": [card.name for card in self.cards],
+            "discard_pile": [card.name for card in self.discard_pile],
+            "rng": [version, list(internal_state), gauss_next],
+        }
+
+    def restore(self, data: dict, cards_by_name: dict[str, Card]):
+        """Replaces piles and generator state with those of a snapshot."""
+        self.cards = [cards_by_name[name] for name in data["cards"]]
+        self.discard_pile = [cards_by_name[name] for name in data["discard_pile"]]
+        self.seed = data.get("seed", self.seed)
+        version, internal_state, gauss_next = data["rng"]
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+
     def to_json(self):
         """
         Converts the deck and discard pile to a JSON-compatible format.
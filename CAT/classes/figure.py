@@ -1,10 +1,23 @@
+from __future__ import annotations
 import uuid
+import typing
+
+if typing.TYPE_CHECKING:
+    from .player import Player
+
 
 class Figure():
-    def __init__(self, color: str):
-        self.uuid = str(uuid.uuid4())
+    __slots__ = ("id", "uuid", "color", "position", "owner")
+
+    def __init__(self, color: str, owner: Player | None = None, figure_id: int = 0, figure_uuid: str | None = None):
+        # integer id used inside the game (indexes, journal, hashes), the uuid names the figure in moves and states
+        self.id = figure_id
+        # given when a saved game is restored; created with the figure, not on demand, because moves
+        # name their figures by uuid (action_details["figure_uuid"]), so every game needs them from its first move
+        self.uuid = figure_uuid or str(uuid.uuid4())
         self.color = color
         self.position = -1
+        self.owner = owner
 
     def get_position(self) -> int:
         return self.position
@@ -15,9 +28,12 @@ class Figure():
     def get_uuid(self) -> str:
         return self.uuid
 
+    def get_owner(self) -> Player | None:
+        return self.owner
+
     def to_json(self):
         return {
             'uuid': self.uuid,
             'color': self.color,
             'position': self.position
-        }
\ No newline at end of file
+        }
@@ -1,13 +1,25 @@
+import json
+import logging
 import uuid
 import time
-import json
-from typing import Dict, List
-from CAT.API.connection_manager import manager
+from typing import Awaitable, Callable, Dict, List
 from CAT.classes.player import Player
 from CAT.classes.figure import Figure
 from CAT.classes.deck import Deck
 from CAT.classes.cards import *
+from CAT.classes.board import BOARD_GEOMETRY, FINISH_OFFSET, FINISH_FIELDS
+from CAT.classes.inferno import InfernoSolver
+from CAT.classes.zobrist import ZOBRIST_KEYS
 from CAT.config import NUMBER_OF_FIELDS, MAX_PLAYERS, MIN_PLAYERS_TO_START, TURN_DURATION, FIGURES_PER_PLAYER
+from CAT.event_log import get_event_logger
+
+# the same encoding as FastAPI's JSONResponse, one instance so json.dumps does not build an encoder per call
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _encode_json(data) -> bytes:
+    return _JSON_ENCODER.encode(data).encode("utf-8")
+
 
 class NoActivePlayersError(Exception):
     """Custom exception raised when no active players are left in the game."""
@@ -28,27 +40,60 @@ class Game:
         3: "blue"
     }
     TURN_DURATION = TURN_DURATION
+    GEOMETRY = BOARD_GEOMETRY
 
-    def __init__(self, name, list_of_players: list[Player]):
-        self.uuid = str(uuid.uuid4())
+    def __init__(self, name, list_of_players: list[Player],
+                 notifier: Callable[[str, dict], Awaitable[None]] | None = None, game_id: str | None = None,
+                 seed: int | None = None):
+        # a sharded game manager picks an id its shard owns
+        self.uuid = game_id or str(uuid.uuid4())
         self.name = name
+        # every event of this game carries its uuid
+        self.log = get_event_logger("game", self.uuid)
         self.players = list_of_players
         self.host_id = list_of_players[0].uuid if list_of_players else None
         self.number_of_players = len(self.players)
         # {15: <Figure object of Player green>, 23: <Figure object of player pink> }
         self.field_occupation: dict[int, Figure] = {}
         self.game_over = False
-        self.deck = Deck()
+        # the seed of the deck is logged when the game starts, the same seed deals the same cards
+        self.deck = Deck(game_id=self.uuid, seed=seed)
         self.current_player_index = -1
         self.round_number = 1
         self.game_started = False
         self.last_played_card = None
         self.turn_start_time = None
-        self.last_activity_time = time.time()
+        # every time of the game is read from here, replaying a saved command sets the time it was recorded at
+        self.clock: Callable[[], float] = time.time
+        self.last_activity_time = self.clock()
+        # orders the lobbies when the lists of several shards are merged
+        self.created_at = self.last_activity_time
         self.kick_votes: Dict[str, List[str]] = {}
+        # async callback(game_id, event) that pushes events to the clients, None when running headless
+        self.notifier = notifier
+        # callback(game, command, fields) that saves every command before it runs, see CAT/manager/game_store.py
+        self.recorder: Callable[["Game", str, dict], None] | None = None
+        # indexes for O(1) lookups, uuids are only resolved at the API edge
+        self.figures: list[Figure] = []
+        self._figures_by_uuid: dict[str, Figure] = {}
+        self._players_by_uuid: dict[str, Player] = {}
+        # Zobrist hash of the figure positions, kept up to date by _place_figure
+        self._board_hash = 0
+        for player in self.players:
+            self._index_player(player)
+        self.inferno_solver = InfernoSolver(self)
+        # open journal frames of apply()/undo(), each a list of (figure, previous position)
+        self._journal_frames: list[list[tuple[Figure, int]]] = []
+        # version of the state the clients know, every pushed delta increments it
+        self.state_version = 0
+        self._published_snapshot = self._state_snapshot()
+        # (snapshot, head, public player entries, tail, own entries by player number) of encoded_state,
+        # rebuilt when the snapshot changes
+        self._encoded_state_cache: tuple[dict, bytes, list[bytes], bytes, dict[int, bytes]] | None = None
 
     def start_game_and_deal_cards(self):
         """Starts the game and deals cards for the first time."""
+        self._record("start")
         self._update_last_activity()
         if self.game_started:
             raise ValueError("The game has already started.")
@@ -57,25 +102,42 @@ class Game:
 
         self.game_started = True
         self.deck.deal_cards(self.players, self.round_number)
-        print(f"Game '{self.name}' started. Dealt cards for round {self.round_number}.")
+        self.log.info("game_started", name=self.name, players=self.number_of_players, seed=self.deck.seed)
         self.current_player_index = 0
 
         self._start_new_turn()
 
-    def add_player(self, name: str):
+    def add_player(self, name: str, player_uuid: str | None = None, figure_uuids: list[str] | None = None):
+        """Adds a player, the uuids are only given when a saved join is replayed."""
+        if self.recorder is not None:
+            # the replay has to create the same uuids, the clients know them
+            player_uuid = player_uuid or str(uuid.uuid4())
+            figure_uuids = figure_uuids or [str(uuid.uuid4()) for _ in range(FIGURES_PER_PLAYER)]
+            self._record("join", name=name, player=player_uuid, figures=figure_uuids)
         self._update_last_activity()
         if self.number_of_players >= MAX_PLAYERS:
             raise ValueError(f"Cannot add more than {MAX_PLAYERS} players to the game.")
-        new_player = Player(name, self.number_of_players)
+        new_player = Player(name, self.number_of_players, player_uuid, figure_uuids)
         self.players.append(new_player)
         self.number_of_players += 1
+        self._index_player(new_player)
 
         return new_player
 
     async def execute_play_card(self, player: Player, card_index: int, action_details: dict):
         """
-        Executes the entire process of a player playing a card.
+        Executes the entire process of a player playing a card and notifies the clients if it won the game.
         """
+        winner = self.play_card(player, card_index, action_details)
+        if winner is not None:
+            await self._notify({"event": "game_over", "winner": winner.name})
+
+    def play_card(self, player: Player, card_index: int, action_details: dict) -> Player | None:
+        """
+        Plays a card and advances the game, without any I/O.
+        Returns the winning player if the card won the game, None otherwise.
+        """
+        self._record("play", player=player.number, card_index=card_index, action_details=action_details)
         self._update_last_activity()
         if self._check_and_handle_timeout():
             raise ValueError("Your time is up! The turn was passed automatically.")
@@ -90,16 +152,24 @@ class Game:
             raise ValueError("The game is already over. No more actions can be performed.")
 
         card_to_play = player.cards[card_index]
-        card_to_play.play_card(game_object=self, player=player, **action_details)
+        # a card that fails halfway must not leave the board half-moved
+        self._begin_journal()
+        try:
+            card_to_play.play_card(game_object=self, player=player, **action_details)
+        except Exception:
+            self._rollback_journal()
+            raise
+        self._commit_journal()
 
         # Karte aus der Hand des Spielers entfernen
-        played_card = player.cards.pop(card_index)
+        played_card = player.remove_card(card_index)
         self.deck.add_to_discard(played_card)
         self.last_played_card = played_card
 
-        if await self.check_for_winner():
-            print(f"Game Over! Player {player.name} has won!")
-            return
+        winner = self.check_for_winner()
+        if winner is not None:
+            self.log.info("game_over", winner=winner.number, round=self.round_number)
+            return winner
 
         try:
             if self.is_round_over():
@@ -108,8 +178,9 @@ class Game:
                 self.current_player_index = self._find_next_active_player_index(self.current_player_index)
                 self._start_new_turn()
         except NoActivePlayersError:
-            print("Game Over: No active players left.")
+            self.log.info("game_over", winner=None, reason="no_active_players")
             self.game_over = True
+        return None
 
     def is_round_over(self) -> bool:
         """Checks if all players have played all their cards."""
@@ -121,11 +192,10 @@ class Game:
         try:
             self.current_player_index = self._find_next_active_player_index((self.round_number - 2) % self.number_of_players)
         except NoActivePlayersError:
-            print("No active players left. Game over.")
+            self.log.info("game_over", winner=None, reason="no_active_players")
             self.game_over = True
             return
-        print(f"\n--- Starting Round {self.round_number} in game {self.name} ---")
-        print(f"New starting player is {self.players[self.current_player_index].name}")
+        self.log.info("round_started", round=self.round_number, player=self.current_player_index)
 
         self.deck.deal_cards(self.players, self.round_number)
 
@@ -133,8 +203,8 @@ class Game:
 
     def _start_new_turn(self):
         """Resets the turn timer and checks if the new player can move."""
-        print(f"Starting turn for player {self.players[self.current_player_index].name}")
-        self.turn_start_time = time.time()
+        self.log.debug("turn_started", player=self.current_player_index)
+        self.turn_start_time = self.clock()
         self.check_and_skip_turn_if_no_moves()
 
     def _check_and_handle_timeout(self) -> bool:
@@ -142,8 +212,8 @@ class Game:
         If the current player's time is up, pass their turn and return True.
         Otherwise, return False.
         """
-        if self.game_started and self.turn_start_time and (time.time() - self.turn_start_time) > self.TURN_DURATION:
-            print(f"Server detected timeout for player {self.players[self.current_player_index].name}.")
+        if self.game_started and self.turn_start_time and (self.clock() - self.turn_start_time) > self.TURN_DURATION:
+            self.log.info("turn_timed_out", player=self.current_player_index)
             self.pass_turn(self.players[self.current_player_index])
             self._start_new_turn()
             return True
@@ -153,165 +223,287 @@ class Game:
         """
         Checks if the current player's time is up and broadcasts an update if so.
         """
+        now = self.clock()
         if self._check_and_handle_timeout():
-            print(f"Broadcasting update for game {self.uuid} due to timeout (from background task).")
-            await manager.broadcast(json.dumps({"event": "update"}), self.uuid)
+            # only timeouts that passed a turn are saved, the replay runs them at the same time
+            self._record("timeout", at=now)
+            await self.publish_state()
+
+    async def publish_state(self):
+        """Pushes the changes since the last push to the clients, tagged with the new state version."""
+        delta = self.state_delta()
+        if delta is not None:
+            await self._notify(delta)
+
+    def _state_snapshot(self) -> dict:
+        """Compact copy of everything the clients see, state_delta compares two of them."""
+        return {
+            "positions": tuple(figure.position for figure in self.figures),
+            "players": tuple((len(player.cards), player.is_active) for player in self.players),
+            "hands": tuple(player.hand_hash for player in self.players),
+            "current_player_index": self.current_player_index,
+            "round_number": self.round_number,
+            "game_started": self.game_started,
+            "game_over": self.game_over,
+            "last_played_card": self.last_played_card,
+            "turn_start_time": self.turn_start_time,
+        }
+
+    def state_delta(self) -> dict | None:
+        """
+        Returns the changes since the last delta and increments state_version, None if nothing changed.
+        A client applies it on top of base_version. Hands are private, "private" maps the uuid of every
+        player whose hand changed to the fields only that player gets.
+        """
+        snapshot = self._state_snapshot()
+        previous = self._published_snapshot
+        if snapshot == previous:
+            return None
+
+        delta = {"event": "delta", "base_version": self.state_version}
+        figures = {figure.uuid: figure.position
+                   for figure, position, old_position in zip(self.figures, snapshot["positions"], previous["positions"])
+                   if position != old_position}
+        if figures:
+            delta["figures"] = figures
+
+        players = []
+        private = {}
+        known_players = len(previous["players"])
+        for player, public, hand_hash in zip(self.players, snapshot["players"], snapshot["hands"]):
+            if player.number >= known_players:
+                # joined since the last delta, sent like in to_json
+                players.append(player.to_json())
+                delta["number_of_players"] = self.number_of_players
+                continue
+            if public != previous["players"][player.number]:
+                players.append({"number": player.number, "cards": public[0], "is_active": public[1]})
+            if hand_hash != previous["hands"][player.number]:
+                private[player.uuid] = {"hand": [card.to_json() for card in player.cards]}
+        if players:
+            delta["players"] = players
+        if private:
+            delta["private"] = private
+
+        for key in ("current_player_index", "round_number", "game_started", "game_over"):
+            if snapshot[key] != previous[key]:
+                delta[key] = snapshot[key]
+        if snapshot["last_played_card"] is not previous["last_played_card"]:
+            delta["last_played_card"] = self.last_played_card.to_json() if self.last_played_card else None
+        if snapshot["turn_start_time"] != previous["turn_start_time"]:
+            delta["remaining_turn_time"] = self.remaining_turn_time()
+            delta["turn_duration"] = self.TURN_DURATION
+
+        self.state_version += 1
+        delta["version"] = self.state_version
+        self._published_snapshot = snapshot
+        return delta
+
+    async def _notify(self, event: dict):
+        if self.notifier is not None:
+            await self.notifier(self.uuid, event)
+
+    def _record(self, command: str, **fields):
+        if self.recorder is not None:
+            self.recorder(self, command, {"at": self.clock(), **fields})
+
+    def to_snapshot(self) -> dict:
+        """
+        Everything needed to continue the game after a restart, see from_snapshot.
+        Cards are saved by name, figures by uuid and position.
+        """
+        return {
+            "uuid": self.uuid,
+            "name": self.name,
+            "created_at": self.created_at,
+            "last_activity_time": self.last_activity_time,
+            "turn_start_time": self.turn_start_time,
+            "players": [{
+                "uuid": player.uuid,
+                "name": player.name,
+                "is_active": player.is_active,
+                "cards": [card.name for card in player.cards],
+                "figures": [[figure.uuid, figure.position] for figure in player.figures],
+            } for player in self.players],
+            "deck": self.deck.to_snapshot(),
+            "current_player_index": self.current_player_index,
+            "round_number": self.round_number,
+            "game_started": self.game_started,
+            "game_over": self.game_over,
+            "last_played_card": self.last_played_card.name if self.last_played_card else None,
+            "kick_votes": {player_uuid: list(voters) for player_uuid, voters in self.kick_votes.items()},
+            "state_version": self.state_version,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict, notifier: Callable[[str, dict], Awaitable[None]] | None = None) -> "Game":
+        """Rebuilds a game saved by to_snapshot."""
+        cards_by_name = {card.name: card for card in HAND_CARD_KINDS}
+        players = [Player(entry["name"], number, entry["uuid"], [figure_uuid for figure_uuid, _ in entry["figures"]])
+                   for number, entry in enumerate(data["players"])]
+        game = cls(data["name"], players, notifier=notifier, game_id=data["uuid"], seed=data["deck"].get("seed"))
+        for player, entry in zip(players, data["players"]):
+            player.is_active = entry["is_active"]
+            # through the same methods as moves and deals, so occupation and hashes stay consistent
+            for figure, (_, position) in zip(player.figures, entry["figures"]):
+                game._place_figure(figure, position)
+            for name in entry["cards"]:
+                player.add_card(cards_by_name[name])
+        game.deck.restore(data["deck"], cards_by_name)
+        game.created_at = data["created_at"]
+        game.last_activity_time = data["last_activity_time"]
+        game.turn_start_time = data["turn_start_time"]
+        game.current_player_index = data["current_player_index"]
+        game.round_number = data["round_number"]
+        game.game_started = data["game_started"]
+        game.game_over = data["game_over"]
+        game.last_played_card = cards_by_name.get(data["last_played_card"])
+        # copied, later votes must not change the snapshot, e.g. a checkpoint of a replay
+        game.kick_votes = {player_uuid: list(voters) for player_uuid, voters in data["kick_votes"].items()}
+        game.state_version = data["state_version"]
+        game._published_snapshot = game._state_snapshot()
+        return game
 
     def _update_last_activity(self):
         """Updates the timestamp of the last activity."""
-        self.last_activity_time = time.time()
+        self.last_activity_time = self.clock()
+
+    def _index_player(self, player: Player):
+        """Registers a player and its figures in the lookup indexes."""
+        self._players_by_uuid[player.uuid] = player
+        for figure in player.figures:
+            self._figures_by_uuid[figure.uuid] = figure
+            self._board_hash ^= ZOBRIST_KEYS.figure_key(figure.id, figure.position)
+            # figure ids are derived from the player number, so the list stays ordered by id
+            self.figures.append(figure)
 
     def _calculate_new_position(self, figure: Figure, value: int) -> int:
-        player = self.get_spieler_von_figur(figure)
-        old_pos = figure.get_position()
-
-        # path the figure will take
-        path = []
-        current_pos_on_path = old_pos
-        # abs so -4 works as well (only then the path is backwards)
-        for _ in range(abs(value)):
-            current_pos_on_path = (current_pos_on_path + int(value/abs(value))) % self.NUMBER_OF_FIELDS
-            path.append(current_pos_on_path)
-
-
-        # checks the path for blockades
-        for tile_pos in path[:-1]:
-            if tile_pos in self.field_occupation:
-                occupying_figure = self.field_occupation[tile_pos]
-                owner = self.get_spieler_von_figur(occupying_figure)
-                if tile_pos == owner.startfield:
-                    raise ValueError(f"Path is blocked by a safe figure on tile {tile_pos}.")
+        return self._resolve_position(figure.owner, figure.get_position(), value, self.field_occupation)
+
+    def _resolve_position(self, player: Player, old_pos: int, value: int, occupation: dict[int, Figure]) -> int:
+        """
+        Returns the position a figure of player lands on when moving value fields from old_pos
+        on the given occupation. Raises ValueError if the move is not possible.
+        """
+        geometry = self.GEOMETRY
 
         # finish zone handling
-        if old_pos >= 100:
-            current_finish_pos = old_pos % 100
-            target_finish_pos = current_finish_pos + value
+        if old_pos >= FINISH_OFFSET:
+            target_finish_pos = old_pos % FINISH_OFFSET + value
             if target_finish_pos < 0:
                 raise ValueError("Cannot move backwards in the finish zone.")
-            if target_finish_pos > 3:
+            if target_finish_pos >= FINISH_FIELDS:
                 raise ValueError("Move would out of the finish area.")
             for i in range(old_pos + 1, old_pos + value + 1):
-                if i in self.field_occupation:
+                if i in occupation:
                     raise ValueError(f"Cannot jump over figure in finish-zone at position {i}.")
             return old_pos + value
-        else:
-            finish_entry = player.finishing_field
-            dist_to_finish = (finish_entry - old_pos + self.NUMBER_OF_FIELDS) % self.NUMBER_OF_FIELDS
-            print(f"Distance to finish: {dist_to_finish}, Old position: {old_pos}, Value: {value}")
-            if value > dist_to_finish + 1:
-                if self.field_occupation.get(player.startfield) and self.field_occupation[player.startfield].color == player.color:
-                    raise ValueError(f"Cannot go in finish-zone when start field is blocked.")
-                steps_into_finish = value - dist_to_finish - 2  # -2 because you move over the start field and the first finishing field
-                if steps_into_finish > 3:
-                    return (old_pos + value) % self.NUMBER_OF_FIELDS
-                for i in range(steps_into_finish + 1):
-                    if ((player.get_number()+1) * 100 + i) in self.field_occupation:
-                        return (old_pos + value) % self.NUMBER_OF_FIELDS
-                return (player.get_number()+1) * 100 + steps_into_finish
-            else:
-                return (old_pos + value) % self.NUMBER_OF_FIELDS
-
-    def has_any_valid_move(self, player: Player) -> bool:
-        if not player.cards:
-            return False
-
-        for card in player.cards:
-            if isinstance(card, JokerCard):
-                # there is always a valid move with a JokerCard unless you won but then game should be over
-                return True
-
-        for card in player.cards:
-            if isinstance(card, InfernoCard):
-                moveable_figures = [f for f in player.figures if f.position >= 0]
-                if not moveable_figures:
-                    continue
-                if len(moveable_figures) == 1:
-                        try:
-                            self._calculate_new_position(moveable_figures[0], 7)
-                            return True
-                        except ValueError:
-                            continue
-                elif len(moveable_figures) == 2:
-                    for i in range(0,8):
-                        try:
-                            self._calculate_new_position(moveable_figures[0], i)
-                            self._calculate_new_position(moveable_figures[1], 7-i)
-                            return True
-                        except ValueError:
-                            continue
-                elif len(moveable_figures) == 3:
-                    for i in range(0,8):
-                        for j in range(0,8-i):
-                            try:
-                                self._calculate_new_position(moveable_figures[0], i)
-                                self._calculate_new_position(moveable_figures[1], j)
-                                self._calculate_new_position(moveable_figures[2], 7-i-j)
-                                return True
-                            except ValueError:
-                                continue
-                elif len(moveable_figures) == 4:
-                    for i in range(0,8):
-                        for j in range(0,8-i):
-                            for k in range(0,8-i-j):
-                                try:
-                                    self._calculate_new_position(moveable_figures[0], i)
-                                    self._calculate_new_position(moveable_figures[1], j)
-                                    self._calculate_new_position(moveable_figures[2], k)
-                                    self._calculate_new_position(moveable_figures[3], 7-i-j-k)
-                                    return True
-                                except ValueError:
-                                    continue
 
+        # checks the path for blockades, only figures on their own start tile block
+        for tile_pos in geometry.safe_tiles_passed(old_pos, value):
+            occupying_figure = occupation.get(tile_pos)
+            if occupying_figure is not None and occupying_figure.owner.number == geometry.safe_tile_owner[tile_pos]:
+                raise ValueError(f"Path is blocked by a safe figure on tile {tile_pos}.")
+
+        new_pos = (old_pos + value) % self.NUMBER_OF_FIELDS
+        finish_entry_steps = geometry.finish_entry_steps[player.number][old_pos]
+        if value < finish_entry_steps:
+            return new_pos
+
+        start_figure = occupation.get(player.startfield)
+        if start_figure is not None and start_figure.color == player.color:
+            raise ValueError(f"Cannot go in finish-zone when start field is blocked.")
+        steps_into_finish = value - finish_entry_steps
+        if steps_into_finish >= FINISH_FIELDS:
+            return new_pos
+        finish_slots = geometry.finish_slots[player.number]
+        for i in range(steps_into_finish + 1):
+            if finish_slots[i] in occupation:
+                return new_pos
+        return finish_slots[steps_into_finish]
+
+    def generate_legal_moves(self, player: Player) -> list[dict]:
+        """
+        Returns every legal action for the cards in the player's hand.
+        Each entry holds a card_index and the action_details accepted by execute_play_card.
+        """
+        return list(self._iter_legal_moves(player))
 
+    def has_any_valid_move(self, player: Player) -> bool:
+        return next(self._iter_legal_moves(player), None) is not None
+
+    def _iter_legal_moves(self, player: Player):
+        # cards of the same type (also when imitated by a Joker) share their actions
+        actions_by_card_name: dict[str, list[dict]] = {}
+        for card_index, card in enumerate(player.cards):
+            for action_details in self._get_card_actions(player, card, actions_by_card_name):
+                yield {"card_index": card_index, "action_details": action_details}
+
+    def _get_card_actions(self, player: Player, card: Card, actions_by_card_name: dict[str, list[dict]]) -> list[dict]:
+        """Returns the action details of every legal way to play the card."""
+        actions = actions_by_card_name.get(card.name)
+        if actions is not None:
+            return actions
+
+        actions = []
+        if isinstance(card, JokerCard):
+            for imitated_card in IMITABLE_CARDS:
+                joker_details = get_joker_details(imitated_card)
+                for action_details in self._get_card_actions(player, imitated_card, actions_by_card_name):
+                    actions.append({**action_details, **joker_details})
+        elif isinstance(card, StandardCard):
+            for figure in player.figures:
+                if self._can_move(figure, card.value):
+                    actions.append({"figure_uuid": figure.uuid})
+        elif isinstance(card, FlexCard):
+            for figure in player.figures:
+                for direction, value in (("forward", 4), ("backward", -4)):
+                    if self._can_move(figure, value):
+                        actions.append({"figure_uuid": figure.uuid, "direction": direction})
+        elif isinstance(card, StartCard):
+            start_figure = self.field_occupation.get(player.startfield)
+            can_start = start_figure is None or start_figure.color != player.color
             for figure in player.figures:
-                try:
-                    # case 1: start figure
-                    if isinstance(card, StartCard) and figure.position == -1:
-                        if not self.field_occupation.get(player.startfield):
-                            return True
-
-                    # case 2: move figure
-                    if figure.position >= 0:
-                        move_values = []
-                        if isinstance(card, StandardCard):
-                            move_values.append(card.value)
-                        elif isinstance(card, StartCard):
-                            move_values.extend(card.move_values)
-                        elif isinstance(card, FlexCard):
-                            move_values.extend([4, -4])
-
-                        for value in move_values:
-                            try:
-                                self._calculate_new_position(figure, value)
-                            except ValueError:
-                                continue
-                            return True  # no error -> valid move
-
-
-                    # case 3: swap figure
-                    if isinstance(card, SwapCard):
-                        # 1. at least one own figure must be able to swap
-                        own_swappable_figures = [f for f in player.figures if f.position >= 0 and f.position < 100 and f.position != player.startfield]
-                        if not own_swappable_figures:
-                            continue  # No swappable figures available
-
-                        # 2. at least one opponent figure must be available
-                        for other_player in self.players:
-                            if other_player.uuid == player.uuid:
-                                continue
-
-                            for opponent_figure in other_player.figures:
-                                if opponent_figure.position >= 0 and opponent_figure.position < 100 and opponent_figure.position != other_player.startfield:
-                                    return True
-
-                        continue
-
-
-                except ValueError:
-                    # try next card or figure
+                if figure.position == -1:
+                    if can_start:
+                        actions.append({"action": "start", "figure_uuid": figure.uuid})
                     continue
+                for value in card.move_values:
+                    if self._can_move(figure, value):
+                        actions.append({"action": "move", "figure_uuid": figure.uuid, "value": value})
+        elif isinstance(card, SwapCard):
+            own_figures = [f for f in player.figures if self._is_swappable(f)]
+            if own_figures:
+                # any other figure, the player's own ones too
+                swappable_figures = [f for p in self.players for f in p.figures if self._is_swappable(f)]
+                for figure in own_figures:
+                    for other_figure in swappable_figures:
+                        if other_figure is not figure:
+                            actions.append({"figure_uuid": figure.uuid, "other_figure_uuid": other_figure.uuid})
+        elif isinstance(card, InfernoCard):
+            actions.extend(self._get_inferno_actions(player))
+
+        actions_by_card_name[card.name] = actions
+        return actions
+
+    def _can_move(self, figure: Figure, value: int) -> bool:
+        """Checks if move_figure would accept moving the figure by value."""
+        if figure.position < 0:
+            return False
+        try:
+            new_position = self._calculate_new_position(figure, value)
+        except ValueError:
+            return False
+        occupying_figure = self.field_occupation.get(new_position)
+        return occupying_figure is None or occupying_figure is figure or occupying_figure.color != figure.color
 
-        return False
+    def _is_swappable(self, figure: Figure) -> bool:
+        """Figures on the ring can be swapped unless they sit on their own start tile."""
+        return 0 <= figure.position < self.NUMBER_OF_FIELDS and figure.position != figure.owner.startfield
+
+    def _get_inferno_actions(self, player: Player) -> list[dict]:
+        return [{"moves": [{"figure_uuid": figure.uuid, "steps": steps} for figure, steps in split]}
+                for split in self.inferno_solver.get_splits(player)]
 
     def check_and_skip_turn_if_no_moves(self, recursion_count=0):
         """
@@ -321,15 +513,16 @@ class Game:
         """
         # safetynet: so we don't end up in an infinite loop
         if recursion_count >= self.number_of_players:
-            print("All players skipped in a row. Force-starting a new round.")
+            self.log.info("all_players_skipped", round=self.round_number)
             self.start_new_round()
             return
 
         current_player = self.players[self.current_player_index]
 
         if not self.has_any_valid_move(current_player):
-            print(f"Server check: Player {current_player.name} has no valid moves. Skipping turn.")
-            print(f"cards of player {current_player.name}: {current_player.cards}")
+            if self.log.is_enabled(logging.DEBUG):
+                self.log.debug("turn_skipped", player=current_player.number,
+                               cards=[card.name for card in current_player.cards])
             self.pass_turn(current_player)
 
             if self.is_round_over():
@@ -345,16 +538,13 @@ class Game:
         if self.players[self.current_player_index] != player:
             raise ValueError("It's not this player's turn.")
 
-        for card in player.cards:
+        for card in player.discard_cards():
             self.deck.add_to_discard(card)
 
-        player.cards = []
-
-        print(f"Player {player.name} cannot move and discards their hand.")
         try:
             self.current_player_index = self._find_next_active_player_index(self.current_player_index)
         except NoActivePlayersError:
-            print("Game Over: No active players left.")
+            self.log.info("game_over", winner=None, reason="no_active_players")
             self.game_over = True
 
     def move_figure(self, figure: Figure, value: int):
@@ -362,31 +552,21 @@ class Game:
             raise ValueError("Figure is not on the board.")
 
         old_position = figure.get_position()
-        if old_position >= 0:
-            self.field_occupation.pop(old_position, None)
 
+        # everything is checked before the board changes
         new_position = self._calculate_new_position(figure, value)
-        player_number = self.COLOR_PLAYER_MAPPING[figure.color]
-        if (new_position < 0 or new_position >= self.NUMBER_OF_FIELDS) and new_position not in [
-            (player_number+1) * 100 + i  for i in range(4)]:
-            print(f"if ({new_position} < 0 or {new_position} >= {self.NUMBER_OF_FIELDS}) and {new_position} not in {[
-            (player_number + 1) * 100 + i  for i in range(4)]}:")
-            print(f"if {new_position < 0 or new_position >= self.NUMBER_OF_FIELDS} and {new_position not in [
-                (player_number + 1) * 100 + i for i in range(4)]}:")
+        if ((new_position < 0 or new_position >= self.NUMBER_OF_FIELDS)
+                and not self.GEOMETRY.is_finish_slot(figure.owner.number, new_position)):
             raise ValueError("New position is out of bounds.")
-        if new_position in self.field_occupation:
-            occupying_figure = self.field_occupation[new_position]
-            if occupying_figure.get_color() != figure.get_color():
-                print(
-                    f"Figure {occupying_figure.get_uuid()} of color {occupying_figure.get_color()} is on the same field. It will be sent back to its start field.")
-                occupying_figure.position = -1
-            else:
+        occupying_figure = self.field_occupation.get(new_position)
+        if occupying_figure is not None and occupying_figure is not figure:
+            if occupying_figure.get_color() == figure.get_color():
                 raise ValueError("Cannot move to a field occupied by your own figure.")
+            self.log.debug("figure_kicked", figure=occupying_figure.id, position=new_position)
+            self._set_position(occupying_figure, -1)
 
-        self.field_occupation[new_position] = figure
-        figure.position = new_position
-        print(f"Figure moved from {old_position} to {new_position}.")
-        print(self.field_occupation)
+        self._set_position(figure, new_position)
+        self.log.debug("figure_moved", figure=figure.id, origin=old_position, target=new_position)
 
     def swap_figures(self, figure1: Figure, figure2: Figure):
         """Swaps the positions of two figures, respecting safe start tiles."""
@@ -398,65 +578,150 @@ class Game:
             raise ValueError("Figures in the start or finish zone cannot be swapped.")
 
 
-        owner1 = self.get_spieler_von_figur(figure1)
+        owner1 = figure1.owner
         if pos1 == owner1.startfield:
             raise ValueError(f"Cannot swap figure of {owner1.color} from its safe start tile.")
-        owner2 = self.get_spieler_von_figur(figure2)
+        owner2 = figure2.owner
         if pos2 == owner2.startfield:
             raise ValueError(f"Cannot swap figure of {owner2.color} from its safe start tile.")
 
-        figure1.position, figure2.position = pos2, pos1
-        self.field_occupation[pos1], self.field_occupation[pos2] = figure2, figure1
-        print(f"Figures {figure1.get_uuid()} and {figure2.get_uuid()} have swapped positions.")
-
-    def get_figure_by_uuid(self, figure_uuid: str) -> Figure | None:
-        """Helper to find any figure in the game by its UUID."""
-        for player in self.players:
-            for figure in player.figures:
-                if figure.uuid == figure_uuid:
-                    return figure
-        return None
+        self._set_position(figure1, pos2)
+        self._set_position(figure2, pos1)
+        self.log.debug("figures_swapped", figure=figure1.id, other_figure=figure2.id)
 
-    def move_and_burn(self, figure: Figure, steps: int):
+    def _set_position(self, figure: Figure, position: int):
         """
-        Moves a figure and burns any figures on its path, with corrected logic.
+        Moves a figure to position and keeps the occupation in sync.
+        Every board change goes through here, so open journal frames can record it.
         """
-        # normal move when figure is in the finish zone
-        if figure.position >= 100:
-            new_position = self._calculate_new_position(figure, steps)
-            self._execute_move(figure, new_position)
-            return
+        if self._journal_frames:
+            self._journal_frames[-1].append((figure, figure.position))
+        self._place_figure(figure, position)
 
+    def _place_figure(self, figure: Figure, position: int):
+        old_position = figure.position
+        # the old tile may already hold another figure, e.g. in the middle of a swap
+        if old_position >= 0 and self.field_occupation.get(old_position) is figure:
+            del self.field_occupation[old_position]
+        figure.position = position
+        self._board_hash ^= ZOBRIST_KEYS.figure_key(figure.id, old_position) ^ ZOBRIST_KEYS.figure_key(figure.id, position)
+        if position >= 0:
+            self.field_occupation[position] = figure
+
+    def _begin_journal(self):
+        """Opens a journal frame that records every board change until it is committed or rolled back."""
+        self._journal_frames.append([])
+
+    def _commit_journal(self):
+        """Closes the innermost frame and keeps its changes (in the enclosing frame, if any)."""
+        changes = self._journal_frames.pop()
+        if self._journal_frames:
+            self._journal_frames[-1].extend(changes)
+
+    def _rollback_journal(self):
+        """Closes the innermost frame and reverts its changes in reverse order."""
+        for figure, position in reversed(self._journal_frames.pop()):
+            self._place_figure(figure, position)
+
+    def apply(self, action: dict, player: Player | None = None):
+        """
+        Plays an action (card_index and action_details, as returned by generate_legal_moves)
+        on the board only, hand and turn stay untouched. The changes are recorded, so undo() reverts them.
+        If the action is illegal, the board is left unchanged and the error is raised.
+        """
+        if player is None:
+            player = self.players[self.current_player_index]
+        card_index = action["card_index"]
+        if not 0 <= card_index < len(player.cards):
+            raise IndexError("Card index is out of bounds.")
 
-        new_position = self._calculate_new_position(figure, steps)
-
-        path_to_burn = []
-        current_pos = figure.position
+        self._begin_journal()
+        try:
+            player.cards[card_index].play_card(game_object=self, player=player, **action["action_details"])
+        except Exception:
+            self._rollback_journal()
+            raise
+
+    def undo(self):
+        """Reverts the board changes of the last apply()."""
+        if not self._journal_frames:
+            raise ValueError("There is no applied action to undo.")
+        self._rollback_journal()
+
+    @property
+    def state_hash(self) -> int:
+        """
+        64-bit Zobrist hash of the figure positions, the hands, the current player and the round.
+        Equal states have equal hashes, so it can key caches and tell if anything changed.
+        """
+        state_hash = (self._board_hash
+                      ^ ZOBRIST_KEYS.current_player_key(self.current_player_index)
+                      ^ ZOBRIST_KEYS.round_key(self.round_number))
+        for player in self.players:
+            state_hash ^= player.hand_hash
+        return state_hash
 
-        temp_steps = steps
-        if new_position >= 100:
-            dist_to_finish = (self.get_spieler_von_figur(
-                figure).finishing_field - figure.position + self.NUMBER_OF_FIELDS) % self.NUMBER_OF_FIELDS
-            temp_steps = dist_to_finish + 1
+    def get_figure_by_uuid(self, figure_uuid: str) -> Figure | None:
+        """Helper to find any figure in the game by its UUID."""
+        return self._figures_by_uuid.get(figure_uuid)
 
-        for _ in range(temp_steps):
-            current_pos = (current_pos + 1) % self.NUMBER_OF_FIELDS
-            path_to_burn.append(current_pos)
+    def get_figure(self, figure_id: int) -> Figure:
+        """Returns the figure with the given integer id."""
+        return self.figures[figure_id]
 
-        for tile_pos in path_to_burn:
-            if tile_pos in self.field_occupation:
-                figure_to_burn = self.field_occupation[tile_pos]
+    def play_inferno_moves(self, player: Player, moves: list[tuple[Figure, int]]):
+        """Checks the split of an Inferno card and plays its sub-moves in the right order."""
+        for figure, steps in self.inferno_solver.check_split(player, moves):
+            self.move_and_burn(figure, steps)
 
+    def move_and_burn(self, figure: Figure, steps: int):
+        """
+        Moves a figure and burns any figures on its path, with corrected logic.
+        """
+        old_position = figure.position
+        new_position, burned_tiles = self._plan_move_and_burn(figure, old_position, steps, self.field_occupation)
+
+        if burned_tiles and self.log.is_enabled(logging.DEBUG):
+            for tile_pos in burned_tiles:
+                self.log.debug("figure_burned", figure=self.field_occupation[tile_pos].id, position=tile_pos)
+        self._burn_and_move(figure, new_position, burned_tiles)
+        self.log.debug("figure_moved", figure=figure.id, origin=old_position, target=new_position)
+
+    def _burn_and_move(self, figure: Figure, new_position: int, burned_tiles: list[int]):
+        """Applies a sub-move calculated by _plan_move_and_burn."""
+        for tile_pos in burned_tiles:
+            self._set_position(self.field_occupation[tile_pos], -1)
+        self._set_position(figure, new_position)
+
+    def _plan_move_and_burn(self, figure: Figure, old_pos: int, steps: int,
+                            occupation: dict[int, Figure]) -> tuple[int, list[int]]:
+        """
+        Calculates an Inferno sub-move on the given occupation without changing it.
+        Returns the new position and the tiles whose figures get burned, raises ValueError if the move is blocked.
+        """
+        if old_pos < 0:
+            raise ValueError("Figure is not on the board.")
 
-                owner = self.get_spieler_von_figur(figure_to_burn)
-                if tile_pos != owner.startfield:
-                    print(f"Figure {figure_to_burn.uuid} was burned at position {tile_pos}!")
-                    figure_to_burn.position = -1
-                    del self.field_occupation[tile_pos]
-                else:
-                    raise ValueError(f"Path is blocked by a safe figure on tile {tile_pos}.")
+        new_position = self._resolve_position(figure.owner, old_pos, steps, occupation)
 
-        self._execute_move(figure, new_position)
+        # normal move when figure is in the finish zone
+        if old_pos >= FINISH_OFFSET:
+            return new_position, []
+
+        burn_steps = steps
+        if new_position >= FINISH_OFFSET:
+            # only the ring tiles up to the start field are passed before entering the finish zone
+            burn_steps = self.GEOMETRY.ring_distance[figure.owner.number][old_pos] + 1
+
+        burned_tiles = []
+        for tile_pos in self.GEOMETRY.ring_path(old_pos, burn_steps):
+            figure_to_burn = occupation.get(tile_pos)
+            if figure_to_burn is None:
+                continue
+            if tile_pos == figure_to_burn.owner.startfield:
+                raise ValueError(f"Path is blocked by a safe figure on tile {tile_pos}.")
+            burned_tiles.append(tile_pos)
+        return new_position, burned_tiles
 
     def start_figure(self, player: Player, figure: Figure):
         """Moves a figure from its home onto the player's starting tile."""
@@ -472,51 +737,41 @@ class Game:
 
         # Place the figure on the start tile
         self._execute_move(figure, start_tile)
-        print(f"Figure {figure.get_uuid()} is now on start tile {start_tile}.")
+        self.log.debug("figure_started", figure=figure.id, position=start_tile)
 
     def _execute_move(self, figure: Figure, new_position: int):
         """
         Private helper that executes any move, respects safe figures, and handles kicking.
         """
         old_position = figure.position
-        if old_position >= 0:
-            self.field_occupation.pop(old_position, None)
-
-        if new_position in self.field_occupation:
-            kicked_figure = self.field_occupation[new_position]
-            owner_of_kicked = self.get_spieler_von_figur(kicked_figure)
 
+        kicked_figure = self.field_occupation.get(new_position)
+        if kicked_figure is not None and kicked_figure is not figure:
             # figure on own start field cannot be kicked
-            if new_position == owner_of_kicked.startfield:
-                if old_position >= 0:
-                    self.field_occupation[old_position] = figure
+            if new_position == kicked_figure.owner.startfield:
                 raise ValueError("Cannot land on a tile occupied by a safe figure.")
 
-            print(f"Figure {kicked_figure.get_uuid()} ({kicked_figure.get_color()}) was kicked!")
-            kicked_figure.position = -1
+            self.log.debug("figure_kicked", figure=kicked_figure.id, position=new_position)
+            self._set_position(kicked_figure, -1)
 
-        figure.position = new_position
-        if new_position >= 0:
-            self.field_occupation[new_position] = figure
-        print(f"Moved figure {figure.get_uuid()} from {old_position} to {new_position}.")
+        self._set_position(figure, new_position)
+        self.log.debug("figure_moved", figure=figure.id, origin=old_position, target=new_position)
 
-    async def check_for_winner(self) -> bool:
-        """Checks if any player has all their figures in the finishing zone."""
+    def check_for_winner(self) -> Player | None:
+        """
+        Checks if any player has all their figures in the finishing zone.
+        Ends the game and returns the winner if so.
+        """
         for player in self.players:
             figures_in_finish = sum(1 for f in player.figures if f.position >= 100)
             if figures_in_finish == FIGURES_PER_PLAYER:
                 self.game_over = True
-
-                winner_name = player.name
-                payload = {"event": "game_over", "winner": winner_name}
-                print(f"Game Over! Winner is {winner_name}. Broadcasting event.")
-                await manager.broadcast(json.dumps(payload), self.uuid)
-
-                return True
-        return False
+                return player
+        return None
 
     def register_kick_vote(self, voter: Player, player_to_kick_uuid: str):
         """Registers a vote to kick a player."""
+        self._record("kick_vote", voter=voter.number, player=player_to_kick_uuid)
         if player_to_kick_uuid not in self.kick_votes:
             self.kick_votes[player_to_kick_uuid] = []
 
@@ -534,18 +789,16 @@ class Game:
         if len(self.kick_votes[player_to_kick_uuid]) > required_votes:
             player_to_kick = self.get_player_by_uuid(player_to_kick_uuid)
             if player_to_kick:
-                print(f"Player {player_to_kick.name} has been kicked by vote.")
+                self.log.info("player_kicked", player=player_to_kick.number, votes=len(self.kick_votes[player_to_kick_uuid]))
                 player_to_kick.is_active = False
                 for fig in player_to_kick.figures:
-                    if fig.position in self.field_occupation:
-                        del self.field_occupation[fig.position]
-                    fig.position = -1
+                    self._set_position(fig, -1)
 
                 if self.players[self.current_player_index] == player_to_kick:
                     try:
                         self.current_player_index = self._find_next_active_player_index(self.current_player_index)
                     except NoActivePlayersError:
-                        print("Game Over: No active players left after kick.")
+                        self.log.info("game_over", winner=None, reason="no_active_players")
                         self.game_over = True
 
                 del self.kick_votes[player_to_kick_uuid]
@@ -562,42 +815,78 @@ class Game:
         return next_index
 
     def get_spieler_von_figur(self, figure: Figure) -> Player:
-        for player in self.players:
-            if figure in player.figures:
-                return player
-        raise ValueError("Figure not found in any player's figures.")
+        if figure.owner is None or self._figures_by_uuid.get(figure.uuid) is not figure:
+            raise ValueError("Figure not found in any player's figures.")
+        return figure.owner
 
     def get_player_by_number(self, number: int) -> Player | None:
         """Returns the player with the given number (0-3)."""
-        for player in self.players:
-            if player.number == number:
-                return player
+        # players are numbered in the order they joined
+        if 0 <= number < self.number_of_players:
+            return self.players[number]
         return None
 
     def get_player_by_uuid(self, uuid) -> Player | None:
         """
         Returns the player with the given UUID.
         """
-        for player in self.players:
-            if player.get_uuid() == uuid:
-                return player
-        return None
+        return self._players_by_uuid.get(uuid)
 
     def get_name(self):
         return self.name
 
+    def turn_deadline(self) -> float | None:
+        """Time at which the current turn times out, None if no turn is running."""
+        if not self.game_started or self.game_over or self.turn_start_time is None:
+            return None
+        return self.turn_start_time + self.TURN_DURATION
+
+    def remaining_turn_time(self) -> int | None:
+        """Whole seconds left in the current turn, None before the game started."""
+        if not self.game_started or self.turn_start_time is None:
+            return None
+        elapsed_time = self.clock() - self.turn_start_time
+        return max(0, self.TURN_DURATION - int(elapsed_time))
+
+    def encoded_state(self, perspective_player_id: str | None = None) -> bytes:
+        """
+        to_json of the perspective without remaining_turn_time, encoded as compact JSON.
+        The public part is encoded once per state and cached, a request only encodes the requester's own entry.
+        """
+        snapshot = self._state_snapshot()
+        cache = self._encoded_state_cache
+        if cache is None or cache[0] != snapshot:
+            cache = self._encoded_state_cache = (snapshot, *self._encode_public_state(), {})
+        _, head, players, tail, own_entries = cache
+
+        viewer = self._players_by_uuid.get(perspective_player_id) if perspective_player_id else None
+        if viewer is not None:
+            # only the requester's entry differs from the public state: its uuid and the cards of the hand
+            own_entry = own_entries.get(viewer.number)
+            if own_entry is None:
+                own_entry = own_entries[viewer.number] = _encode_json(viewer.to_json(viewer.uuid))
+            players = players.copy()
+            players[viewer.number] = own_entry
+        return head + b",".join(players) + tail
+
+    def _encode_public_state(self) -> tuple[bytes, list[bytes], bytes]:
+        """Encodes the spectator state, split around the player list: (head, player entries, tail)."""
+        state = self.to_json()
+        del state["remaining_turn_time"]
+        players = [_encode_json(player) for player in state["players"]]
+        state["players"] = None
+        # quotes inside strings are escaped, so the marker can only match the key itself
+        head, tail = _encode_json(state).split(b'"players":null', 1)
+        return head + b'"players":[', players, b"]" + tail
+
     def to_json(self, perspective_player_id = None):
         """
         Convert the game object to a JSON serializable dictionary.
         This method ensures that all nested objects are also converted.
         """
-        remaining_time = None
-        if self.game_started and self.turn_start_time is not None:
-            elapsed_time = time.time() - self.turn_start_time
-            remaining_time = max(0, self.TURN_DURATION - int(elapsed_time))
-
         return {
             "uuid": self.uuid,
+            "state_version": self.state_version,
             "name": self.name,
             "players": [player.to_json(perspective_player_id) for player in self.players],
             "host_id": self.host_id,
@@ -608,6 +897,6 @@ class Game:
             "round_number": self.round_number,
             "game_started": self.game_started,
             "last_played_card": self.last_played_card.to_json() if self.last_played_card else None,
-            "remaining_turn_time": remaining_time,
+            "remaining_turn_time": self.remaining_turn_time(),
             "turn_duration": self.TURN_DURATION
         }
\ No newline at end of file
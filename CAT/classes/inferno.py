@@ -0,0 +1,131 @@
+from __future__ import annotations
+import typing
+from itertools import combinations
+
+from CAT.config import NUMBER_OF_FIELDS
+
+if typing.TYPE_CHECKING:
+    from .figure import Figure
+    from .game import Game
+    from .player import Player
+
+INFERNO_STEPS = 7
+
+
+def order_inferno_moves(moves: list[tuple[Figure, int]]) -> list[tuple[Figure, int]]:
+    """
+    Orders Inferno sub-moves so the figure in front moves first.
+    This is necessary for the Inferno Card to ensure correct burning logic,
+    moving figures must not burn each other. moves holds (figure, steps) tuples.
+    """
+    if not moves:
+        return []
+
+    moves = sorted(moves, key=lambda move: move[0].position)
+    count = len(moves)
+
+    # the largest gap between two neighbouring figures marks the back of the group
+    imax = 0
+    max_distance = 0
+    for i in range(count):
+        distance = (moves[(i + 1) % count][0].position - moves[i][0].position) % NUMBER_OF_FIELDS
+        if distance > max_distance:
+            imax = i
+            max_distance = distance
+
+    moves = moves[(imax + 1) % count:] + moves[:(imax + 1) % count]
+    moves.reverse()
+    return moves
+
+
+class InfernoSolver:
+    """
+    Finds every feasible way to split the Inferno steps among a player's figures.
+    The sub-moves of a split are probed in playing order on the board and rolled back,
+    so burns and figures blocking each other are taken into account. Results are cached
+    per board state and shared by the skip check, the legal move generator and the play itself.
+    """
+    CACHE_SIZE = 64
+
+    def __init__(self, game: Game):
+        self.game = game
+        # (player number, Zobrist hash of the figure positions) -> (splits, set of splits)
+        self._cache: dict[tuple, tuple[tuple, frozenset]] = {}
+
+    def get_splits(self, player: Player) -> tuple[tuple[tuple[Figure, int], ...], ...]:
+        """
+        Returns all feasible splits for the player on the current board.
+        Each split lists (figure, steps) in playing order, figures without steps are left out.
+        """
+        return self._get_cached(player)[0]
+
+    def check_split(self, player: Player, moves: list[tuple[Figure, int]]) -> list[tuple[Figure, int]]:
+        """
+        Returns the moves in playing order if the split is feasible, raises ValueError with the reason otherwise.
+        """
+        ordered_moves = order_inferno_moves([(figure, steps) for figure, steps in moves if steps])
+        if tuple(ordered_moves) in self._get_cached(player)[1]:
+            return ordered_moves
+
+        # replay the split on the board to report why it fails
+        game = self.game
+        game._begin_journal()
+        try:
+            for figure, steps in ordered_moves:
+                self._probe_move(figure, steps)
+        finally:
+            game._rollback_journal()
+        raise ValueError("This split of the Inferno Card is not possible.")
+
+    def _get_cached(self, player: Player) -> tuple[tuple, frozenset]:
+        key = (player.number, self.game._board_hash)
+        cached = self._cache.get(key)
+        if cached is None:
+            splits = self._solve(player)
+            cached = (splits, frozenset(splits))
+            if len(self._cache) >= self.CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = cached
+        return cached
+
+    def _solve(self, player: Player) -> tuple:
+        movable_figures = [figure for figure in player.figures if figure.position >= 0]
+        splits = []
+        # the playing order depends on which figures take part, so every subset gets its own search
+        for count in range(1, min(len(movable_figures), INFERNO_STEPS) + 1):
+            for subset in combinations(movable_figures, count):
+                order = [figure for figure, _ in order_inferno_moves([(figure, 0) for figure in subset])]
+                self._search(order, 0, INFERNO_STEPS, (), splits)
+        return tuple(splits)
+
+    def _search(self, order: list[Figure], index: int, remaining: int, prefix: tuple, splits: list):
+        """
+        Depth-first search over the steps of each figure. Sub-moves are probed on the game board
+        inside journal frames and rolled back, shared prefixes are played only once.
+        """
+        game = self.game
+        figure = order[index]
+        figures_left = len(order) - index - 1
+        # every taking part figure moves at least one step, the last one takes the rest
+        step_range = range(remaining, remaining + 1) if figures_left == 0 else range(1, remaining - figures_left + 1)
+        for steps in step_range:
+            try:
+                new_position, burned_tiles = game._plan_move_and_burn(figure, figure.position, steps, game.field_occupation)
+            except ValueError:
+                continue
+            split = prefix + ((figure, steps),)
+            if figures_left == 0:
+                splits.append(split)
+                continue
+            game._begin_journal()
+            try:
+                game._burn_and_move(figure, new_position, burned_tiles)
+                self._search(order, index + 1, remaining - steps, split, splits)
+            finally:
+                game._rollback_journal()
+
+    def _probe_move(self, figure: Figure, steps: int):
+        """Plays one sub-move like Game.move_and_burn, without any output."""
+        game = self.game
+        new_position, burned_tiles = game._plan_move_and_burn(figure, figure.position, steps, game.field_occupation)
+        game._burn_and_move(figure, new_position, burned_tiles)
@@ -1,24 +1,32 @@
 import uuid
 from .cards import *
 from .figure import Figure
-from CAT.config import FIGURES_PER_PLAYER, NUMBER_OF_FIELDS
+from .board import BOARD_GEOMETRY
+from .zobrist import ZOBRIST_KEYS
+from CAT.config import FIGURES_PER_PLAYER
 
 class Player:
+    __slots__ = ("uuid", "name", "number", "color", "cards", "figures", "startfield", "finishing_field", "is_active",
+                 "hand_hash", "_card_counts")
 
-    def __init__(self, name: str, number):
-        self.uuid = str(uuid.uuid4())
+    def __init__(self, name: str, number, player_uuid: str | None = None, figure_uuids: list[str] | None = None):
+        # the uuids are only given when a saved game is restored; the player uuid is the host id and the
+        # credential of every request, so it is created with the player, see Figure for the figure uuids
+        self.uuid = player_uuid or str(uuid.uuid4())
         self.name: str = name
         self.number: int = number
         self.color = "green" if number == 0 else "pink" if number == 1 else "orange" if number == 2 else "blue"
         self.cards: list[Card] = []
-        self.figures: list[Figure] = [Figure(self.color) for _ in range(FIGURES_PER_PLAYER)]
-        self.startfield = (number * 14) % NUMBER_OF_FIELDS
-        self.finishing_field = (self.startfield - 1) % NUMBER_OF_FIELDS
+        # figure ids are unique within a game: player number * FIGURES_PER_PLAYER + index
+        figure_uuids = figure_uuids or [None] * FIGURES_PER_PLAYER
+        self.figures: list[Figure] = [Figure(self.color, self, number * FIGURES_PER_PLAYER + i, figure_uuids[i])
+                                      for i in range(FIGURES_PER_PLAYER)]
+        self.startfield = BOARD_GEOMETRY.start_fields[number]
+        self.finishing_field = BOARD_GEOMETRY.finishing_fields[number]
         self.is_active = True
-
-
-
-
+        # Zobrist hash of the hand, kept up to date by add_card/remove_card/discard_cards
+        self.hand_hash = 0
+        self._card_counts: dict[str, int] = {}
 
     def to_json(self, perspective_player_id=None):
         """
@@ -43,6 +51,27 @@ class Player:
         }
 
 
+    def add_card(self, card: Card):
+        count = self._card_counts.get(card.name, 0)
+        self.hand_hash ^= ZOBRIST_KEYS.hand_key(self.number, card.name, count)
+        self._card_counts[card.name] = count + 1
+        self.cards.append(card)
+
+    def remove_card(self, card_index: int) -> Card:
+        card = self.cards.pop(card_index)
+        count = self._card_counts[card.name] - 1
+        self.hand_hash ^= ZOBRIST_KEYS.hand_key(self.number, card.name, count)
+        self._card_counts[card.name] = count
+        return card
+
+    def discard_cards(self) -> list[Card]:
+        """Empties the hand and returns the cards it held."""
+        cards = self.cards
+        self.cards = []
+        self.hand_hash = 0
+        self._card_counts = {}
+        return cards
+
     def get_cards(self):
         return self.cards
 
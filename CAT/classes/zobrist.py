@@ -0,0 +1,76 @@
+import random
+
+from .board import BOARD_GEOMETRY
+from .cards import IMITABLE_CARDS, JokerCard
+from CAT.config import FIGURES_PER_PLAYER, MAX_PLAYERS, MAX_CARDS_DEALT
+
+# Fixed seed, so the same state hashes to the same value in every process
+ZOBRIST_SEED = 0x5EED_CA7
+# Every card kind that can be held in a hand
+CARD_KINDS: tuple[str, ...] = tuple(card.name for card in IMITABLE_CARDS) + (JokerCard().name,)
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for every part of the game state.
+    A state hash is the XOR of the keys of its parts, so a change only
+    XORs the old key out and the new key in.
+    """
+
+    def __init__(self, seed: int = ZOBRIST_SEED):
+        self._seed = seed
+        self._rng = random.Random(seed)
+        geometry = BOARD_GEOMETRY
+
+        # every position a figure can take: home, ring tiles and all finishing slots
+        positions = [-1, *range(geometry.number_of_fields)]
+        for slots in geometry.finish_slots:
+            positions.extend(slots)
+        # figure_keys[figure id][position]
+        self.figure_keys = tuple(
+            {position: self._next_key() for position in positions}
+            for _ in range(MAX_PLAYERS * FIGURES_PER_PLAYER)
+        )
+
+        # current_player_keys[index + 1], index -1 before the game started
+        self.current_player_keys = tuple(self._next_key() for _ in range(MAX_PLAYERS + 1))
+
+        # hand_keys[player number][card kind][n]: key of the n-th card of that kind in the hand,
+        # so a hand hashes by its multiset of cards, independent of the order
+        self.hand_keys = tuple(
+            {kind: [self._next_key() for _ in range(MAX_CARDS_DEALT)] for kind in CARD_KINDS}
+            for _ in range(MAX_PLAYERS)
+        )
+
+        # rounds have no upper bound, their keys are drawn on demand from an own generator
+        self._round_rng = random.Random(self._next_key())
+        self._round_keys: list[int] = []
+
+    def _next_key(self) -> int:
+        return self._rng.getrandbits(64)
+
+    def figure_key(self, figure_id: int, position: int) -> int:
+        return self.figure_keys[figure_id][position]
+
+    def current_player_key(self, index: int) -> int:
+        return self.current_player_keys[index + 1]
+
+    def hand_key(self, player_number: int, card_name: str, count: int) -> int:
+        """Key of holding the count-th card (0-based) of a kind."""
+        keys = self.hand_keys[player_number][card_name]
+        if count >= len(keys):
+            # inactive players keep being dealt cards, their hands can outgrow MAX_CARDS_DEALT;
+            # every list is extended from its own generator, so the keys do not depend on the call order
+            rng = random.Random(f"{self._seed}-{player_number}-{card_name}-{len(keys)}")
+            keys.extend(rng.getrandbits(64) for _ in range(count + 1 - len(keys)))
+        return keys[count]
+
+    def round_key(self, round_number: int) -> int:
+        # keys are always drawn in order, so they are the same in every process
+        while len(self._round_keys) <= round_number:
+            self._round_keys.append(self._round_rng.getrandbits(64))
+        return self._round_keys[round_number]
+
+
+# Shared instance, the keys only depend on the seed and the configuration
+ZOBRIST_KEYS = ZobristKeys()
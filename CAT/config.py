@@ -16,6 +16,18 @@ MIN_PLAYERS_TO_START = 2
 TURN_DURATION = 20
 GAME_INACTIVITY_TIMEOUT = 180
 
+# ==================================
+# WEBSOCKET
+# ==================================
+WS_MAX_PENDING_MESSAGES = 32 # a client this far behind gets one "update" instead of the missed deltas
+WS_SEND_TIMEOUT = 10 # seconds, a client that takes longer to accept one message is disconnected
+
+# ==================================
+# PERSISTENCE
+# ==================================
+STATE_FLUSH_INTERVAL = 0.05 # seconds between two writes of the saved commands, a crash loses at most this much
+STATE_SNAPSHOT_INTERVAL = 100 # saved commands of a game before they are replaced by a snapshot
+
 # Card Cycle: Starts with 6 cards, cycle length is 5 rounds (6, 5, 4, 3, 2)
 MAX_CARDS_DEALT = 6
 CARD_DEAL_CYCLE_LENGTH = 5
@@ -0,0 +1,102 @@
+"""
+Structured event logging for the game, deck and API.
+
+Events are logged as a name plus keyword fields, e.g. log.debug("figure_moved", figure=3, to=17),
+and every event of a game carries its game id. Nothing is formatted unless the level is enabled,
+so disabled events cost one level check. configure_logging() writes the events as JSON lines
+from a background thread, the game loop only puts the records on a queue.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+ROOT_LOGGER_NAME = "CAT"
+
+
+class EventLogger:
+    """Logs named events with keyword fields to a logger, optionally bound to a game id."""
+    __slots__ = ("logger", "game_id")
+
+    def __init__(self, name: str, game_id: str | None = None):
+        self.logger = logging.getLogger(name)
+        self.game_id = game_id
+
+    def bind(self, game_id: str) -> "EventLogger":
+        """Returns a logger for the same channel whose events carry game_id."""
+        return EventLogger(self.logger.name, game_id)
+
+    def is_enabled(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def _log(self, level: int, event: str, fields: dict):
+        if self.logger.isEnabledFor(level):
+            game_id = fields.pop("game_id", self.game_id)
+            self.logger.log(level, event, extra={"event": event, "game_id": game_id, "fields": fields}, stacklevel=3)
+
+    def debug(self, event: str, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields):
+        self._log(logging.WARNING, event, fields)
+
+
+def get_event_logger(channel: str, game_id: str | None = None) -> EventLogger:
+    """Event logger of a channel below the CAT logger, e.g. "game", "deck" or "api"."""
+    return EventLogger(f"{ROOT_LOGGER_NAME}.{channel}", game_id)
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per event: time, level, channel, event, game id and the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", record.getMessage()),
+            "game_id": getattr(record, "game_id", None),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging(level: int | str = logging.INFO, stream=None) -> logging.handlers.QueueListener:
+    """
+    Sends the CAT events of at least level as JSON lines to stream (stderr by default).
+    The records go through a queue, a background thread formats and writes them.
+    Calling it again replaces the previous configuration.
+    """
+    global _listener
+    stop_logging()
+
+    sink = logging.StreamHandler(stream or sys.stderr)
+    sink.setFormatter(JsonLineFormatter())
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, sink, respect_handler_level=True)
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.setLevel(level)
+    root.propagate = False
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Writes the queued events and stops the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
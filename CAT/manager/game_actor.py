@@ -0,0 +1,90 @@
+import asyncio
+import inspect
+from collections import deque
+from typing import Any, Callable
+
+from CAT.classes.game import Game
+
+
+class GameActor:
+    """
+    Runs everything that touches one game in order: plays, joins, kicks, timeouts and snapshots are
+    commands in a queue, and a single task applies them one after another. Games do not share a lock,
+    each one has its own queue and task.
+
+    The task only lives while commands are waiting. It takes all waiting commands as one batch and
+    publishes the state once after the batch, so a burst of commands costs one delta.
+    """
+
+    def __init__(self, game: Game, on_change: Callable[[Game], None] | None = None):
+        self.game = game
+        # called after every batch, e.g. to register the new deadlines of the game
+        self.on_change = on_change
+        # (command, future, changes_state)
+        self._commands: deque[tuple[Callable[[Game], Any], asyncio.Future, bool]] = deque()
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, command: Callable[[Game], Any]) -> Any:
+        """
+        Queues command(game), which may be a coroutine function, and returns its result once it ran.
+        An exception of the command is raised here, in the caller.
+        """
+        return await self._enqueue(command, True)
+
+    async def read(self, command: Callable[[Game], Any]) -> Any:
+        """Like submit, for commands that only read the game, e.g. to encode a snapshot."""
+        return await self._enqueue(command, False)
+
+    def _enqueue(self, command: Callable[[Game], Any], changes_state: bool) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._commands.append((command, future, changes_state))
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+        return future
+
+    async def _run(self):
+        try:
+            while self._commands:
+                batch = list(self._commands)
+                self._commands.clear()
+                results = []
+                changed = False
+                for command, future, changes_state in batch:
+                    if future.cancelled():
+                        continue
+                    if changes_state:
+                        changed = True
+                    elif changed:
+                        # a read sees the published state, its version matches its content
+                        await self._publish(results)
+                        changed = False
+                    try:
+                        result = command(self.game)
+                        if inspect.isawaitable(result):
+                            result = await result
+                        results.append((future, result, None))
+                    except Exception as e:
+                        results.append((future, None, e))
+
+                # the callers continue after the delta of their commands was sent
+                if changed:
+                    await self._publish(results)
+                if self.on_change is not None:
+                    self.on_change(self.game)
+                for future, result, error in results:
+                    if future.cancelled():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._task = None
+
+    async def _publish(self, results: list):
+        try:
+            await self.game.publish_state()
+        except Exception as e:
+            # the commands ran, but their callers have to learn that the clients were not updated
+            results[:] = [(future, None, error or e) for future, _, error in results]
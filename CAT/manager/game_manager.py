@@ -1,13 +1,37 @@
+from typing import Awaitable, Callable
 from CAT.classes.game import Game
 from CAT.classes.player import Player
+from CAT.config import GAME_INACTIVITY_TIMEOUT
+from CAT.manager.game_actor import GameActor
+from CAT.manager.game_store import GameStore, apply_command
+from CAT.manager.lobby_index import LobbyIndex
+from CAT.manager.scheduler import DeadlineScheduler
+from CAT.manager.sharding import ShardConfig
+
+# Deadline kinds of a game in the scheduler
+TURN_DEADLINE = "turn"
+INACTIVITY_DEADLINE = "inactivity"
 
 class GameManager:
     """
     Manages the game state and player interactions.
     """
 
-    def __init__(self):
+    def __init__(self, notifier: Callable[[str, dict], Awaitable[None]] | None = None,
+                 shard: ShardConfig | None = None, store: GameStore | None = None):
+        # the partition of game ids this process owns, all of them unless it runs as shard worker
+        self.shard = shard or ShardConfig()
         self.games = {}
+        # one actor per game, every change of a game goes through its actor
+        self.actors: dict[str, GameActor] = {}
+        # turn and inactivity deadlines of all games, registered when they change
+        self.scheduler = DeadlineScheduler()
+        # summaries for the lobby list, kept up to date instead of serializing every game per request
+        self.lobby_index = LobbyIndex(self.shard.index if self.shard.sharded else None)
+        # passed on to every game, so the games can push events without knowing the transport
+        self.notifier = notifier
+        # saves the commands of every game, None keeps the games in memory only
+        self.store = store
 
     def create_game(self, name: str, player_name) -> Game:
         """
@@ -16,12 +40,79 @@ class GameManager:
 
 
         player_objects = [Player(player_name, 0)]
-        game = Game(name, player_objects)
+        game = Game(name, player_objects, notifier=self.notifier, game_id=self.shard.new_game_id())
+        return self.add_game(game)
+
+    def add_game(self, game: Game) -> Game:
+        """
+        Registers an existing game, e.g. a prepared one of the benchmarks.
+        """
+        if self.store is not None:
+            game.recorder = self.store.record
+            self.store.snapshot(game)
         self.games[game.uuid] = game
+        self.actors.pop(game.uuid, None)
+        self.game_changed(game)
         return game
 
     def get_game(self, uuid: str) -> Game | None:
         """
         Returns the game with the given UUID.
         """
-        return self.games.get(uuid)
\ No newline at end of file
+        return self.games.get(uuid)
+
+    def get_actor(self, uuid: str) -> GameActor | None:
+        """
+        Returns the actor that runs the commands of the game with the given UUID.
+        """
+        game = self.games.get(uuid)
+        if game is None:
+            return None
+        actor = self.actors.get(uuid)
+        # created on first use, most lobbies never get a command
+        if actor is None:
+            actor = self.actors[uuid] = GameActor(game, on_change=self.game_changed)
+        return actor
+
+    def game_changed(self, game: Game):
+        """
+        Called after the commands of a game ran: updates its deadlines and its lobby summary.
+        """
+        self.schedule_deadlines(game)
+        self.lobby_index.update(game)
+        if self.store is not None:
+            self.store.game_changed(game)
+
+    def restore_games(self):
+        """
+        Registers the games saved by the store, called once at startup.
+        Each game continues from its snapshot with the commands recorded after it replayed.
+        """
+        for snapshot, commands in self.store.load():
+            game = Game.from_snapshot(snapshot, notifier=self.notifier)
+            for command, fields in commands:
+                apply_command(game, command, fields)
+            # every command published at most one version, so no version a client saw before names a different state
+            game.state_version += len(commands)
+            game.state_delta()
+            self.add_game(game)
+
+    def schedule_deadlines(self, game: Game):
+        """
+        Registers the end of the current turn and of the inactivity period of a game.
+        """
+        self.scheduler.schedule(game.uuid, INACTIVITY_DEADLINE, game.last_activity_time + GAME_INACTIVITY_TIMEOUT)
+        turn_deadline = game.turn_deadline()
+        if turn_deadline is not None:
+            self.scheduler.schedule(game.uuid, TURN_DEADLINE, turn_deadline)
+
+    def remove_game(self, uuid: str):
+        """
+        Removes a game, commands that are already queued still run.
+        """
+        self.games.pop(uuid, None)
+        self.actors.pop(uuid, None)
+        self.scheduler.cancel(uuid, TURN_DEADLINE, INACTIVITY_DEADLINE)
+        self.lobby_index.remove(uuid)
+        if self.store is not None:
+            self.store.remove(uuid)
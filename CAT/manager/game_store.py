@@ -0,0 +1,246 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any
+
+from CAT.classes.game import Game
+from CAT.config import STATE_FLUSH_INTERVAL, STATE_SNAPSHOT_INTERVAL
+from CAT.event_log import get_event_logger
+
+log = get_event_logger("game_store")
+
+# one instance, json.dumps with separators builds a new encoder per call
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+# Einträge der Schreib-Warteschlange
+_COMMAND, _SNAPSHOT, _REMOVE = 1, 2, 3
+# seconds between two tries to write entries whose transaction failed
+WRITE_RETRY_DELAY = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (game_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS origins (game_id TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS commands (
+    game_id TEXT NOT NULL, seq INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (game_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def apply_command(game: Game, command: str, fields: dict):
+    """
+    Runs a saved command again, at the time it was recorded. A command that failed when it was
+    recorded fails the same way now, its error is ignored like the live one was answered with an error.
+    """
+    game.clock = lambda: fields["at"]
+    try:
+        if command == "play":
+            game.play_card(game.players[fields["player"]], fields["card_index"], fields["action_details"])
+        elif command == "join":
+            game.add_player(fields["name"], fields["player"], fields["figures"])
+        elif command == "start":
+            game.start_game_and_deal_cards()
+        elif command == "kick_vote":
+            game.register_kick_vote(game.players[fields["voter"]], fields["player"])
+        elif command == "timeout":
+            game._check_and_handle_timeout()
+        else:
+            raise ValueError(f"Unknown command: {command}")
+    except Exception as e:
+        log.debug("replayed_command_failed", game_id=game.uuid, command=command, error=repr(e))
+    finally:
+        game.clock = time.time
+
+
+class GameStore:
+    """
+    Saves the running games in a SQLite file, so a restart (deploy.sh kills the server) does not end them.
+    Per game it keeps the last snapshot and the commands recorded since, see Game.recorder;
+    restoring a game replays these commands on top of the snapshot.
+
+    The event loop only puts a command on a queue. A writer thread encodes and commits everything
+    queued in one transaction every STATE_FLUSH_INTERVAL, so a crash loses at most that much.
+    A transaction that fails keeps its entries, they are tried again every WRITE_RETRY_DELAY.
+    After STATE_SNAPSHOT_INTERVAL commands of a game a new snapshot replaces them.
+
+    With keep_history the first snapshot and every command of a game are kept, also after the game ended,
+    so CAT/manager/replay.py can play it again from the start.
+    """
+
+    def __init__(self, path: str, flush_interval: float = STATE_FLUSH_INTERVAL,
+                 snapshot_interval: int = STATE_SNAPSHOT_INTERVAL, keep_history: bool = False):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.keep_history = keep_history
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # sequence number of the next command per game, and how many were recorded since its snapshot
+        self._next_seq: dict[str, int] = {}
+        self._since_snapshot: dict[str, int] = {}
+        self._thread: threading.Thread | None = None
+        connection = self._connect()
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        # WAL: the writer does not block readers, NORMAL: no fsync per transaction, still consistent after a crash
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self):
+        self._thread = threading.Thread(target=self._write_loop, name="game-store", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Writes everything queued and stops the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def record(self, game: Game, command: str, fields: dict):
+        """
+        Recorder of the games, queues a command before it runs. The writer thread encodes it,
+        the fields (e.g. the action details of a request) are not changed after they were recorded.
+        """
+        seq = self._next_seq.get(game.uuid, 0)
+        self._next_seq[game.uuid] = seq + 1
+        self._since_snapshot[game.uuid] = self._since_snapshot.get(game.uuid, 0) + 1
+        self._queue.put((_COMMAND, game.uuid, seq, (command, fields)))
+
+    def snapshot(self, game: Game):
+        """Queues a snapshot of the game, it replaces every command recorded so far."""
+        self._since_snapshot[game.uuid] = 0
+        self._queue.put((_SNAPSHOT, game.uuid, self._next_seq.get(game.uuid, 0), game.to_snapshot()))
+
+    def game_changed(self, game: Game):
+        """Called after the commands of a game ran, takes a snapshot when enough commands piled up."""
+        if self._since_snapshot.get(game.uuid, 0) >= self.snapshot_interval:
+            self.snapshot(game)
+
+    def remove(self, game_id: str):
+        self._next_seq.pop(game_id, None)
+        self._since_snapshot.pop(game_id, None)
+        self._queue.put((_REMOVE, game_id))
+
+    def load(self) -> list[tuple[dict, list[tuple[str, dict]]]]:
+        """Reads every saved game: its snapshot and the commands recorded after it, in order."""
+        connection = self._connect()
+        try:
+            games = []
+            for game_id, snapshot_seq, data in connection.execute("SELECT game_id, seq, data FROM snapshots"):
+                commands = []
+                next_seq = snapshot_seq
+                for seq, command in connection.execute(
+                        "SELECT seq, data FROM commands WHERE game_id = ? AND seq >= ? ORDER BY seq",
+                        (game_id, snapshot_seq)):
+                    commands.append(tuple(json.loads(command)))
+                    next_seq = seq + 1
+                self._next_seq[game_id] = next_seq
+                self._since_snapshot[game_id] = len(commands)
+                games.append((json.loads(zlib.decompress(data)), commands))
+            return games
+        finally:
+            connection.close()
+
+    def load_history(self, game_id: str) -> tuple[dict, list[tuple[str, dict]]]:
+        """The first snapshot of a game kept with keep_history and every command recorded after it."""
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT data FROM origins WHERE game_id = ?", (game_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"No history of game {game_id} in {self.path}.")
+            commands = [tuple(json.loads(command)) for command, in connection.execute(
+                "SELECT data FROM commands WHERE game_id = ? ORDER BY seq", (game_id,))]
+            return json.loads(zlib.decompress(row[0])), commands
+        finally:
+            connection.close()
+
+    def list_history(self) -> list[tuple[str, int]]:
+        """The ids of the games with a kept history and their number of commands."""
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT game_id, (SELECT COUNT(*) FROM commands WHERE commands.game_id = origins.game_id) "
+                "FROM origins ORDER BY rowid").fetchall()
+        finally:
+            connection.close()
+
+    def _write_loop(self):
+        connection = self._connect()
+        # entries of a failed transaction, they are written again together with the next ones
+        pending: list[tuple[Any, ...]] = []
+        try:
+            while True:
+                # while entries are pending, they are tried again even if nothing new arrives
+                entries = [] if pending else [self._queue.get()]
+                while True:
+                    try:
+                        entries.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in entries
+                pending.extend(entry for entry in entries if entry is not None)
+                if not self._try_write(connection, pending) and stop:
+                    # last try after the repair, close() must not wait for a store that keeps failing
+                    self._try_write(connection, pending)
+                if stop:
+                    if pending:
+                        log.warning("game_store_entries_lost", entries=len(pending))
+                    return
+                # group commit: whatever arrives meanwhile goes into the next transaction
+                time.sleep(WRITE_RETRY_DELAY if pending else self.flush_interval)
+        finally:
+            connection.close()
+
+    def _try_write(self, connection: sqlite3.Connection, pending: list[tuple[Any, ...]]) -> bool:
+        """Writes the pending entries in one transaction and clears them, False if they have to be tried again."""
+        if not pending:
+            return True
+        try:
+            self._write(connection, pending)
+        except sqlite3.Error as e:
+            log.warning("game_store_write_failed", entries=len(pending), error=repr(e))
+            try:
+                # e.g. a table that was dropped, the next try writes into a new one
+                connection.executescript(_SCHEMA)
+            except sqlite3.Error as schema_error:
+                log.warning("game_store_schema_failed", error=repr(schema_error))
+            return False
+        except Exception as e:
+            # e.g. fields that cannot be encoded, another try would fail the same way
+            log.warning("game_store_entries_dropped", entries=len(pending), error=repr(e))
+        pending.clear()
+        return True
+
+    def _write(self, connection: sqlite3.Connection, entries: list[tuple[Any, ...]]):
+        connection.execute("BEGIN")
+        try:
+            for entry in entries:
+                kind, game_id = entry[0], entry[1]
+                if kind == _COMMAND:
+                    connection.execute("INSERT OR REPLACE INTO commands VALUES (?, ?, ?)",
+                                       (game_id, entry[2], _JSON_ENCODER.encode(entry[3])))
+                elif kind == _SNAPSHOT:
+                    data = zlib.compress(_JSON_ENCODER.encode(entry[3]).encode())
+                    connection.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", (game_id, entry[2], data))
+                    if self.keep_history:
+                        # only the first one, later ones (e.g. after a restart) continue the same history
+                        connection.execute("INSERT OR IGNORE INTO origins VALUES (?, ?)", (game_id, data))
+                    else:
+                        connection.execute("DELETE FROM commands WHERE game_id = ? AND seq < ?", (game_id, entry[2]))
+                else:
+                    connection.execute("DELETE FROM snapshots WHERE game_id = ?", (game_id,))
+                    if not self.keep_history:
+                        connection.execute("DELETE FROM commands WHERE game_id = ?", (game_id,))
+            connection.execute("COMMIT")
+        except BaseException:
+            # some errors (e.g. a full disk) already rolled the transaction back
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
@@ -0,0 +1,142 @@
+import itertools
+import json
+from collections import OrderedDict
+from typing import Callable
+
+from CAT.classes.game import Game
+from CAT.config import MAX_PLAYERS
+
+# Filters of the lobby list
+LOBBY_FILTERS = ("all", "open", "joinable")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Encoded pages kept per index version, different filters and offsets each have their own page
+CACHED_PAGES = 64
+
+
+class LobbySummary:
+    """The part of a game the lobby list shows, small enough to list thousands of lobbies."""
+    __slots__ = ("uuid", "name", "number_of_players", "game_started", "game_over", "created_at")
+
+    def __init__(self, game: Game):
+        self.uuid = game.uuid
+        self.name = game.name
+        self.number_of_players = game.number_of_players
+        self.game_started = game.game_started
+        self.game_over = game.game_over
+        self.created_at = game.created_at
+
+    def key(self) -> tuple:
+        return self.name, self.number_of_players, self.game_started, self.game_over
+
+    @property
+    def open_seats(self) -> int:
+        return MAX_PLAYERS - self.number_of_players
+
+    def matches(self, lobby_filter: str, name: str, min_players: int) -> bool:
+        if lobby_filter != "all" and (self.game_started or self.game_over):
+            return False
+        if lobby_filter == "joinable" and self.open_seats <= 0:
+            return False
+        return self.number_of_players >= min_players and (not name or name in self.name.lower())
+
+    def to_json(self):
+        return {
+            "uuid": self.uuid,
+            "name": self.name,
+            "number_of_players": self.number_of_players,
+            "max_players": MAX_PLAYERS,
+            "open_seats": self.open_seats,
+            "game_started": self.game_started,
+            "created_at": self.created_at,
+        }
+
+
+class LobbyIndex:
+    """
+    Summaries of all games in creation order, updated when a game is created, changes or closes.
+    Pages are encoded once per index version and filter, the version only changes when a summary does,
+    so moves in running games do not invalidate the pages.
+
+    Every change is also passed to the listeners as event, tagged with the new version:
+    lobby_created, lobby_joined, lobby_started and lobby_updated carry the summary, lobby_closed the uuid.
+    The index of a shard worker also tags events and pages with its shard, each shard counts its own versions.
+    """
+
+    def __init__(self, shard: int | None = None):
+        self.shard = shard
+        self.summaries: dict[str, LobbySummary] = {}
+        self.version = 0
+        self._pages: OrderedDict[tuple, bytes] = OrderedDict()
+        self._listeners: list[Callable[[dict], None]] = []
+
+    def subscribe(self, listener: Callable[[dict], None]):
+        self._listeners.append(listener)
+
+    def update(self, game: Game):
+        """Adds the game or refreshes its summary."""
+        summary = LobbySummary(game)
+        current = self.summaries.get(game.uuid)
+        if current is None:
+            event = "lobby_created"
+        elif current.key() == summary.key():
+            return
+        elif summary.game_started and not current.game_started:
+            event = "lobby_started"
+        elif summary.number_of_players > current.number_of_players:
+            event = "lobby_joined"
+        else:
+            event = "lobby_updated"
+        self.summaries[game.uuid] = summary
+        self._changed({"event": event, "lobby": summary.to_json()})
+
+    def remove(self, uuid: str):
+        if self.summaries.pop(uuid, None) is not None:
+            self._changed({"event": "lobby_closed", "uuid": uuid})
+
+    def _changed(self, event: dict):
+        self.version += 1
+        self._pages.clear()
+        if self._listeners:
+            event["version"] = self.version
+            if self.shard is not None:
+                event["shard"] = self.shard
+            for listener in self._listeners:
+                listener(event)
+
+    def page(self, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE, lobby_filter: str = "all",
+             name: str = "", min_players: int = 0) -> bytes:
+        """
+        The encoded JSON page {"lobbies": [...], "total", "offset", "limit", "version"} (and "shard"),
+        total counts every lobby that passes the filter.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        name = name.strip().lower()
+        key = (offset, limit, lobby_filter, name, min_players)
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+            return page
+
+        if lobby_filter == "all" and not name and min_players <= 0:
+            total = len(self.summaries)
+            selected = itertools.islice(self.summaries.values(), offset, offset + limit)
+        else:
+            matching = [summary for summary in self.summaries.values() if summary.matches(lobby_filter, name, min_players)]
+            total = len(matching)
+            selected = matching[offset:offset + limit]
+        content = {
+            "lobbies": [summary.to_json() for summary in selected],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "version": self.version,
+        }
+        if self.shard is not None:
+            content["shard"] = self.shard
+        page = json.dumps(content, separators=(",", ":")).encode()
+        self._pages[key] = page
+        if len(self._pages) > CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
@@ -0,0 +1,187 @@
+"""
+Plays a recorded game again without any I/O, as fast as the rules run, e.g. to profile a slow
+position or to reproduce a bug seen in production. A recording is the snapshot of a game before
+its first command plus every command after it, see Game.recorder. The server keeps them when
+CAT_STATE_HISTORY=1 is set next to CAT_STATE_DB:
+
+    python -m CAT.manager.replay games.db --list
+    python -m CAT.manager.replay games.db <game id>
+    python -m CAT.manager.replay games.db <game id> --turn 120
+    python -m CAT.manager.replay games.db <game id> --profile
+"""
+import argparse
+import bisect
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+
+from CAT.classes.game import Game
+from CAT.manager.game_store import GameStore, apply_command
+
+# commands between two snapshots kept while replaying, seeking backwards starts from the closest one
+CHECKPOINT_INTERVAL = 200
+
+
+class GameRecording:
+    """Records a game in memory, e.g. one of the simulator or the benchmarks."""
+
+    def __init__(self, game: Game):
+        self.origin = game.to_snapshot()
+        self.commands: list[tuple[str, dict]] = []
+        game.recorder = self.record
+
+    def record(self, game: Game, command: str, fields: dict):
+        # copied like the store encodes them, the action details of a play belong to the caller
+        self.commands.append((command, json.loads(json.dumps(fields))))
+
+
+class GameReplay:
+    """
+    Rebuilds a game from its recording. The game has no notifier and no recorder, so nothing leaves
+    the process, and every command runs at the time it was recorded like in GameManager.restore_games.
+
+    Commands are recorded before they run, so rejected ones are in the recording too; they still count,
+    a late play e.g. passes the turn that timed out. A turn ends with the command that moves the started
+    game to another player or round, or ends it, so the turns are found while the commands are replayed.
+    """
+
+    def __init__(self, origin: dict, commands: list[tuple[str, dict]], checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        self.origin = origin
+        self.commands = commands
+        self.checkpoint_interval = checkpoint_interval
+        # number of commands applied when a turn ended, as far as the replay got
+        self.turn_ends: list[int] = []
+        # snapshots by the number of commands applied before them
+        self._checkpoints: dict[int, dict] = {0: origin}
+        self.game: Game | None = None
+        self.position = 0
+        self.reset()
+
+    @classmethod
+    def from_store(cls, store: GameStore, game_id: str, **kwargs) -> "GameReplay":
+        origin, commands = store.load_history(game_id)
+        return cls(origin, commands, **kwargs)
+
+    @classmethod
+    def from_recording(cls, recording: GameRecording, **kwargs) -> "GameReplay":
+        return cls(recording.origin, recording.commands, **kwargs)
+
+    @property
+    def turn(self) -> int:
+        """Turns ended so far."""
+        return bisect.bisect_right(self.turn_ends, self.position)
+
+    def reset(self):
+        """Back to the game before its first command."""
+        self._restore(0)
+
+    def step(self) -> bool:
+        """Applies the next command, False at the end of the recording."""
+        if self.position >= len(self.commands):
+            return False
+        command, fields = self.commands[self.position]
+        game = self.game
+        before = (game.current_player_index, game.round_number, game.game_over)
+        started = game.game_started
+        apply_command(game, command, fields)
+        self.position += 1
+        # a command after a checkpoint was seen before, when the replay first got here
+        if (started and before != (game.current_player_index, game.round_number, game.game_over)
+                and (not self.turn_ends or self.turn_ends[-1] < self.position)):
+            self.turn_ends.append(self.position)
+        if self.checkpoint_interval and self.position % self.checkpoint_interval == 0:
+            self._checkpoints.setdefault(self.position, self.game.to_snapshot())
+        return True
+
+    def seek_command(self, position: int) -> Game:
+        """The game after the first position commands. Backwards it starts again from the closest checkpoint."""
+        position = max(0, min(position, len(self.commands)))
+        if position < self.position:
+            self._restore(max(checkpoint for checkpoint in self._checkpoints if checkpoint <= position))
+        while self.position < position:
+            self.step()
+        return self.game
+
+    def seek(self, turn: int) -> Game:
+        """The game right after the given number of turns ended, turn 0 is the start of the recording."""
+        if turn <= 0:
+            return self.seek_command(0)
+        # a turn not found yet ends further on, the replay goes on until it ends or the recording does
+        while len(self.turn_ends) < turn and self.step():
+            pass
+        if len(self.turn_ends) < turn:
+            return self.game
+        return self.seek_command(self.turn_ends[turn - 1])
+
+    def run(self) -> Game:
+        """The game after every recorded command."""
+        return self.seek_command(len(self.commands))
+
+    def _restore(self, position: int):
+        self.game = Game.from_snapshot(self._checkpoints[position])
+        self.position = position
+
+
+def _summary(replay: GameReplay) -> dict:
+    game = replay.game
+    return {
+        "game_id": game.uuid,
+        "command": replay.position,
+        "commands": len(replay.commands),
+        "turn": replay.turn,
+        "round_number": game.round_number,
+        "current_player_index": game.current_player_index,
+        "game_over": game.game_over,
+        "state_hash": f"{game.state_hash:016x}",
+        "players": [{
+            "name": player.name,
+            "is_active": player.is_active,
+            "cards": [card.name for card in player.cards],
+            "positions": [figure.position for figure in player.figures],
+        } for player in game.players],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replays a game recorded with CAT_STATE_HISTORY=1 without any I/O.")
+    parser.add_argument("database", help="the file of CAT_STATE_DB")
+    parser.add_argument("game_id", nargs="?")
+    parser.add_argument("--list", action="store_true", help="lists the recorded games")
+    parser.add_argument("--turn", type=int, default=None, help="stops after this many turns, default: the end")
+    parser.add_argument("--profile", action="store_true", help="prints the slowest functions of the replay")
+    parser.add_argument("--top", type=int, default=30, help="functions printed by --profile")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        parser.error(f"{args.database} does not exist")
+    store = GameStore(args.database)
+    if args.list:
+        for game_id, commands in store.list_history():
+            print(game_id, commands)
+        sys.exit()
+    if args.game_id is None:
+        parser.error("a game id or --list is required")
+
+    # without checkpoints, the replay times the rules only
+    replay = GameReplay.from_store(store, args.game_id, checkpoint_interval=0)
+    profiler = cProfile.Profile() if args.profile else None
+    start_time = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    if args.turn is None:
+        replay.run()
+    else:
+        replay.seek(args.turn)
+    if profiler is not None:
+        profiler.disable()
+    elapsed = time.perf_counter() - start_time
+
+    result = _summary(replay)
+    result["seconds"] = elapsed
+    result["commands_per_second"] = replay.position / elapsed if elapsed else 0
+    print(json.dumps(result, indent=2))
+    if profiler is not None:
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(args.top)
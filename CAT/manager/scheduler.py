@@ -0,0 +1,83 @@
+import asyncio
+import heapq
+import time
+from typing import Awaitable, Callable, Hashable
+
+from CAT.event_log import get_event_logger
+
+log = get_event_logger("scheduler")
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of deadlines, e.g. the end of a turn or of the inactivity period of a game.
+    Only expired entries are touched, so idle games cost nothing until their deadline.
+
+    Every (key, kind) has at most one live entry. Scheduling a later deadline keeps the earlier entry:
+    when it expires, the handler checks the real deadline and schedules it again if it moved.
+    Deadlines of games only move back, so activity does not grow the heap.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        # (deadline, key, kind), entries whose deadline is no longer in self._deadlines are skipped
+        self._heap: list[tuple[float, Hashable, str]] = []
+        self._deadlines: dict[tuple[Hashable, str], float] = {}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, key: Hashable, kind: str, deadline: float):
+        """Registers a deadline, unless an earlier one of the same key and kind is pending."""
+        current = self._deadlines.get((key, kind))
+        if current is not None and current <= deadline:
+            return
+        self._deadlines[key, kind] = deadline
+        heapq.heappush(self._heap, (deadline, key, kind))
+        if self._heap[0][0] == deadline:
+            # the runner sleeps until the previous first deadline
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable, *kinds: str):
+        """Drops the deadlines of key of the given kinds, their heap entries are skipped later."""
+        for kind in kinds:
+            self._deadlines.pop((key, kind), None)
+
+    def next_deadline(self) -> float | None:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now: float | None = None) -> list[tuple[Hashable, str]]:
+        """Removes and returns (key, kind) of every deadline before now."""
+        now = self.clock() if now is None else now
+        expired = []
+        while self._heap and self._heap[0][0] < now:
+            deadline, key, kind = heapq.heappop(self._heap)
+            if self._deadlines.get((key, kind)) == deadline:
+                del self._deadlines[key, kind]
+                expired.append((key, kind))
+        return expired
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._deadlines.get((heap[0][1], heap[0][2])) != heap[0][0]:
+            heapq.heappop(heap)
+
+    async def run(self, handler: Callable[[Hashable, str], Awaitable[None]]):
+        """Calls handler(key, kind) for every deadline when it expires, runs until cancelled."""
+        while True:
+            expired = self.pop_expired()
+            if expired:
+                results = await asyncio.gather(*(handler(key, kind) for key, kind in expired), return_exceptions=True)
+                for (key, kind), result in zip(expired, results):
+                    if isinstance(result, Exception):
+                        log.warning("deadline_handler_failed", game_id=key, kind=kind, error=repr(result))
+                continue
+
+            deadline = self.next_deadline()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), None if deadline is None else max(0.0, deadline - self.clock()))
+            except asyncio.TimeoutError:
+                pass
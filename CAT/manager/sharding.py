@@ -0,0 +1,43 @@
+import os
+import uuid
+import zlib
+
+
+def shard_of(game_id: str, shards: int) -> int:
+    """
+    The shard that owns a game. crc32 instead of hash(), the front process and
+    every worker have to agree on it and hash() of str differs per process.
+    """
+    return zlib.crc32(game_id.encode()) % shards
+
+
+class ShardConfig:
+    """
+    The partition of game ids one worker process owns, see CAT/API/shard_router.py.
+    A single process (the default) owns every game.
+    """
+
+    def __init__(self, index: int = 0, count: int = 1):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index} of {count}.")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def from_env(cls) -> "ShardConfig":
+        """Read from CAT_SHARD_INDEX and CAT_SHARDS, which the front process sets for its workers."""
+        return cls(int(os.getenv("CAT_SHARD_INDEX", 0)), int(os.getenv("CAT_SHARDS", 1)))
+
+    @property
+    def sharded(self) -> bool:
+        return self.count > 1
+
+    def owns(self, game_id: str) -> bool:
+        return shard_of(game_id, self.count) == self.index
+
+    def new_game_id(self) -> str:
+        """A fresh game id that hashes to this shard, takes count tries on average."""
+        while True:
+            game_id = str(uuid.uuid4())
+            if self.owns(game_id):
+                return game_id
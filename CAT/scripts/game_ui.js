@@ -1,10 +1,29 @@
-import sendRequest, { getConfig } from './services/server_service.js';
+import sendRequest, { fetchResponse, getConfig } from './services/server_service.js';
 import gameService from './services/game_service.js';
+import decodeFrame from './services/wire_format.js';
 import { renderFigures } from './game_board.js';
 import {translate} from "./translator.mjs";
 import getCookie from "./functions.mjs";
 
 let socket = null;
+// Statische Spieldaten für die Binärframes, kommen vor dem ersten Frame als Event "meta"
+let wireMeta = null;
+// Über den WebSocket gesendete Aktionen, die noch auf "ack" oder "error" warten: {request_id: {resolve, reject}}
+const pendingActions = new Map();
+let nextRequestId = 1;
+
+function socketIsOpen() {
+    return socket !== null && socket.readyState === WebSocket.OPEN;
+}
+
+// Schickt eine Aktion (play, start, vote_kick) über den WebSocket, das Promise endet mit der Antwort des Servers
+function sendSocketAction(action, fields = {}) {
+    return new Promise((resolve, reject) => {
+        const requestId = nextRequestId++;
+        pendingActions.set(requestId, { resolve, reject });
+        socket.send(JSON.stringify({ action: action, request_id: requestId, ...fields }));
+    });
+}
 let turnTimerInterval = null;
 
 function renderPlayButton() {
@@ -470,14 +489,21 @@ async function executePlay(extraDetails = {}) {
         }
     }
 
-    try {
-        const requestBody = {
-            player_uuid: playerId,
-            card_index: cardIndex,
-            action_details: actionDetails
-        };
+    if (!gameService.isLegalPlay(cardIndex, actionDetails)) {
+        alert(translate(getCookie("language"), "illegal_move_alert"));
+        return;
+    }
 
-        await sendRequest(`/game/${gameId}/play`, 'POST', requestBody);
+    try {
+        if (socketIsOpen()) {
+            await sendSocketAction('play', { card_index: cardIndex, action_details: actionDetails });
+        } else {
+            await sendRequest(`/game/${gameId}/play`, 'POST', {
+                player_uuid: playerId,
+                card_index: cardIndex,
+                action_details: actionDetails
+            });
+        }
 
         gameService.resetSelections();
         renderPlayButton();
@@ -498,10 +524,14 @@ async function executeVoteKick(playerToKickNumber) {
     }
 
     try {
-        await sendRequest(`/game/${gameId}/vote_kick`, 'POST', {
-            voter_uuid: voterId,
-            player_to_kick_number: playerToKickNumber
-        });
+        if (socketIsOpen()) {
+            await sendSocketAction('vote_kick', { player_to_kick_number: playerToKickNumber });
+        } else {
+            await sendRequest(`/game/${gameId}/vote_kick`, 'POST', {
+                voter_uuid: voterId,
+                player_to_kick_number: playerToKickNumber
+            });
+        }
         console.log(`Vote cast to kick player ${playerToKickNumber}`);
     } catch (error) {
         console.error("Error voting to kick:", error);
@@ -521,7 +551,7 @@ async function initializeGame() {
     }
 
     try {
-        const gameStateFromServer = await sendRequest(`/game/${gameId}/state?player_id=${localPlayerId}`);
+        const gameStateFromServer = await fetchGameState(gameId, localPlayerId);
 
         if (!gameStateFromServer) {
             alert(translate(getCookie("language"), "load_data_alert"));
@@ -529,22 +559,58 @@ async function initializeGame() {
         }
 
         gameService.updateGameState(gameStateFromServer, localPlayerId);
+        await fetchLegalMoves();
 
         updateUI();
 
         const config = await getConfig();
-        const ws_url = `${config.webSocketUrl}/game/ws/${gameId}/${localPlayerId}`;
+        const ws_url = `${config.webSocketUrl}/game/ws/${gameId}/${localPlayerId}?format=binary`;
         console.log("Connecting to WebSocket:", ws_url);
         socket = new WebSocket(ws_url);
+        socket.binaryType = 'arraybuffer';
 
         socket.onopen = () => {
             console.log("WebSocket connection established.");
         };
 
-        socket.onmessage = (event) => {
-            const message = JSON.parse(event.data);
+        socket.onmessage = async (event) => {
+            const message = event.data instanceof ArrayBuffer ? decodeFrame(event.data, wireMeta) : JSON.parse(event.data);
 
             switch(message.event) {
+                case 'meta':
+                    wireMeta = message;
+                    break;
+
+                case 'snapshot':
+                    gameService.updateGameState(message.state, gameService.localPlayerId);
+                    await fetchLegalMoves();
+                    updateUI();
+                    break;
+
+                case 'delta':
+                    // Ein verpasstes Delta kann nicht nachgeholt werden, dann den kompletten Zustand laden
+                    if (!gameService.applyDelta(message)) {
+                        console.log(`Delta ${message.version} does not fit version ${gameService.gameState.state_version}. Refetching state.`);
+                        fetchAndUpdateState();
+                        break;
+                    }
+                    await fetchLegalMoves();
+                    updateUI();
+                    break;
+
+                case 'ack':
+                case 'error': {
+                    const pending = pendingActions.get(message.request_id);
+                    if (!pending) break;
+                    pendingActions.delete(message.request_id);
+                    if (message.event === 'ack') {
+                        pending.resolve(message);
+                    } else {
+                        pending.reject(new Error(message.detail));
+                    }
+                    break;
+                }
+
                 case 'update':
                     console.log("Update-Nudge from server received. Refetching state.");
                     fetchAndUpdateState();
@@ -574,6 +640,10 @@ async function initializeGame() {
 
         socket.onclose = () => {
             console.log("WebSocket connection closed.");
+            for (const pending of pendingActions.values()) {
+                pending.reject(new Error("WebSocket connection closed."));
+            }
+            pendingActions.clear();
         };
 
         socket.onerror = (error) => {
@@ -584,10 +654,16 @@ async function initializeGame() {
         if (!startGameBtn.dataset.listenerAttached) {
             startGameBtn.addEventListener('click', async () => {
                 try {
-                    await sendRequest(`/game/${gameId}/start`, 'POST');
-                    const updatedState = await sendRequest(`/game/${gameId}/state?player_id=${localPlayerId}`);
-                    gameService.updateGameState(updatedState, localPlayerId);
-                    updateUI();
+                    if (socketIsOpen()) {
+                        // Der neue Zustand kommt als Delta über denselben Socket
+                        await sendSocketAction('start');
+                    } else {
+                        await sendRequest(`/game/${gameId}/start`, 'POST');
+                        const updatedState = await fetchGameState(gameId, localPlayerId);
+                        gameService.updateGameState(updatedState, localPlayerId);
+                        await fetchLegalMoves();
+                        updateUI();
+                    }
                 } catch (error) {
                     alert(translate(getCookie("language"), "start_game_alert"));
                     console.error(error);
@@ -609,6 +685,16 @@ async function initializeGame() {
     }
 }
 
+// Lädt den Zustand. Solange sich nichts geändert hat, antwortet der Server mit 304 und der Browser
+// liefert die gespeicherte Antwort, die Restzeit des Zuges kommt immer frisch im Header.
+async function fetchGameState(gameId, playerId) {
+    const response = await fetchResponse(`/game/${gameId}/state?player_id=${playerId}`);
+    const state = await response.json();
+    const remainingTime = response.headers.get('X-Remaining-Turn-Time');
+    state.remaining_turn_time = remainingTime === null ? null : Number(remainingTime);
+    return state;
+}
+
 async function fetchAndUpdateState() {
     const gameId = gameService.gameState.uuid;
     const localPlayerId = gameService.localPlayerId;
@@ -616,14 +702,30 @@ async function fetchAndUpdateState() {
     if (!gameId || !localPlayerId) return;
 
     try {
-        const newState = await sendRequest(`/game/${gameId}/state?player_id=${localPlayerId}`);
+        const newState = await fetchGameState(gameId, localPlayerId);
         gameService.updateGameState(newState, localPlayerId);
+        await fetchLegalMoves();
         updateUI();
     } catch (error) {
         console.error("Failed to refetch state after update:", error);
     }
 }
 
+// Lädt die legalen Züge, damit nur Aktionen gesendet werden, die der Server akzeptiert
+async function fetchLegalMoves() {
+    if (!gameService.isLocalPlayerTurn()) {
+        gameService.setLegalMoves(null);
+        return;
+    }
+    try {
+        const response = await sendRequest(`/game/${gameService.gameState.uuid}/legal_moves?player_id=${gameService.localPlayerId}`);
+        gameService.setLegalMoves(response ? response.moves : null);
+    } catch (error) {
+        gameService.setLegalMoves(null);
+        console.error("Failed to fetch legal moves:", error);
+    }
+}
+
 document.addEventListener('DOMContentLoaded', initializeGame);
 document.addEventListener('selectionChanged', () => {
     updateUI();
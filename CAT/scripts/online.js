@@ -1,9 +1,17 @@
-import sendRequest from './services/server_service.js';
+import sendRequest, { getConfig } from './services/server_service.js';
 import {translate} from "./translator.mjs";
 import getCookie from "./functions.mjs";
 
-// Eine globale Variable, um die ungefilterte Liste aller Lobbys zu speichern
-let allLobbies = {};
+// Lobbys pro Seite, der Server filtert und teilt die Liste in Seiten
+const PAGE_SIZE = 50;
+// Die bisher geladenen Lobbys der aktuellen Filter und die Anzahl aller passenden Lobbys
+let loadedLobbies = [];
+let totalLobbies = 0;
+// Versionen der Lobbyliste, auf denen loadedLobbies beruht; ältere Feed-Events sind schon enthalten.
+// Mit mehreren Shards (CAT/API/shard_router.py) zählt jeder Shard seine eigene Version.
+let listVersions = {};
+// Events des Feeds, die während des Ladens einer Seite ankommen
+let pendingEvents = null;
 
 // --- Die renderLobbies und joinLobby Funktionen bleiben fast gleich ---
 
@@ -15,8 +23,7 @@ function renderLobbies(lobbiesToRender) {
     const lobbyListContainer = document.querySelector("#lobby-list");
     lobbyListContainer.innerHTML = '';
 
-    // Jetzt wird die Funktion mit einer möglicherweise gefilterten Liste aufgerufen
-    for (const game of Object.values(lobbiesToRender)) {
+    for (const game of lobbiesToRender) {
         const lobbyItem = document.createElement("div");
         lobbyItem.className = "lobby-item";
 
@@ -28,7 +35,7 @@ function renderLobbies(lobbiesToRender) {
         lobbyName.className = "lobby-name";
 
         const lobbyPlayers = document.createElement("p");
-        lobbyPlayers.textContent = `${translate(getCookie("language"), "players")}: ${game.number_of_players}/4`;
+        lobbyPlayers.textContent = `${translate(getCookie("language"), "players")}: ${game.number_of_players}/${game.max_players}`;
         lobbyPlayers.className = "lobby-players";
 
         const button = document.createElement("a");
@@ -42,60 +49,124 @@ function renderLobbies(lobbiesToRender) {
         lobbyItem.appendChild(button);
         lobbyListContainer.appendChild(lobbyItem);
     }
+
+    if (lobbiesToRender.length < totalLobbies) {
+        const moreButton = document.createElement("a");
+        moreButton.textContent = translate(getCookie("language"), "load_more_button");
+        moreButton.className = "button";
+        moreButton.onclick = () => fetchAndDisplayLobbies(true);
+        lobbyListContainer.appendChild(moreButton);
+    }
 }
 
-// NEUE FUNKTION: Diese Funktion filtert und rendert die Lobbys
-function filterAndRender() {
-    // 1. Hole die aktuellen Filterwerte
-    const nameFilterValue = document.querySelector("#lobby-name-filter").value.toLowerCase();
+function lobbyListPath(offset) {
+    const nameFilterValue = document.querySelector("#lobby-name-filter").value;
     const minPlayersValue = document.querySelector('input[name="players"]:checked').value;
-
-    // 2. Filtere die Lobbys
-    const filteredLobbies = Object.values(allLobbies).filter(game => {
-        const nameMatch = game.name.toLowerCase().includes(nameFilterValue);
-        const playersMatch = game.number_of_players >= parseInt(minPlayersValue);
-        return nameMatch && playersMatch;
+    const params = new URLSearchParams({
+        filter: 'joinable',
+        name: nameFilterValue,
+        min_players: minPlayersValue,
+        offset: offset,
+        limit: PAGE_SIZE
     });
-
-    // 3. Konvertiere das gefilterte Array zurück in ein Objekt, damit renderLobbies es verarbeiten kann
-    const filteredLobbiesObject = filteredLobbies.reduce((obj, game) => {
-        obj[game.uuid] = game;
-        return obj;
-    }, {});
-
-    // 4. Rufe die Render-Funktion mit der gefilterten Liste auf
-    renderLobbies(filteredLobbiesObject);
+    return `/lobby/list?${params}`;
 }
 
-
-// Hauptfunktion zum Laden der Lobbys
-async function fetchAndDisplayLobbies() {
+// Lädt die erste Seite der gefilterten Lobbys, mit append die nächste Seite
+async function fetchAndDisplayLobbies(append = false) {
+    pendingEvents = [];
     try {
-        allLobbies = await sendRequest('/lobby/list');
-        // Zeige die Lobbys initial an (ungefiltert)
-        filterAndRender();
+        const page = await sendRequest(lobbyListPath(append ? loadedLobbies.length : 0));
+        loadedLobbies = append ? loadedLobbies.concat(page.lobbies) : page.lobbies;
+        totalLobbies = page.total;
+        listVersions = page.versions ?? {0: page.version};
     } catch (error) {
         console.error("Failed to fetch lobbies:", error);
     }
+    const events = pendingEvents;
+    pendingEvents = null;
+    events.forEach(applyLobbyEvent);
+    renderLobbies(loadedLobbies);
+}
+
+// Gleiche Filter wie der Server bei filter=joinable
+function matchesFilters(lobby) {
+    const nameFilterValue = document.querySelector("#lobby-name-filter").value.trim().toLowerCase();
+    const minPlayersValue = parseInt(document.querySelector('input[name="players"]:checked').value);
+    return !lobby.game_started && lobby.open_seats > 0 && lobby.number_of_players >= minPlayersValue
+        && lobby.name.toLowerCase().includes(nameFilterValue);
+}
+
+// Übernimmt eine Änderung aus dem Lobby-Feed in die geladene Liste
+function applyLobbyEvent(event) {
+    const shard = event.shard ?? 0;
+    if (event.version <= (listVersions[shard] ?? 0)) return;
+    listVersions[shard] = event.version;
+
+    const uuid = event.event === 'lobby_closed' ? event.uuid : event.lobby.uuid;
+    const index = loadedLobbies.findIndex(lobby => lobby.uuid === uuid);
+    const matches = event.event !== 'lobby_closed' && matchesFilters(event.lobby);
+
+    if (index >= 0 && matches) {
+        loadedLobbies[index] = event.lobby;
+    } else if (index >= 0) {
+        loadedLobbies.splice(index, 1);
+        totalLobbies--;
+    } else if (event.event === 'lobby_created' && matches) {
+        // Neue Lobbys stehen am Ende der Liste, sichtbar nur wenn schon alle Seiten geladen sind
+        if (loadedLobbies.length >= totalLobbies) loadedLobbies.push(event.lobby);
+        totalLobbies++;
+    }
+}
+
+async function connectLobbyFeed() {
+    const config = await getConfig();
+    const socket = new WebSocket(`${config.webSocketUrl}/lobby/ws`);
+
+    socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.event === 'update') {
+            // Zu viele Änderungen verpasst, die Liste neu laden
+            fetchAndDisplayLobbies();
+        } else if (pendingEvents !== null) {
+            pendingEvents.push(event);
+        } else {
+            applyLobbyEvent(event);
+            renderLobbies(loadedLobbies);
+        }
+    };
+
+    socket.onclose = () => {
+        console.log("Lobby feed closed, reconnecting.");
+        setTimeout(connectLobbyFeed, 5000);
+    };
+}
+
+// Filtert nicht bei jedem Tastendruck, sondern erst wenn die Eingabe kurz ruht
+let filterTimeout = null;
+function scheduleFilter() {
+    clearTimeout(filterTimeout);
+    filterTimeout = setTimeout(() => fetchAndDisplayLobbies(), 250);
 }
 
 // Event-Listener, wenn die Seite geladen ist
 document.addEventListener('DOMContentLoaded', () => {
-    // Lade die Lobbys beim ersten Mal
+    // Lade die Lobbys beim ersten Mal, danach hält der Feed die Liste aktuell
+    connectLobbyFeed();
     fetchAndDisplayLobbies();
 
     // Füge Event-Listener zu den Filter-Inputs hinzu
     const nameFilterInput = document.querySelector("#lobby-name-filter");
-    nameFilterInput.addEventListener('input', filterAndRender);
+    nameFilterInput.addEventListener('input', scheduleFilter);
 
     const playerFilterRadios = document.querySelectorAll('input[name="players"]');
     playerFilterRadios.forEach(radio => {
-        radio.addEventListener('change', filterAndRender);
+        radio.addEventListener('change', () => fetchAndDisplayLobbies());
     });
 
     // Dein Refresh-Button ruft jetzt auch die fetch-Funktion auf, was korrekt ist
     const refreshButton = document.querySelector("#refresh-lobbies-button");
     if (refreshButton) {
-        refreshButton.addEventListener('click', fetchAndDisplayLobbies);
+        refreshButton.addEventListener('click', () => fetchAndDisplayLobbies());
     }
 });
\ No newline at end of file
@@ -9,6 +9,7 @@ class GameService {
         this.selectedTargetFigureId = null;
         this.infernoMovePlan = [];
         this.jokerImitation = null;
+        this.legalMoves = null;
     }
 
     isLocalPlayerTurn() {
@@ -46,9 +47,9 @@ class GameService {
                 return; // Beende die Funktion hier, warte auf den nächsten Klick.
             }
 
-            // 2. Klick: Auswahl der ZIEL-Figur (darf nicht die eigene sein).
+            // 2. Klick: Auswahl der ZIEL-Figur (jede andere Figur, auch eine eigene).
             // Dies passiert nur, wenn bereits eine Hauptfigur ausgewählt ist.
-            if (this.selectedFigureId && !isOwnFigure) {
+            if (this.selectedFigureId && this.selectedFigureId !== figureId) {
                 // Erlaube das Ab- und Anwählen der Zielfigur
                 this.selectedTargetFigureId = (this.selectedTargetFigureId === figureId) ? null : figureId;
             }
@@ -109,6 +110,55 @@ class GameService {
         console.log("Client GameService updated:", this.gameState);
     }
 
+    // Wendet ein Delta vom Server an. Gibt false zurück, wenn es nicht auf den aktuellen Stand passt,
+    // dann muss der komplette Zustand neu geladen werden.
+    applyDelta(delta) {
+        const state = this.gameState;
+        if (!state || state.state_version !== delta.base_version) return false;
+
+        for (const playerDelta of delta.players || []) {
+            const player = state.players.find(p => p.number === playerDelta.number);
+            if (!player) {
+                state.players.push(playerDelta);
+                continue;
+            }
+            for (const [key, value] of Object.entries(playerDelta)) {
+                // Die UUID ist nur im eigenen Zustand bekannt, der lokale Spieler bekommt seine Karten als Liste im Feld "hand"
+                if (key === 'uuid' || (key === 'cards' && player.uuid === this.localPlayerId)) continue;
+                player[key] = value;
+            }
+        }
+
+        const localPlayer = this.getLocalPlayer();
+        if (delta.hand && localPlayer) {
+            localPlayer.cards = delta.hand;
+        }
+
+        if (delta.figures) {
+            for (const player of state.players) {
+                for (const figure of player.figures) {
+                    if (figure.uuid in delta.figures) {
+                        figure.position = delta.figures[figure.uuid];
+                    }
+                }
+            }
+            state.field_occupation = {};
+            for (const player of state.players) {
+                for (const figure of player.figures) {
+                    if (figure.position >= 0) state.field_occupation[figure.position] = figure;
+                }
+            }
+        }
+
+        const fields = ['number_of_players', 'current_player_index', 'round_number', 'game_started', 'game_over',
+                        'last_played_card', 'remaining_turn_time', 'turn_duration'];
+        for (const key of fields) {
+            if (key in delta) state[key] = delta[key];
+        }
+        state.state_version = delta.version;
+        return true;
+    }
+
     // Gibt alle Spieler zurück
     getPlayers() {
         return this.gameState ? this.gameState.players : [];
@@ -174,9 +224,35 @@ class GameService {
         return this.jokerImitation;
     }
 
+    // Legale Züge vom Server (null, solange keine geladen sind)
+    setLegalMoves(moves) {
+        this.legalMoves = moves;
+    }
+
+    isLegalPlay(cardIndex, actionDetails) {
+        if (!this.legalMoves) return true;
+        return this.legalMoves.some(move => move.card_index === cardIndex && matchesAction(move.action_details, actionDetails));
+    }
 
 
 
+
+}
+
+// Prüft, ob die gesendeten Details den legalen Zug enthalten (zusätzliche Felder werden ignoriert)
+function matchesAction(legalDetails, actionDetails) {
+    return Object.entries(legalDetails).every(([key, value]) => {
+        if (key === 'moves') {
+            const normalize = moves => JSON.stringify((moves || [])
+                .map(move => [move.figure_uuid, move.steps])
+                .sort());
+            return normalize(value) === normalize(actionDetails.moves);
+        }
+        if (Array.isArray(value)) {
+            return JSON.stringify(value) === JSON.stringify(actionDetails[key]);
+        }
+        return value === actionDetails[key];
+    });
 }
 
 // Erstelle eine einzige Instanz, die von allen anderen Skripten importiert werden kann
@@ -19,7 +19,8 @@ export async function getConfig() {
     }
 }
 
-export default async function sendRequest(path, method = "GET", data = null) {
+// Schickt die Anfrage und gibt die Response zurück, wirft bei Fehlern
+export async function fetchResponse(path, method = "GET", data = null) {
     const { apiBaseUrl } = await getConfig();
     const cleanBaseUrl = apiBaseUrl.endsWith('/') ? apiBaseUrl.slice(0, -1) : apiBaseUrl;
     const cleanPath = path.startsWith('/') ? path : `/${path}`;
@@ -43,5 +44,10 @@ export default async function sendRequest(path, method = "GET", data = null) {
         throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
     }
 
+    return response;
+}
+
+export default async function sendRequest(path, method = "GET", data = null) {
+    const response = await fetchResponse(path, method, data);
     return response.json().catch(() => null);
 }
\ No newline at end of file
@@ -0,0 +1,186 @@
+// Dekodiert die Binärframes aus CAT/API/wire_format.py in die gleichen Objekte wie die JSON-Nachrichten,
+// damit gameService.updateGameState und gameService.applyDelta unverändert bleiben.
+// Namen, Farben, UUIDs und Kartentexte stehen nur in den Metadaten (Event "meta").
+
+const FRAME_STATE = 1;
+const FRAME_DELTA = 2;
+
+const STATE_STARTED = 1;
+const STATE_OVER = 2;
+const PLAYER_ACTIVE = 1;
+const PLAYER_JOINED = 2;
+const NO_CARD = 0xFF;
+const NO_HAND = 0xFFFF;
+
+const DELTA_FIGURES = 1 << 0;
+const DELTA_PLAYERS = 1 << 1;
+const DELTA_NUMBER_OF_PLAYERS = 1 << 2;
+const DELTA_CURRENT_PLAYER = 1 << 3;
+const DELTA_ROUND = 1 << 4;
+const DELTA_STARTED = 1 << 5;
+const DELTA_OVER = 1 << 6;
+const DELTA_LAST_CARD = 1 << 7;
+const DELTA_TIMER = 1 << 8;
+const DELTA_HAND = 1 << 9;
+
+class FrameReader {
+    constructor(buffer) {
+        this.view = new DataView(buffer);
+        this.offset = 0;
+    }
+
+    u8() { return this.view.getUint8(this.offset++); }
+    i8() { return this.view.getInt8(this.offset++); }
+    u16() { const value = this.view.getUint16(this.offset, true); this.offset += 2; return value; }
+    i32() { const value = this.view.getInt32(this.offset, true); this.offset += 4; return value; }
+    u32() { const value = this.view.getUint32(this.offset, true); this.offset += 4; return value; }
+}
+
+function decodePosition(value, owner, meta) {
+    if (value === 0) return -1;
+    if (value <= meta.number_of_fields) return value - 1;
+    return (owner + 1) * meta.finish_offset + value - meta.number_of_fields - 1;
+}
+
+function decodeCard(kind, meta) {
+    return kind === NO_CARD ? null : meta.card_kinds[kind];
+}
+
+function decodeHand(reader, meta) {
+    const count = reader.u16();
+    const cards = [];
+    for (let i = 0; i < count; i++) cards.push(meta.card_kinds[reader.u8()]);
+    return cards;
+}
+
+function playerFigures(number, positions, meta) {
+    return meta.figures
+        .filter(figure => figure.owner === number)
+        .map((figure, i) => ({uuid: figure.uuid, color: figure.color, position: decodePosition(positions[i], number, meta)}));
+}
+
+function fullPlayer(number, cards, isActive, positions, meta) {
+    const info = meta.players.find(p => p.number === number);
+    return {
+        uuid: info.uuid,
+        name: info.name,
+        number: number,
+        color: info.color,
+        cards: cards,
+        figures: playerFigures(number, positions, meta),
+        is_active: isActive
+    };
+}
+
+function decodeState(reader, meta) {
+    const version = reader.u32();
+    const flags = reader.u8();
+    const numberOfPlayers = reader.u8();
+    const currentPlayerIndex = reader.i8();
+    const roundNumber = reader.u16();
+    const remainingTime = reader.i32();
+    const turnDuration = reader.u32();
+    const lastCard = reader.u8();
+
+    const players = meta.players.map(info => {
+        const isActive = (reader.u8() & PLAYER_ACTIVE) !== 0;
+        const cards = reader.u16();
+        const positions = [];
+        for (let i = 0; i < meta.figures_per_player; i++) positions.push(reader.u8());
+        return fullPlayer(info.number, cards, isActive, positions, meta);
+    });
+
+    // Nur der eigene Spieler hat in den Metadaten eine UUID
+    if (reader.view.getUint16(reader.offset, true) === NO_HAND) {
+        reader.offset += 2;
+    } else {
+        const hand = decodeHand(reader, meta);
+        const localPlayer = players.find(p => p.uuid);
+        if (localPlayer) localPlayer.cards = hand;
+    }
+
+    const fieldOccupation = {};
+    for (const player of players) {
+        for (const figure of player.figures) {
+            if (figure.position >= 0) fieldOccupation[figure.position] = figure;
+        }
+    }
+
+    return {
+        event: 'snapshot',
+        version: version,
+        state: {
+            uuid: meta.uuid,
+            state_version: version,
+            name: meta.name,
+            players: players,
+            host_id: meta.host_id,
+            number_of_players: numberOfPlayers,
+            field_occupation: fieldOccupation,
+            game_over: (flags & STATE_OVER) !== 0,
+            current_player_index: currentPlayerIndex,
+            round_number: roundNumber,
+            game_started: (flags & STATE_STARTED) !== 0,
+            last_played_card: decodeCard(lastCard, meta),
+            remaining_turn_time: remainingTime < 0 ? null : remainingTime,
+            turn_duration: turnDuration
+        }
+    };
+}
+
+function decodeDelta(reader, meta) {
+    const delta = {event: 'delta', base_version: reader.u32(), version: reader.u32()};
+    const mask = reader.u16();
+
+    if (mask & DELTA_FIGURES) {
+        delta.figures = {};
+        const count = reader.u8();
+        for (let i = 0; i < count; i++) {
+            const figure = meta.figures[reader.u8()];
+            delta.figures[figure.uuid] = decodePosition(reader.u8(), figure.owner, meta);
+        }
+    }
+    if (mask & DELTA_PLAYERS) {
+        delta.players = [];
+        const count = reader.u8();
+        for (let i = 0; i < count; i++) {
+            const number = reader.u8();
+            const flags = reader.u8();
+            const cards = reader.u16();
+            const isActive = (flags & PLAYER_ACTIVE) !== 0;
+            // Neue Spieler stehen mit allen Figuren zu Hause
+            delta.players.push((flags & PLAYER_JOINED)
+                ? fullPlayer(number, cards, isActive, new Array(meta.figures_per_player).fill(0), meta)
+                : {number: number, cards: cards, is_active: isActive});
+        }
+    }
+    if (mask & DELTA_NUMBER_OF_PLAYERS) delta.number_of_players = reader.u8();
+    if (mask & DELTA_CURRENT_PLAYER) delta.current_player_index = reader.i8();
+    if (mask & DELTA_ROUND) delta.round_number = reader.u16();
+    if (mask & DELTA_STARTED) delta.game_started = reader.u8() !== 0;
+    if (mask & DELTA_OVER) delta.game_over = reader.u8() !== 0;
+    if (mask & DELTA_LAST_CARD) delta.last_played_card = decodeCard(reader.u8(), meta);
+    if (mask & DELTA_TIMER) {
+        const remainingTime = reader.i32();
+        delta.remaining_turn_time = remainingTime < 0 ? null : remainingTime;
+        delta.turn_duration = reader.u32();
+    }
+    if (mask & DELTA_HAND) delta.hand = decodeHand(reader, meta);
+    return delta;
+}
+
+/**
+ * Wandelt einen Binärframe mit Hilfe der zuletzt empfangenen Metadaten in eine "snapshot"- oder "delta"-Nachricht um.
+ */
+export default function decodeFrame(buffer, meta) {
+    const reader = new FrameReader(buffer);
+    const type = reader.u8();
+    switch (type) {
+        case FRAME_STATE:
+            return decodeState(reader, meta);
+        case FRAME_DELTA:
+            return decodeDelta(reader, meta);
+        default:
+            throw new Error(`Unknown frame type ${type}`);
+    }
+}
@@ -29,6 +29,7 @@ export const translations = {
         "filter_lobbies": "Filter Lobbies",
         "min_players": "Min Players:",
         "refresh_button": "Refresh",
+        "load_more_button": "Load more",
         "available_lobbies": "Available Lobbies",
         "create_new_lobby": "Create New Lobby",
         "players_count": "Players: {count}/4",
@@ -106,6 +107,7 @@ export const translations = {
         "joker_card_select_alert": "You must select a card for the Joker to imitate!",
         "figure_not_selected_alert": "Figure not selected!",
         "error_play_card_alert": "Error playing card.",
+        "illegal_move_alert": "This move is not allowed.",
         "game_url_alert": "Game or Player ID is missing from the URL!",
         "load_data_alert": "Could not load game data from server.",
         "game_closed_alert": "The game was closed due to",
@@ -144,6 +146,7 @@ export const translations = {
         "filter_lobbies": "Lobbys filtern",
         "min_players": "Min. Spieler:",
         "refresh_button": "Aktualisieren",
+        "load_more_button": "Mehr laden",
         "available_lobbies": "Verfügbare Lobbys",
         "create_new_lobby": "Neue Lobby erstellen",
         "players_count": "Spieler: {count}/4",
@@ -221,6 +224,7 @@ export const translations = {
         "joker_card_select_alert": "Du musst für den Joker eine Karte zum Nachmachen auswählen!",
         "figure_not_selected_alert": "Keine Figur ausgewählt!",
         "error_play_card_alert": "Fehler beim Spielen der Karte.",
+        "illegal_move_alert": "Dieser Zug ist nicht erlaubt.",
         "game_url_alert": "Spiel oder Spieler ID fehlt in der URL!",
         "load_data_alert": "Spieldaten konnten nicht geladen werden.",
         "game_closed_alert": "Spiel wurde geschlossen.",
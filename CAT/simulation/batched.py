@@ -0,0 +1,504 @@
+"""
+Vectorized simulation of many games in lockstep with NumPy.
+
+Every game of a batch is a row in a set of arrays, and one step advances the
+current player of every running game by one turn. The rules mirror
+CAT/classes/game.py with the random policy of CAT/simulation/policies.py:
+a legal (card, action) pair is picked uniformly, a player without a legal
+move discards the hand, rounds, dealing and reshuffling follow Game and Deck.
+
+Approximations compared to the per-object simulator:
+- Only the random policy is available.
+- An Inferno card moves one figure all 7 steps, splits over several figures are not modelled.
+- There are no turn timeouts and no kicked players.
+- The random streams differ, so results agree statistically, not game by game.
+
+Needs numpy, which is not a dependency of the server: pip install -r requirements-dev.txt
+"""
+import argparse
+import json
+import time
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("The batched simulator needs numpy, install it with 'pip install -r requirements-dev.txt'.") from e
+
+from CAT.classes.board import BOARD_GEOMETRY, FINISH_FIELDS
+from CAT.classes.cards import IMITABLE_CARDS, JokerCard, StandardCard, FlexCard, StartCard, SwapCard, InfernoCard
+from CAT.classes.deck import Deck
+from CAT.classes.inferno import INFERNO_STEPS
+from CAT.config import (NUMBER_OF_FIELDS, FIGURES_PER_PLAYER, DECK_COMPOSITION, MAX_CARDS_DEALT,
+                        CARD_DEAL_CYCLE_LENGTH, MAX_PLAYERS, MIN_PLAYERS_TO_START)
+from CAT.simulation.simulator import SimulationStats, MAX_TURNS, parse_deck_override
+
+# One card of every kind that can be held in a hand, the index is the kind id
+KIND_CARDS = IMITABLE_CARDS + (JokerCard(),)
+KIND_INDEX = {card.name: kind for kind, card in enumerate(KIND_CARDS)}
+
+
+def _move_values(card) -> list[int]:
+    if isinstance(card, StandardCard):
+        return [card.value]
+    if isinstance(card, FlexCard):
+        return [4, -4]
+    if isinstance(card, StartCard):
+        return list(card.move_values)
+    return []
+
+
+# Every step count a card can move a figure by
+MOVE_VALUES = tuple(sorted({value for card in KIND_CARDS for value in _move_values(card)}))
+
+
+# Ring tile index that stands for "no tile", the boards get an always empty column there
+NO_TILE = NUMBER_OF_FIELDS
+# Relative positions: -1 at home, ring tiles, finishing slots
+POSITIONS = NUMBER_OF_FIELDS + FINISH_FIELDS + 1
+# Bit masks of taken finishing slots
+FINISH_MASKS = 1 << FINISH_FIELDS
+
+
+class MoveTables:
+    """
+    Static lookup tables for moving by each of the given values, built once from BOARD_GEOMETRY.
+    The rows are indexed by player number * POSITIONS + relative position + 1 and hold one entry per value,
+    so a batch of moves is resolved by gathering whole rows.
+
+    The occupation-dependent parts of Game._resolve_position are reduced to one bit mask per game
+    (see GameBatch.step): which start tiles hold a figure of their owner and which finishing slots are taken.
+    The flags table marks the bits a move depends on, so checking it is a single AND.
+    """
+    # flags: start tiles passed over (bit = owner number), finishing slots that must be free
+    # to enter the finishing zone / to move inside it, and the static properties of the move
+    PASSED_STARTS = 0xF
+    ENTER_SLOTS = 0xF << 4
+    FINISH_SLOTS = 0xF << 8
+    ON_RING = 1 << 12
+    FINISH_VALID = 1 << 13
+    ENTERING = 1 << 14
+    ENTER_VALID = 1 << 15
+
+    def __init__(self, values: tuple[int, ...]):
+        fields = NUMBER_OF_FIELDS
+        geometry = BOARD_GEOMETRY
+        self.values = values
+        shape = (MAX_PLAYERS * POSITIONS, len(values))
+
+        self.flags = np.zeros(shape, dtype=np.int32)
+        # new relative position without and with entering the finishing zone, ring tile landed on
+        self.target = np.zeros(shape, dtype=np.int8)
+        self.enter_target = np.zeros(shape, dtype=np.int8)
+        self.landing = np.full(shape, NO_TILE, dtype=np.int8)
+
+        for player in range(MAX_PLAYERS):
+            start = geometry.start_fields[player]
+            for position in range(-1, POSITIONS - 1):
+                row = player * POSITIONS + position + 1
+                for i, value in enumerate(values):
+                    flags = 0
+                    if 0 <= position < fields:
+                        ring_pos = (start + position) % fields
+                        flags |= self.ON_RING
+                        for tile in geometry.safe_tiles_passed(ring_pos, value):
+                            flags |= 1 << geometry.safe_tile_owner[tile]
+                        slot = position + value - fields - 1
+                        enter_slot = min(max(slot, 0), FINISH_FIELDS - 1)
+                        if position + value > fields:
+                            flags |= self.ENTERING
+                            if slot < FINISH_FIELDS:
+                                # every slot up to the target has to be free
+                                flags |= self.ENTER_VALID | ((1 << slot + 1) - 1) << 4
+                        self.target[row, i] = (position + value) % fields
+                        self.enter_target[row, i] = fields + enter_slot
+                        self.landing[row, i] = (ring_pos + value) % fields
+                    elif position >= fields:
+                        slot = position - fields
+                        target_slot = slot + value
+                        self.target[row, i] = position + value
+                        if 0 <= target_slot < FINISH_FIELDS:
+                            flags |= self.FINISH_VALID
+                            # forward no figure may be jumped over, backward the target has to be free
+                            if value > 0:
+                                needed = sum(1 << s for s in range(slot + 1, target_slot + 1))
+                            else:
+                                needed = 1 << target_slot
+                            flags |= needed << 8
+                    self.flags[row, i] = flags
+
+    def resolve(self, player, own, board_mask, start_blocked):
+        """
+        Vectorized Game._resolve_position for the figures own (games, figures) of the players and every value.
+        board_mask holds the occupation bits of every game, start_blocked if the player's own start tile
+        holds an own figure. Returns arrays of shape (games, figures, values):
+        move possible, new relative position, lands on the ring, ring tile landed on.
+        """
+        row = player[:, None] * POSITIONS + own + 1
+        flags = self.flags[row]
+        conflicts = flags & board_mask[:, None, None]
+
+        to_finish = ((flags & self.ENTER_VALID) != 0) & ((conflicts & self.ENTER_SLOTS) == 0)
+        # only figures on their own start tile block the way
+        ring_ok = (((flags & self.ON_RING) != 0) & ((conflicts & self.PASSED_STARTS) == 0)
+                   & ~(((flags & self.ENTERING) != 0) & start_blocked[:, None, None]))
+        finish_ok = ((flags & self.FINISH_VALID) != 0) & ((conflicts & self.FINISH_SLOTS) == 0)
+
+        target = np.where(to_finish, self.enter_target[row], self.target[row])
+        return ring_ok | finish_ok, target, ring_ok & ~to_finish, self.landing[row]
+
+
+class GameBatch:
+    """
+    A fixed number of game slots advanced in lockstep, finished games are replaced by new ones.
+
+    Figure positions are stored relative to the owner's start tile: -1 at home,
+    0..NUMBER_OF_FIELDS-1 on the ring (0 is the own start tile), NUMBER_OF_FIELDS + i in finishing slot i.
+    Hands and discard piles are count vectors over the card kinds, decks are arrays of kind ids.
+    """
+
+    def __init__(self, size: int, players: int, rng: "np.random.Generator", max_turns: int = MAX_TURNS):
+        self.size = size
+        self.players = players
+        self.rng = rng
+        self.max_turns = max_turns
+        fields = NUMBER_OF_FIELDS
+        figures = FIGURES_PER_PLAYER
+        kinds = len(KIND_CARDS)
+
+        self.starts = np.array(BOARD_GEOMETRY.start_fields[:players], dtype=np.int16)
+        self.move_tables = MoveTables(MOVE_VALUES)
+        self.inferno_tables = MoveTables((INFERNO_STEPS,))
+        # owner number of the safe start tile on each ring tile, -2 for ordinary tiles and NO_TILE
+        self.safe_owner = np.array(BOARD_GEOMETRY.safe_tile_owner + (-2,), dtype=np.int8)
+        self.safe_owner[self.safe_owner == -1] = -2
+
+        # burn_tiles[(player * POSITIONS + position + 1) * 2 + enters finish]: ring tiles an Inferno move
+        # passes, on the way into the finishing zone only the tiles up to the own start tile
+        self.burn_tiles = np.full((MAX_PLAYERS * POSITIONS * 2, INFERNO_STEPS), NO_TILE, dtype=np.int8)
+        for player in range(MAX_PLAYERS):
+            for position in range(fields):
+                row = (player * POSITIONS + position + 1) * 2
+                ring_pos = (BOARD_GEOMETRY.start_fields[player] + position) % fields
+                for step in range(1, INFERNO_STEPS + 1):
+                    self.burn_tiles[row, step - 1] = (ring_pos + step) % fields
+                    if position + step <= fields:
+                        self.burn_tiles[row + 1, step - 1] = (ring_pos + step) % fields
+
+        # action layout: moves (figure, value), starts (figure), Inferno (figure), swaps (figure, any figure)
+        self.move_actions = figures * len(MOVE_VALUES)
+        self.start_offset = self.move_actions
+        self.inferno_offset = self.start_offset + figures
+        self.swap_offset = self.inferno_offset + figures
+        actions = self.swap_offset + figures * players * figures
+
+        # enables[kind, action]: a card of that kind can play the action
+        # (float, so the weights are computed by a BLAS matrix product)
+        self.enables = np.zeros((kinds, actions), dtype=np.float32)
+        for kind, card in enumerate(KIND_CARDS):
+            if isinstance(card, JokerCard):
+                self.enables[kind] = 1
+                continue
+            for value in _move_values(card):
+                self.enables[kind, MOVE_VALUES.index(value):self.move_actions:len(MOVE_VALUES)] = 1
+            if isinstance(card, StartCard):
+                self.enables[kind, self.start_offset:self.inferno_offset] = 1
+            elif isinstance(card, InfernoCard):
+                self.enables[kind, self.inferno_offset:self.swap_offset] = 1
+            elif isinstance(card, SwapCard):
+                self.enables[kind, self.swap_offset:] = 1
+
+        # the deck is built by Deck, so it follows DECK_COMPOSITION
+        self.deck_cards = np.array([KIND_INDEX[card.name] for card in Deck().cards], dtype=np.int8)
+        self.decks = np.zeros((size, self.deck_cards.size), dtype=np.int8)
+        self.deck_size = np.zeros(size, dtype=np.int64)
+        self.discard = np.zeros((size, kinds), dtype=np.int16)
+        self.hands = np.zeros((size, players, kinds), dtype=np.int16)
+
+        self.positions = np.full((size, players, figures), -1, dtype=np.int16)
+        self.current = np.zeros(size, dtype=np.int64)
+        self.round = np.ones(size, dtype=np.int64)
+        self.turns = np.zeros(size, dtype=np.int64)
+        self.winner = np.full(size, -1, dtype=np.int64)
+        self.active = np.zeros(size, dtype=bool)
+
+        # outcome of the finished games
+        self.games_played = 0
+        self.unfinished = 0
+        self.total_turns = 0
+        self.total_rounds = 0
+        self.wins = np.zeros(players, dtype=np.int64)
+
+    def run(self, games: int):
+        """Plays the given number of games, keeping every slot busy until the last games are started."""
+        started = min(self.size, games)
+        self._reset(np.arange(started))
+        while True:
+            rows = np.flatnonzero(self.active)
+            if rows.size == 0:
+                break
+            ended = self.step(rows)
+            self._record(ended)
+            refill = ended[:games - started]
+            self._reset(refill)
+            started += refill.size
+            self.active[ended[refill.size:]] = False
+
+    def step(self, rows):
+        """Advances the games in rows by one turn. Returns the rows of the games that ended."""
+        fields = NUMBER_OF_FIELDS
+        figures = FIGURES_PER_PLAYER
+        count = rows.size
+        index = np.arange(count)
+        positions = self.positions[rows]
+        current = self.current[rows]
+        hand = self.hands[rows, current]
+
+        on_ring = (positions >= 0) & (positions < fields)
+        ring_pos = (self.starts[None, :, None] + positions) % fields
+        owner_board, figure_board = self._boards(positions, on_ring, ring_pos)
+        board_offset = index * (fields + 1)
+        owners = owner_board.ravel()
+
+        own = positions[index, current]
+        own_ring_pos = ring_pos[index, current]
+        start_tiles = self.starts[current]
+        own_on_start = owner_board[index, start_tiles] == current
+        # occupation bits for MoveTables: start tiles held by their owner, taken finishing slots
+        held_starts = ((owner_board[:, self.starts] == np.arange(self.players)) << np.arange(self.players)).sum(axis=1)
+        finish_mask = np.where(own >= fields, 1 << (own - fields).clip(0), 0).sum(axis=1)
+        board_mask = held_starts | finish_mask << 4 | finish_mask << 8
+
+        legal = np.zeros((count, self.enables.shape[1]), dtype=bool)
+
+        # moves by a fixed value, landing on an own figure is not allowed
+        move_ok, move_target, move_on_ring, move_landing = self.move_tables.resolve(
+            current, own, board_mask, own_on_start)
+        landing_owner = owners.take(board_offset[:, None, None] + move_landing)
+        move_legal = move_ok & ~(move_on_ring & (landing_owner == current[:, None, None]))
+        legal[:, :self.move_actions] = move_legal.reshape(count, -1)
+
+        # starting a figure, the own start tile must not hold an own figure
+        legal[:, self.start_offset:self.inferno_offset] = (own == -1) & ~own_on_start[:, None]
+
+        # Inferno: one figure moves all steps and burns every figure on its path, figures on their start tile block
+        inferno_ok, inferno_target, inferno_on_ring, _ = self.inferno_tables.resolve(
+            current, own, board_mask, own_on_start)
+        inferno_ok = inferno_ok[:, :, 0]
+        inferno_target = inferno_target[:, :, 0]
+        enters_finish = inferno_ok & ~inferno_on_ring[:, :, 0]
+        burn_tiles = self.burn_tiles[(current[:, None] * POSITIONS + own + 1) * 2 + enters_finish]
+        burn_owner = owners.take(board_offset[:, None, None] + burn_tiles)
+        safe_on_path = (burn_owner == self.safe_owner.take(burn_tiles)).any(axis=2)
+        legal[:, self.inferno_offset:self.swap_offset] = inferno_ok & ~safe_on_path
+
+        # swaps of an own figure with an opponent, both on the ring and not on their own start tile
+        swappable = on_ring & (positions != 0)
+        own_swappable = swappable[index, current]
+        other_swappable = swappable.copy()
+        other_swappable[index, current] = False
+        legal[:, self.swap_offset:] = (own_swappable[:, :, None]
+                                       & other_swappable.reshape(count, 1, -1)).reshape(count, -1)
+
+        # every legal action weighs as much as the number of hand cards that can play it
+        weights = legal * (hand.astype(np.float32) @ self.enables)
+        totals = weights.sum(axis=1)
+        playing = totals > 0
+
+        # a player without a legal move discards the hand
+        skipping = rows[~playing]
+        self.discard[skipping] += self.hands[skipping, self.current[skipping]]
+        self.hands[skipping, self.current[skipping]] = 0
+
+        played = index[playing]
+        action = self._sample(weights[played], totals[played])
+        card_weights = hand[played] * self.enables[:, action].T
+        kind = self._sample(card_weights, card_weights.sum(axis=1))
+        player = current[played]
+        flat_positions = positions.reshape(count, -1)
+
+        is_move = action < self.move_actions
+        rows_move = played[is_move]
+        figure, value_index = np.divmod(action[is_move], len(MOVE_VALUES))
+        victim = figure_board[rows_move, move_landing[rows_move, figure, value_index]]
+        kick = move_on_ring[rows_move, figure, value_index] & (victim >= 0)
+        flat_positions[rows_move[kick], victim[kick]] = -1
+        positions[rows_move, player[is_move], figure] = move_target[rows_move, figure, value_index]
+
+        is_start = (action >= self.start_offset) & (action < self.inferno_offset)
+        rows_start = played[is_start]
+        figure = action[is_start] - self.start_offset
+        victim = figure_board[rows_start, start_tiles[rows_start]]
+        kick = victim >= 0
+        flat_positions[rows_start[kick], victim[kick]] = -1
+        positions[rows_start, player[is_start], figure] = 0
+
+        is_inferno = (action >= self.inferno_offset) & (action < self.swap_offset)
+        rows_inferno = played[is_inferno]
+        figure = action[is_inferno] - self.inferno_offset
+        burned = figure_board[rows_inferno[:, None], burn_tiles[rows_inferno, figure]]
+        burn = burned >= 0
+        flat_positions[np.broadcast_to(rows_inferno[:, None], burn.shape)[burn], burned[burn]] = -1
+        positions[rows_inferno, player[is_inferno], figure] = inferno_target[rows_inferno, figure]
+
+        is_swap = action >= self.swap_offset
+        rows_swap = played[is_swap]
+        figure, other = np.divmod(action[is_swap] - self.swap_offset, self.players * figures)
+        own_pos = own_ring_pos[rows_swap, figure]
+        other_pos = ring_pos.reshape(count, -1)[rows_swap, other]
+        positions[rows_swap, player[is_swap], figure] = (other_pos - self.starts[player[is_swap]]) % fields
+        flat_positions[rows_swap, other] = (own_pos - self.starts[other // figures]) % fields
+
+        self.positions[rows] = positions
+        played_rows = rows[played]
+        np.subtract.at(self.hands, (played_rows, player, kind), 1)
+        np.add.at(self.discard, (played_rows, kind), 1)
+        self.turns[played_rows] += 1
+
+        # a player wins with all figures in the finishing zone
+        finished = (positions >= fields).all(axis=2)
+        won = finished.any(axis=1)
+        self.winner[rows[won]] = finished[won].argmax(axis=1)
+
+        # next turn, or a new round with a new starting player once every hand is empty
+        running = rows[~won]
+        round_over = self.hands[running].sum(axis=(1, 2)) == 0
+        new_round = running[round_over]
+        next_turn = running[~round_over]
+        self.current[next_turn] = (self.current[next_turn] + 1) % self.players
+        self.round[new_round] += 1
+        self.current[new_round] = (self.round[new_round] - 1) % self.players
+        self._deal(new_round)
+
+        return np.concatenate([rows[won], running[self.turns[running] >= self.max_turns]])
+
+    def _boards(self, positions, on_ring, ring_pos):
+        """
+        Returns the owner and the flat figure index (player * figures + figure) on every ring tile, -1 if empty.
+        The boards have an extra column NO_TILE that always stays empty.
+        """
+        shape = (positions.shape[0], NUMBER_OF_FIELDS + 1)
+        owner_board = np.full(shape, -1, dtype=np.int8)
+        figure_board = np.full(shape, -1, dtype=np.int8)
+        game, player, figure = np.nonzero(on_ring)
+        tiles = ring_pos[game, player, figure]
+        owner_board[game, tiles] = player
+        figure_board[game, tiles] = player * FIGURES_PER_PLAYER + figure
+        return owner_board, figure_board
+
+    def _sample(self, weights, totals):
+        """Draws one index per row with probability proportional to its weight."""
+        # one running sum over all rows, so every draw is a binary search
+        columns = weights.shape[1]
+        cumulative = weights.ravel().cumsum(dtype=np.float64)
+        row_start = cumulative[columns - 1::columns] - totals
+        threshold = row_start + self.rng.random(totals.size) * totals
+        return np.searchsorted(cumulative, threshold, side="right") - np.arange(totals.size) * columns
+
+    def _reset(self, rows):
+        """Starts new games in rows: shuffled deck, figures at home, cards of the first round dealt."""
+        self.decks[rows] = self.rng.permuted(np.tile(self.deck_cards, (rows.size, 1)), axis=1)
+        self.deck_size[rows] = self.deck_cards.size
+        self.discard[rows] = 0
+        self.hands[rows] = 0
+        self.positions[rows] = -1
+        self.current[rows] = 0
+        self.round[rows] = 1
+        self.turns[rows] = 0
+        self.winner[rows] = -1
+        self.active[rows] = True
+        self._deal(rows)
+
+    def _record(self, rows):
+        winners = self.winner[rows]
+        self.games_played += rows.size
+        self.unfinished += int((winners < 0).sum())
+        self.total_turns += int(self.turns[rows].sum())
+        self.total_rounds += int(self.round[rows].sum())
+        self.wins += np.bincount(winners[winners >= 0], minlength=self.players)
+
+    def _deal(self, rows):
+        """Deals the cards of the round to every player of the given games, like Deck.deal_cards."""
+        cards_to_deal = MAX_CARDS_DEALT - (self.round[rows] - 1) % CARD_DEAL_CYCLE_LENGTH
+        for i in range(MAX_CARDS_DEALT):
+            dealing = rows[cards_to_deal > i]
+            for player in range(self.players):
+                empty = dealing[self.deck_size[dealing] == 0]
+                if empty.size:
+                    self._reshuffle(empty)
+                top = self.deck_size[dealing] - 1
+                cards = self.decks[dealing, top]
+                self.deck_size[dealing] = top
+                self.hands[dealing, player, cards] += 1
+
+    def _reshuffle(self, rows):
+        """Turns the discard piles of the given games into their new shuffled decks, like Deck.shuffle."""
+        sizes = self.discard[rows].sum(axis=1)
+        bounds = self.discard[rows].cumsum(axis=1)
+        slots = np.arange(self.decks.shape[1])
+        # kind of every card with the pile sorted by kind, then shuffled by sorting random keys
+        cards = (bounds[:, :, None] <= slots).sum(axis=1)
+        keys = self.rng.random(cards.shape)
+        keys[slots >= sizes[:, None]] = 2
+        self.decks[rows] = np.take_along_axis(cards, keys.argsort(axis=1), axis=1)
+        self.deck_size[rows] = sizes
+        self.discard[rows] = 0
+
+    def stats(self) -> SimulationStats:
+        stats = SimulationStats()
+        stats.games = self.games_played
+        stats.unfinished = self.unfinished
+        stats.turns = self.total_turns
+        stats.rounds = self.total_rounds
+        stats.wins_by_seat = {seat: int(wins) for seat, wins in enumerate(self.wins) if wins}
+        stats.wins_by_policy = {"random": int(self.wins.sum())}
+        stats.seats_by_policy = {"random": self.games_played * self.players}
+        return stats
+
+
+class BatchedSimulator:
+    """
+    Runs games in a GameBatch and collects the same statistics as the Simulator.
+    """
+
+    def __init__(self, players: int = MAX_PLAYERS, seed: int = 0, batch_size: int = 10000,
+                 max_turns: int = MAX_TURNS, deck_overrides: dict[str, int] | None = None):
+        if not MIN_PLAYERS_TO_START <= players <= MAX_PLAYERS:
+            raise ValueError(f"Between {MIN_PLAYERS_TO_START} and {MAX_PLAYERS} players are needed.")
+        unknown_keys = set(deck_overrides or {}) - set(DECK_COMPOSITION)
+        if unknown_keys:
+            raise ValueError(f"Unknown deck composition keys: {sorted(unknown_keys)}.")
+        self.players = players
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.max_turns = max_turns
+        DECK_COMPOSITION.update(deck_overrides or {})
+
+    def run(self, games: int) -> dict:
+        """Simulates the given number of games and returns the statistics with the throughput."""
+        start_time = time.perf_counter()
+        batch = GameBatch(min(self.batch_size, games), self.players, self.rng, self.max_turns)
+        batch.run(games)
+        stats = batch.stats()
+        elapsed = time.perf_counter() - start_time
+
+        result = stats.to_json()
+        result["seconds"] = elapsed
+        result["games_per_second"] = stats.games / elapsed if elapsed else 0
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs CAT games vectorized with NumPy and prints outcome statistics as JSON.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=MAX_PLAYERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10000, help="games advanced in lockstep")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--deck", nargs="*", default=[], type=parse_deck_override, metavar="KEY=COUNT",
+                        help="overrides of DECK_COMPOSITION, e.g. joker_cards=10")
+    args = parser.parse_args()
+
+    simulator = BatchedSimulator(players=args.players, seed=args.seed, batch_size=args.batch_size,
+                                 max_turns=args.max_turns, deck_overrides=dict(args.deck))
+    result = simulator.run(args.games)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import random
+import typing
+from abc import ABC, abstractmethod
+
+from CAT.classes.board import BOARD_GEOMETRY, FINISH_OFFSET
+from CAT.config import NUMBER_OF_FIELDS
+
+if typing.TYPE_CHECKING:
+    from CAT.classes.figure import Figure
+    from CAT.classes.game import Game
+    from CAT.classes.player import Player
+
+
+class Policy(ABC):
+    """
+    Abstract Base Class for the players of a simulated game.
+    A policy picks one of the legal moves, as returned by Game.generate_legal_moves.
+    """
+    name = "policy"
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    @abstractmethod
+    def choose_move(self, game: Game, player: Player, moves: list[dict]) -> dict:
+        raise NotImplementedError
+
+
+class RandomPolicy(Policy):
+    """Plays a uniformly random legal move."""
+    name = "random"
+
+    def choose_move(self, game: Game, player: Player, moves: list[dict]) -> dict:
+        return self.rng.choice(moves)
+
+
+class GreedyPolicy(Policy):
+    """
+    Plays the move that leaves the own figures furthest ahead of the opponents.
+    Every move is tried on the board with Game.apply and reverted with Game.undo.
+    """
+    name = "greedy"
+
+    def choose_move(self, game: Game, player: Player, moves: list[dict]) -> dict:
+        best_moves = []
+        best_score = None
+        for move in moves:
+            game.apply(move, player)
+            score = evaluate(game, player)
+            game.undo()
+            if best_score is None or score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+        return self.rng.choice(best_moves)
+
+
+def figure_progress(figure: Figure) -> int:
+    """Fields a figure has covered: 0 at home, 1 on its start tile, more than NUMBER_OF_FIELDS in the finish zone."""
+    position = figure.position
+    if position < 0:
+        return 0
+    if position >= FINISH_OFFSET:
+        return NUMBER_OF_FIELDS + 1 + position % FINISH_OFFSET
+    return NUMBER_OF_FIELDS - BOARD_GEOMETRY.ring_distance[figure.owner.number][position]
+
+
+def evaluate(game: Game, player: Player) -> float:
+    """Progress of the player's figures minus the average progress of the opponents."""
+    own_progress = 0
+    other_progress = 0
+    opponents = 0
+    for other in game.players:
+        progress = sum(figure_progress(figure) for figure in other.figures)
+        if other is player:
+            own_progress = progress
+        elif other.is_active:
+            other_progress += progress
+            opponents += 1
+    return own_progress - (other_progress / opponents if opponents else 0)
+
+
+POLICIES: dict[str, type[Policy]] = {
+    RandomPolicy.name: RandomPolicy,
+    GreedyPolicy.name: GreedyPolicy,
+}
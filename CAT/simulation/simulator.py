@@ -0,0 +1,184 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from CAT.classes.game import Game
+from CAT.classes.player import Player
+from CAT.config import DECK_COMPOSITION, MIN_PLAYERS_TO_START, MAX_PLAYERS
+from CAT.simulation.policies import POLICIES
+
+# Safety limit, games that run longer count as unfinished
+MAX_TURNS = 5000
+
+
+class SimulationStats:
+    """Outcome statistics of a number of simulated games, batches from several workers can be merged."""
+
+    def __init__(self):
+        self.games = 0
+        self.unfinished = 0
+        self.turns = 0
+        self.rounds = 0
+        self.wins_by_seat: dict[int, int] = {}
+        self.wins_by_policy: dict[str, int] = {}
+        self.seats_by_policy: dict[str, int] = {}
+
+    def add_game(self, winner_seat: int | None, seat_policies: list[str], turns: int, rounds: int):
+        self.games += 1
+        self.turns += turns
+        self.rounds += rounds
+        for policy_name in seat_policies:
+            self.seats_by_policy[policy_name] = self.seats_by_policy.get(policy_name, 0) + 1
+        if winner_seat is None:
+            self.unfinished += 1
+            return
+        self.wins_by_seat[winner_seat] = self.wins_by_seat.get(winner_seat, 0) + 1
+        winner_policy = seat_policies[winner_seat]
+        self.wins_by_policy[winner_policy] = self.wins_by_policy.get(winner_policy, 0) + 1
+
+    def merge(self, other: "SimulationStats"):
+        self.games += other.games
+        self.unfinished += other.unfinished
+        self.turns += other.turns
+        self.rounds += other.rounds
+        for target, source in ((self.wins_by_seat, other.wins_by_seat),
+                               (self.wins_by_policy, other.wins_by_policy),
+                               (self.seats_by_policy, other.seats_by_policy)):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+
+    def to_json(self):
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "unfinished": self.unfinished,
+            "average_turns": self.turns / games,
+            "average_rounds": self.rounds / games,
+            "win_rate_by_seat": {seat: wins / games for seat, wins in sorted(self.wins_by_seat.items())},
+            # wins per seat played, so mixed tables compare fairly
+            "win_rate_by_policy": {name: self.wins_by_policy.get(name, 0) / seats
+                                   for name, seats in sorted(self.seats_by_policy.items())},
+        }
+
+
+def simulate_game(seed: int, policy_names: list[str], max_turns: int = MAX_TURNS) -> tuple[int | None, int, int]:
+    """
+    Plays one game without any I/O, seat i is played by policy_names[i].
+    Returns the winning seat (None if the game did not finish), the number of played cards and rounds.
+    """
+    # the seed of the deck is drawn from the module random generator
+    random.seed(seed)
+    policies = [POLICIES[name](random.Random(f"{seed}-{seat}")) for seat, name in enumerate(policy_names)]
+
+    game = Game("simulation", [Player("seat 0", 0)])
+    for seat in range(1, len(policy_names)):
+        game.add_player(f"seat {seat}")
+    # simulated turns never time out
+    game.TURN_DURATION = math.inf
+    game.start_game_and_deal_cards()
+
+    turns = 0
+    winner = None
+    while not game.game_over and turns < max_turns:
+        player = game.players[game.current_player_index]
+        moves = game.generate_legal_moves(player)
+        if not moves:
+            break
+        move = policies[player.number].choose_move(game, player, moves)
+        winner = game.play_card(player, move["card_index"], move["action_details"])
+        turns += 1
+
+    return (winner.number if winner is not None else None), turns, game.round_number
+
+
+def seat_policies(game_index: int, players: int, policy_names: list[str]) -> list[str]:
+    """Rotates the policies over the seats from game to game, so no policy keeps the first move."""
+    return [policy_names[(seat + game_index) % len(policy_names)] for seat in range(players)]
+
+
+def run_batch(first_game: int, count: int, seed: int, players: int, policy_names: list[str],
+              max_turns: int = MAX_TURNS) -> SimulationStats:
+    stats = SimulationStats()
+    for game_index in range(first_game, first_game + count):
+        names = seat_policies(game_index, players, policy_names)
+        winner_seat, turns, rounds = simulate_game(seed + game_index, names, max_turns)
+        stats.add_game(winner_seat, names, turns, rounds)
+    return stats
+
+
+def _init_worker(deck_overrides: dict[str, int]):
+    DECK_COMPOSITION.update(deck_overrides)
+
+
+class Simulator:
+    """
+    Runs many headless games across a process pool and collects the outcome statistics.
+    """
+
+    def __init__(self, players: int = MAX_PLAYERS, policy_names: list[str] | None = None, workers: int | None = None,
+                 seed: int = 0, batch_size: int = 50, max_turns: int = MAX_TURNS,
+                 deck_overrides: dict[str, int] | None = None):
+        if not MIN_PLAYERS_TO_START <= players <= MAX_PLAYERS:
+            raise ValueError(f"Between {MIN_PLAYERS_TO_START} and {MAX_PLAYERS} players are needed.")
+        self.players = players
+        self.policy_names = policy_names or ["random"]
+        for name in self.policy_names:
+            if name not in POLICIES:
+                raise ValueError(f"Unknown policy {name}. Must be one of {sorted(POLICIES)}.")
+        unknown_keys = set(deck_overrides or {}) - set(DECK_COMPOSITION)
+        if unknown_keys:
+            raise ValueError(f"Unknown deck composition keys: {sorted(unknown_keys)}.")
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.batch_size = batch_size
+        self.max_turns = max_turns
+        self.deck_overrides = deck_overrides or {}
+
+    def run(self, games: int) -> dict:
+        """Simulates the given number of games and returns the statistics with the throughput."""
+        stats = SimulationStats()
+        start_time = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.deck_overrides,)) as executor:
+            futures = [
+                executor.submit(run_batch, first_game, min(self.batch_size, games - first_game), self.seed,
+                                self.players, self.policy_names, self.max_turns)
+                for first_game in range(0, games, self.batch_size)
+            ]
+            for future in futures:
+                stats.merge(future.result())
+        elapsed = time.perf_counter() - start_time
+
+        result = stats.to_json()
+        result["seconds"] = elapsed
+        result["games_per_second"] = stats.games / elapsed if elapsed else 0
+        return result
+
+
+def parse_deck_override(text: str) -> tuple[str, int]:
+    key, _, value = text.partition("=")
+    return key, int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs headless CAT games and prints outcome statistics as JSON.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=MAX_PLAYERS)
+    parser.add_argument("--policies", nargs="+", default=["random"], choices=sorted(POLICIES),
+                        help="policies rotated over the seats")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the CPU count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=50, help="games per task sent to a worker")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--deck", nargs="*", default=[], type=parse_deck_override, metavar="KEY=COUNT",
+                        help="overrides of DECK_COMPOSITION, e.g. joker_cards=10")
+    args = parser.parse_args()
+
+    simulator = Simulator(players=args.players, policy_names=args.policies, workers=args.workers, seed=args.seed,
+                          batch_size=args.batch_size, max_turns=args.max_turns, deck_overrides=dict(args.deck))
+    result = simulator.run(args.games)
+    print(json.dumps(result, indent=2))
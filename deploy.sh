@@ -35,8 +35,8 @@ ssh $REMOTE_USER@$REMOTE_HOST << EOF
   # Aktiviere die virtuelle Umgebung
   source venv/bin/activate
 
-  # Starte den Server im Hintergrund
-  python3 -m CAT.API.pages_connection_api > backend.log 2>&1 &
+  # Starte den Server im Hintergrund, laufende Spiele werden aus games.db wiederhergestellt
+  CAT_STATE_DB=games.db python3 -m CAT.API.pages_connection_api > backend.log 2>&1 &
 
   # Speichere die neue Prozess-ID
   echo \$! > backend.pid
@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from CAT.classes.game import Game
+from CAT.classes.player import Player
+from CAT.manager.game_store import GameStore
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _saved_commands(path, game_id):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM commands WHERE game_id = ?", (game_id,)).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_writer_survives_a_failed_write(tmp_path):
+    path = str(tmp_path / "games.db")
+    store = GameStore(path, flush_interval=0.01)
+    store.start()
+    game = Game("store test", [Player("host", 0)])
+    game.recorder = store.record
+    store.snapshot(game)
+    game.add_player("guest")
+    assert _wait_until(lambda: _saved_commands(path, game.uuid) == 1)
+
+    # the writer's next transaction fails with "no such table: commands"
+    connection = sqlite3.connect(path)
+    connection.execute("DROP TABLE commands")
+    connection.close()
+    game.add_player("third")
+    game.start_game_and_deal_cards()
+    time.sleep(0.2)
+    assert store._thread.is_alive()
+
+    store.close()
+    [(snapshot, commands)] = store.load()
+    assert snapshot["uuid"] == game.uuid
+    # the entries of the failed transaction were written into the recreated table
+    assert [command for command, _ in commands] == ["join", "start"]
@@ -0,0 +1,35 @@
+import pytest
+
+from CAT.benchmarks.scenarios import build_scenario
+from CAT.classes.cards import SwapCard
+from CAT.classes.game import Game
+
+
+def _accepted_swaps(game: Game, player_number: int) -> set[tuple[str, str]]:
+    """Every pair of figures the Swap Card accepts, each tried on a copy of the game."""
+    snapshot = game.to_snapshot()
+    figures = [figure for player in game.players for figure in player.figures]
+    accepted = set()
+    for figure in game.players[player_number].figures:
+        for other_figure in figures:
+            copy = Game.from_snapshot(snapshot)
+            try:
+                SwapCard().play_card(copy, copy.players[player_number],
+                                     figure_uuid=figure.uuid, other_figure_uuid=other_figure.uuid)
+            except ValueError:
+                continue
+            accepted.add((figure.uuid, other_figure.uuid))
+    return accepted
+
+
+@pytest.mark.parametrize("scenario", ["mid", "late", "inferno"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_swap_moves_match_the_swaps_the_card_accepts(scenario, seed):
+    game = build_scenario(scenario, seed)
+    for player in game.players:
+        for card in player.discard_cards():
+            game.deck.add_to_discard(card)
+        player.add_card(SwapCard())
+        generated = {(move["action_details"]["figure_uuid"], move["action_details"]["other_figure_uuid"])
+                     for move in game.generate_legal_moves(player)}
+        assert generated == _accepted_swaps(game, player.number)
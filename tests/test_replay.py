@@ -0,0 +1,51 @@
+import random
+
+from CAT.benchmarks.scenarios import new_game
+from CAT.manager.replay import GameRecording, GameReplay
+from CAT.simulation.policies import RandomPolicy
+
+
+def test_rejected_plays_do_not_count_as_turns():
+    game = new_game(0, started=False)
+    recording = GameRecording(game)
+    game.start_game_and_deal_cards()
+    policy = RandomPolicy(random.Random(0))
+    hashes = []
+    while not game.game_over and len(hashes) < 60:
+        player = game.players[game.current_player_index]
+        # recorded before they are rejected
+        for wrong_player, card_index in ((game.players[(player.number + 1) % game.number_of_players], 0), (player, 99)):
+            try:
+                game.play_card(wrong_player, card_index, {})
+            except (ValueError, IndexError):
+                pass
+        move = policy.choose_move(game, player, game.generate_legal_moves(player))
+        game.play_card(player, move["card_index"], move["action_details"])
+        hashes.append(game.state_hash)
+
+    replay = GameReplay.from_recording(recording, checkpoint_interval=20)
+    replay.run()
+    assert len(replay.turn_ends) == len(hashes)
+    # forwards and backwards over the checkpoints
+    for turn in (len(hashes), 1, 45, 12, 30):
+        assert replay.seek(turn).state_hash == hashes[turn - 1]
+        assert replay.turn == turn
+
+
+def test_seeking_back_drops_later_kick_votes():
+    game = new_game(0)
+    recording = GameRecording(game)
+    player = game.players[game.current_player_index]
+    move = RandomPolicy(random.Random(0)).choose_move(game, player, game.generate_legal_moves(player))
+    game.play_card(player, move["card_index"], move["action_details"])
+    first, second, third = game.players[:3]
+    # one vote of three does not kick
+    game.register_kick_vote(second, first.uuid)
+    game.register_kick_vote(third, second.uuid)
+
+    replay = GameReplay.from_recording(recording, checkpoint_interval=1)
+    assert replay.run().kick_votes == {first.uuid: [second.uuid], second.uuid: [third.uuid]}
+    assert replay.seek_command(2).kick_votes == {first.uuid: [second.uuid]}
+    assert replay.seek_command(1).kick_votes == {}
+    assert replay.seek_command(0).kick_votes == {}
+    assert recording.origin["kick_votes"] == {}